@@ -12,3 +12,11 @@ ImmutableNominativeDictionary
 DifferencesProcessFailure
 TextualMimetypeInvalidity
 VersionControl
+benchmark               # used by auxiliary benchmark scripts
+select_fastest          # used by auxiliary benchmark scripts
+parse_stream            # public API for streaming consumers
+parse_part              # public API for single parts
+parse_buffer            # public API for memory-mapped mimeograms
+format_mimeogram_to     # public API for streaming sinks
+format_part             # public API for single parts
+save_encoding           # used by auxiliary encoding seed script
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# vim: set filetype=python fileencoding=utf-8:
+
+''' Compares I/O backends on small-file-heavy trees and picks fastest. '''
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+from mimeogram import iobackends
+
+
+def _collect_locations( directory: Path ) -> list[ Path ]:
+    return sorted(
+        path for path in directory.rglob( '*' )
+        if path.is_file( ) and '.git' not in path.parts )
+
+
+def _populate_tree( directory: Path, count: int, size: int ) -> list[ Path ]:
+    locations: list[ Path ] = [ ]
+    line = b'synthetic content for benchmark\n'
+    content = ( line * ( size // len( line ) + 1 ) )[ : size ]
+    for i in range( count ):
+        location = directory / f'd{i % 32:02d}' / f'f{i:05d}.txt'
+        location.parent.mkdir( parents = True, exist_ok = True )
+        location.write_bytes( content )
+        locations.append( location )
+    return locations
+
+
+def main( ) -> int:
+    parser = argparse.ArgumentParser(
+        description = __doc__.strip( ) )
+    parser.add_argument(
+        'directory', nargs = '?', type = Path,
+        help = 'Tree to read. Synthetic tree, if omitted.' )
+    parser.add_argument( '--files', type = int, default = 2000 )
+    parser.add_argument( '--size', type = int, default = 2048 )
+    parser.add_argument( '--repetitions', type = int, default = 5 )
+    parser.add_argument(
+        '--synchronize', action = 'store_true',
+        help = 'Flush copies to storage, as with configuration option.' )
+    arguments = parser.parse_args( )
+
+    with tempfile.TemporaryDirectory( ) as tmpdir:
+        scratch = Path( tmpdir ) / 'scratch'
+        scratch.mkdir( )
+        if arguments.directory:
+            locations = _collect_locations( arguments.directory )
+        else:
+            locations = _populate_tree(
+                Path( tmpdir ) / 'tree', arguments.files, arguments.size )
+        results = asyncio.run( iobackends.benchmark(
+            locations, scratch,
+            repetitions = arguments.repetitions,
+            synchronize = arguments.synchronize ) )
+
+    print( f'Files: {len( locations )}' )
+    for species, seconds in results.items( ):
+        print( f'{species.value:>10}: {seconds:.4f} s' )
+    fastest = iobackends.select_fastest( results )
+    print( 'Recommended configuration:' )
+    print( '[io-backends]' )
+    print( f"default = '{fastest.value}'" )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit( main( ) )
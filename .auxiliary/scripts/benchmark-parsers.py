@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# vim: set filetype=python fileencoding=utf-8:
+
+''' Measures parser throughput and peak memory on synthetic mimeograms. '''
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pathlib import Path
+
+from mimeogram import parsers
+
+
+_boundary = '====MIMEOGRAM_0123456789abcdef0123456789abcdef===='
+
+
+def _produce_mimeogram( size: int, part_size: int ) -> str:
+    line = 'synthetic line of mimeogram content for parser benchmark\n'
+    body = ( line * ( part_size // len( line ) + 1 ) )[ : part_size ]
+    chunks: list[ str ] = [ ]
+    total = 0
+    i = 0
+    while total < size:
+        chunk = (
+            f"--{_boundary}\n"
+            f"Content-Location: src/module{i:06d}.py\n"
+            "Content-Type: text/x-python; charset=utf-8; linesep=LF\n"
+            "\n"
+            f"{body}\n" )
+        chunks.append( chunk )
+        total += len( chunk )
+        i += 1
+    chunks.append( f"--{_boundary}--\n" )
+    return ''.join( chunks )
+
+
+def _parse_text( text: str, location: Path, options: dict ) -> int:
+    return len( parsers.parse( text, **options ) )
+
+
+def _parse_stream( text: str, location: Path, options: dict ) -> int:
+    with location.open( encoding = 'utf-8', newline = '' ) as stream:
+        return sum( 1 for _ in parsers.parse_stream( stream ) )
+
+
+_methods = { 'parse': _parse_text, 'parse_stream': _parse_stream }
+
+
+def _measure(
+    method: str, text: str, location: Path, repetitions: int, options: dict
+) -> tuple[ float, int, int ]:
+    ''' Measures best time and peak traced memory beyond input text. '''
+    function = _methods[ method ]
+    best = float( 'inf' )
+    count = 0
+    for _ in range( repetitions ):
+        gc.collect( )
+        start = time.perf_counter( )
+        count = function( text, location, options )
+        best = min( best, time.perf_counter( ) - start )
+    gc.collect( )
+    tracemalloc.start( )
+    function( text, location, options )
+    _, peak = tracemalloc.get_traced_memory( )
+    tracemalloc.stop( )
+    return best, peak, count
+
+
+def main( ) -> int:
+    parser = argparse.ArgumentParser( description = __doc__.strip( ) )
+    parser.add_argument(
+        '--size-mb', type = int, default = 100,
+        help = 'Approximate size of synthetic mimeogram in megabytes.' )
+    parser.add_argument(
+        '--part-kb', type = int, default = 16,
+        help = 'Approximate size of each part in kilobytes.' )
+    parser.add_argument( '--repetitions', type = int, default = 3 )
+    parser.add_argument(
+        '--workers', type = int, default = 1,
+        help = 'Worker processes for parse. Zero for one per CPU.' )
+    parser.add_argument(
+        '--threshold', type = int, default = parsers.parallel_threshold,
+        help = 'Minimum number of parts for worker pool.' )
+    parser.add_argument(
+        '--method', choices = tuple( _methods ), action = 'append' )
+    arguments = parser.parse_args( )
+    options = dict(
+        workers = arguments.workers or None,
+        threshold = arguments.threshold )
+    text = _produce_mimeogram(
+        arguments.size_mb * 1024 * 1024, arguments.part_kb * 1024 )
+    megabytes = len( text.encode( ) ) / ( 1024 * 1024 )
+    print( f'Mimeogram: {megabytes:.1f} MB' )
+    with tempfile.TemporaryDirectory( ) as directory:
+        location = Path( directory ) / 'mimeogram.txt'
+        location.write_text( text, encoding = 'utf-8', newline = '' )
+        for method in arguments.method or tuple( _methods ):
+            seconds, peak, count = _measure(
+                method, text, location, arguments.repetitions, options )
+            print(
+                f'{method:>13}: {count} parts, '
+                f'{megabytes / seconds:.1f} MB/s, '
+                f'peak {peak / ( 1024 * 1024 ):.1f} MB' )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit( main( ) )
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# vim: set filetype=python fileencoding=utf-8:
+
+''' Calibrates token estimator against exact counts of reference corpus. '''
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+from pathlib import Path
+
+import tiktoken
+
+from mimeogram import tokenizers
+
+
+def _collect_texts( directories: list[ Path ], minimum: int ) -> list[ str ]:
+    texts: list[ str ] = [ ]
+    for directory in directories:
+        for path in sorted( directory.rglob( '*' ) ):
+            if not path.is_file( ) or '.git' in path.parts: continue
+            try: text = path.read_text( encoding = 'utf-8' )
+            except ( OSError, UnicodeDecodeError ): continue
+            if len( text ) >= minimum: texts.append( text )
+    return texts
+
+
+def _fit_weights(
+    rows: list[ tuple[ tuple[ int, ... ], int ] ]
+) -> list[ float ]:
+    ''' Fits weights by least squares of relative errors. '''
+    size = len( rows[ 0 ][ 0 ] )
+    matrix = [ [ 0.0 ] * ( size + 1 ) for _ in range( size ) ]
+    for features, exact in rows:
+        scaled = [ feature / exact for feature in features ]
+        for i in range( size ):
+            for j in range( size ):
+                matrix[ i ][ j ] += scaled[ i ] * scaled[ j ]
+            matrix[ i ][ size ] += scaled[ i ]
+    for i in range( size ): # Ridge term keeps unused features solvable.
+        matrix[ i ][ i ] += 1e-9
+    for column in range( size ):
+        pivot = max(
+            range( column, size ),
+            key = lambda r: abs( matrix[ r ][ column ] ) )
+        matrix[ column ], matrix[ pivot ] = matrix[ pivot ], matrix[ column ]
+        for r in range( size ):
+            if r == column: continue
+            factor = matrix[ r ][ column ] / matrix[ column ][ column ]
+            for c in range( column, size + 1 ):
+                matrix[ r ][ c ] -= factor * matrix[ column ][ c ]
+    return [ matrix[ i ][ size ] / matrix[ i ][ i ] for i in range( size ) ]
+
+
+def _measure_deviation(
+    rows: list[ tuple[ tuple[ int, ... ], int ] ], weights: list[ float ]
+) -> float:
+    errors = [
+        ( sum( w * f for w, f in zip( weights, features ) ) - exact ) / exact
+        for features, exact in rows ]
+    squares = sum( error * error for error in errors )
+    return math.sqrt( squares / len( errors ) )
+
+
+def _measure_speedup( texts: list[ str ], codec: tiktoken.Encoding ) -> float:
+    estimator = asyncio.run( tokenizers.Estimator.from_variant( ) )
+    text = ''.join( texts )
+    start = time.perf_counter( )
+    codec.encode( text, disallowed_special = ( ) )
+    exact = time.perf_counter( ) - start
+    start = time.perf_counter( )
+    estimator.estimate( text )
+    return exact / ( time.perf_counter( ) - start )
+
+
+def main( ) -> int:
+    parser = argparse.ArgumentParser( description = __doc__.strip( ) )
+    parser.add_argument(
+        'directories', type = Path, nargs = '+',
+        help = 'Reference corpus of source code and prose.' )
+    parser.add_argument(
+        '--encodings', nargs = '+',
+        default = [ 'cl100k_base', 'o200k_base' ] )
+    parser.add_argument( '--minimum', type = int, default = 256 )
+    arguments = parser.parse_args( )
+
+    texts = _collect_texts( arguments.directories, arguments.minimum )
+    if not texts:
+        print( 'No texts found in corpus.', file = sys.stderr )
+        return 1
+    features = [ tokenizers.tally_features( text ) for text in texts ]
+    characters = sum( len( text ) for text in texts )
+    print( f'# Corpus: {len( texts )} texts, {characters} characters' )
+    for name in arguments.encodings:
+        codec = tiktoken.get_encoding( name )
+        exacts = [
+            len( codec.encode( text, disallowed_special = ( ) ) )
+            for text in texts ]
+        rows = [
+            ( tallies, exact ) for tallies, exact in zip( features, exacts )
+            if exact ]
+        weights = _fit_weights( rows )
+        deviation = _measure_deviation( rows, weights )
+        speedup = _measure_speedup( texts, codec )
+        print( f'# {name}: {speedup:.0f}x faster than encoding' )
+        print( f"'{name}': Calibration(" )
+        print( '    weights = (' )
+        print( '        ' + ', '.join( f'{w:.3f}' for w in weights ) + ' ),' )
+        print( f'    deviation = {deviation:.3f} ),' )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit( main( ) )
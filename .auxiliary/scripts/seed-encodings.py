@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# vim: set filetype=python fileencoding=utf-8:
+
+''' Preprocesses 'tiktoken' encodings for offline loading.
+
+    Run where encodings can be downloaded, or where 'TIKTOKEN_CACHE_DIR'
+    holds them, then ship resulting files in 'data/encodings' or copy them
+    to 'encodings' under the mimeogram user data directory of each host.
+'''
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from tiktoken_ext.openai_public import ENCODING_CONSTRUCTORS
+
+from mimeogram import tokenizers
+
+
+def main( ) -> int:
+    parser = argparse.ArgumentParser(
+        description = __doc__.strip( ).split( '\n' )[ 0 ] )
+    parser.add_argument(
+        'encodings', nargs = '*', default = [ 'cl100k_base', 'o200k_base' ] )
+    parser.add_argument(
+        '--target', type = Path, default = Path( 'data/encodings' ),
+        help = 'Directory for preprocessed encodings.' )
+    arguments = parser.parse_args( )
+
+    for name in arguments.encodings:
+        if name not in ENCODING_CONSTRUCTORS:
+            print( f'Unknown encoding: {name}', file = sys.stderr )
+            return 1
+        location = arguments.target / f'{name}{tokenizers.encoding_suffix}'
+        constructor = ENCODING_CONSTRUCTORS[ name ]
+        tokenizers.save_encoding( location, **constructor( ) )
+        start = time.perf_counter( )
+        tokenizers.restore_encoding( location )
+        elapsed = time.perf_counter( ) - start
+        print( f'{location}: {location.stat( ).st_size} bytes, '
+               f'restored in {elapsed:.3f} s' )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit( main( ) )
@@ -25,14 +25,21 @@
 
 import                      abc
 import                      asyncio
+import                      codecs
 import collections.abc as   cabc
 import contextlib as        ctxl
 import dataclasses as       dcls
 import                      enum
 import                      hashlib
+import                      math
+import                      mmap
 import                      os
 import                      re
+import                      sqlite3
+import                      struct
 import                      sys
+import                      threading
+import                      time
 import                      types
 
 from logging import getLogger as produce_scribe
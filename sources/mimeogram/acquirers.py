@@ -21,11 +21,12 @@
 ''' Content acquisition from various sources. '''
 
 
-import aiofiles as _aiofiles
 import httpx as _httpx
 
 from . import __
 from . import exceptions as _exceptions
+from . import iobackends as _iobackends
+from . import metrics as _metrics
 from . import parts as _parts
 
 
@@ -38,28 +39,36 @@ _decode_inform_behaviors = __.dcls.replace(
 async def acquire(
     auxdata: __.appcore.state.Globals,
     sources: __.cabc.Sequence[ str | __.Path ],
+    *,
+    changed_since: __.Absential[ int ] = __.absent,
+    selection: __.Absential[ __.cabc.Sequence[ __.Path ] ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
 ) -> __.cabc.Sequence[ _parts.Part ]:
-    ''' Acquires content from multiple sources. '''
-    from urllib.parse import urlparse
+    ''' Acquires content from multiple sources.
+
+        If 'changed_since' is supplied, as nanoseconds since the epoch, then
+        only files modified after it are acquired. Unchanged files are never
+        opened. URLs are not filtered.
+
+        If 'selection' is supplied, as absolute file locations, then
+        filesystem sources act as scopes: only selected files within them
+        are acquired and directories are not traversed.
+
+        If 'recorder' is supplied, then stage timings and counters for
+        scanning, reading, and decoding are recorded with it.
+    '''
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
     options = auxdata.configuration.get( 'acquire-parts', { } )
     strict = options.get( 'fail-on-invalid', False )
     recursive = options.get( 'recurse-directories', False )
     no_ignores = options.get( 'no-ignores', False )
-    tasks: list[ __.cabc.Coroutine[ None, None, _parts.Part ] ] = [ ]
-    for source in sources:
-        path = __.Path( source )
-        url_parts = (
-            urlparse( source ) if isinstance( source, str )
-            else urlparse( str( source ) ) )
-        scheme = 'file' if path.drive else url_parts.scheme
-        match scheme:
-            case '' | 'file':
-                fs_tasks = _produce_fs_tasks( source, recursive, no_ignores )
-                tasks.extend( fs_tasks )
-            case 'http' | 'https':
-                tasks.append( _produce_http_task( str( source ) ) )
-            case _:
-                raise _exceptions.UrlSchemeNoSupport( str( source ) )
+    backend = _iobackends.produce_backend( auxdata )
+    with recorder.measure( 'scan' ):
+        tasks = _produce_tasks(
+            sources,
+            recursive = recursive, no_ignores = no_ignores,
+            backend = backend, changed_since = changed_since,
+            selection = selection, recorder = recorder )
     if strict: return await __.asyncf.gather_async( *tasks )
     results: tuple[ __.generics.GenericResult, ... ] = (
         await __.asyncf.gather_async(
@@ -71,124 +80,357 @@ async def acquire(
     for result in results:
         if __.generics.is_error( result ):
             _scribe.warning( str( result.error ) )
+            recorder.increment( 'files-rejected' )
             continue
         values.append( result.extract( ) )
+    recorder.increment( 'parts', len( values ) )
     return tuple( values )
 
-async def _acquire_from_file( location: __.Path ) -> _parts.Part:
+
+def _produce_tasks( # noqa: PLR0913
+    sources: __.cabc.Sequence[ str | __.Path ],
+    *,
+    recursive: bool,
+    no_ignores: bool,
+    backend: _iobackends.IoBackend,
+    changed_since: __.Absential[ int ],
+    selection: __.Absential[ __.cabc.Sequence[ __.Path ] ],
+    recorder: _metrics.Recorder,
+) -> tuple[ __.cabc.Coroutine[ None, None, _parts.Part ], ...]:
+    ''' Produces acquisition tasks for sources. '''
+    from urllib.parse import urlparse
+    tasks: list[ __.cabc.Coroutine[ None, None, _parts.Part ] ] = [ ]
+    scopes: list[ __.Path ] = [ ]
+    for source in sources:
+        path = __.Path( source )
+        url_parts = (
+            urlparse( source ) if isinstance( source, str )
+            else urlparse( str( source ) ) )
+        scheme = 'file' if path.drive else url_parts.scheme
+        match scheme:
+            case '' | 'file':
+                if __.is_absent( selection ):
+                    tasks.extend( _produce_fs_tasks(
+                        source, recursive, no_ignores,
+                        backend = backend, changed_since = changed_since,
+                        recorder = recorder ) )
+                else: scopes.append( path )
+            case 'http' | 'https':
+                tasks.append( _produce_http_task(
+                    str( source ), recorder = recorder ) )
+            case _:
+                raise _exceptions.UrlSchemeNoSupport( str( source ) )
+    tasks.extend( _produce_selected_fs_tasks(
+        selection, scopes, recursive,
+        backend = backend, changed_since = changed_since,
+        recorder = recorder ) )
+    return tuple( tasks )
+
+
+async def _acquire_from_file(
+    location: __.Path,
+    backend: __.Absential[ _iobackends.IoBackend ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
+) -> _parts.Part:
     ''' Acquires content from text file. '''
     from .exceptions import ContentAcquireFailure, ContentDecodeFailure
-    try:
-        async with _aiofiles.open( location, 'rb' ) as f: # pyright: ignore
-            content_bytes = await f.read( )
-    except Exception as exc: raise ContentAcquireFailure( location ) from exc
-    try:
-        result = __.detextive.decode_inform(
-            content_bytes,
-            location = str( location ),
-            behaviors = _decode_inform_behaviors )
-    except Exception as exc:
-        raise ContentDecodeFailure( location, '???' ) from exc
-    mimetype = result.mimetype.mimetype
-    charset = result.charset.charset
-    if charset is None: raise ContentDecodeFailure( location, '???' )
-    linesep = result.linesep
-    if linesep is None:
-        _scribe.warning( f"No line separator detected in '{location}'." )
-        linesep = __.detextive.LineSeparators( __.os.linesep )
+    if __.is_absent( backend ): backend = _iobackends.AiofilesBackend( )
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    with recorder.measure( 'read' ):
+        try: content_bytes = await backend.acquire_bytes( location )
+        except Exception as exc:
+            raise ContentAcquireFailure( location ) from exc
+    recorder.increment( 'bytes-read', len( content_bytes ) )
+    with recorder.measure( 'decode' ):
+        try:
+            result = _decode_inform(
+                content_bytes, location = str( location ) )
+        except ContentDecodeFailure: raise
+        except Exception as exc:
+            raise ContentDecodeFailure( location, '???' ) from exc
     _scribe.debug( f"Read file: {location}" )
-    return _parts.Part(
-        location = str( location ),
-        mimetype = mimetype,
-        charset = charset,
-        linesep = linesep,
-        content = linesep.normalize( result.text ) )
+    return _produce_part( str( location ), result )
 
 
 async def _acquire_via_http(
-    client: _httpx.AsyncClient, url: str
+    client: _httpx.AsyncClient,
+    url: str,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
 ) -> _parts.Part:
     ''' Acquires content via HTTP/HTTPS. '''
     from .exceptions import ContentAcquireFailure, ContentDecodeFailure
-    try:
-        response = await client.get( url )
-        response.raise_for_status( )
-    except Exception as exc: raise ContentAcquireFailure( url ) from exc
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    with recorder.measure( 'read' ):
+        try:
+            response = await client.get( url )
+            response.raise_for_status( )
+        except Exception as exc: raise ContentAcquireFailure( url ) from exc
     http_content_type = response.headers.get( 'content-type' )
     content_bytes = response.content
-    try:
-        result = __.detextive.decode_inform(
-            content_bytes,
-            location = url,
-            behaviors = _decode_inform_behaviors,
-            http_content_type = http_content_type or __.absent )
-    except Exception as exc:
-        raise ContentDecodeFailure( url, '???' ) from exc
-    mimetype = result.mimetype.mimetype
+    recorder.increment( 'bytes-read', len( content_bytes ) )
+    with recorder.measure( 'decode' ):
+        try:
+            result = _decode_inform(
+                content_bytes,
+                location = url,
+                http_content_type = http_content_type or __.absent )
+        except ContentDecodeFailure: raise
+        except Exception as exc:
+            raise ContentDecodeFailure( url, '???' ) from exc
+    _scribe.debug( f"Fetched URL: {url}" )
+    return _produce_part( url, result )
+
+
+def _produce_part(
+    location: str, result: __.detextive.DecodeInformResult
+) -> _parts.Part:
+    ''' Produces part from decoded content and its inferred metadata. '''
+    from .exceptions import ContentDecodeFailure
     charset = result.charset.charset
-    if charset is None: raise ContentDecodeFailure( url, '???' )
+    if charset is None: raise ContentDecodeFailure( location, '???' )
     linesep = result.linesep
     if linesep is None:
-        _scribe.warning( f"No line separator detected in '{url}'." )
+        _scribe.warning( f"No line separator detected in '{location}'." )
         linesep = __.detextive.LineSeparators( __.os.linesep )
-    _scribe.debug( f"Fetched URL: {url}" )
     return _parts.Part(
-        location = url,
-        mimetype = mimetype,
+        location = location,
+        mimetype = result.mimetype.mimetype,
         charset = charset,
         linesep = linesep,
         content = linesep.normalize( result.text ) )
 
 
+_detection_sample_size = 64 * 1024
+def _decode_inform(
+    content_bytes: bytes,
+    location: str,
+    http_content_type: __.Absential[ str ] = __.absent,
+) -> __.detextive.DecodeInformResult:
+    ''' Infers metadata from bounded sample and decodes full content.
+
+        Detection of charset, MIME type, and line separators is performed on
+        a leading sample of large contents. The full content is then decoded
+        with the inferred charset. If that decode fails, then detection falls
+        back to the full content. Large content with NUL bytes, which its
+        charset does not explain, is rejected rather than decoded as text,
+        since sample may not have revealed it to be binary.
+    '''
+    from .exceptions import ContentDecodeFailure
+    nomargs: dict[ str, __.typx.Any ] = dict(
+        location = location,
+        behaviors = _decode_inform_behaviors,
+        http_content_type = http_content_type )
+    if len( content_bytes ) <= _detection_sample_size:
+        return __.detextive.decode_inform( content_bytes, **nomargs )
+    sample = _produce_detection_sample( content_bytes )
+    with __.ctxl.suppress( __.detextive.exceptions.Omnierror ):
+        result = __.detextive.decode_inform( sample, **nomargs )
+        charset = result.charset.charset
+        if charset and not _is_nul_suspicious( content_bytes, charset ):
+            with __.ctxl.suppress( LookupError, UnicodeDecodeError ):
+                text = content_bytes.decode( charset )
+                return __.dcls.replace( result, text = text )
+    _scribe.debug(
+        f"Sample detection inconclusive for '{location}'. "
+        "Detecting from full content." )
+    result = __.detextive.decode_inform( content_bytes, **nomargs )
+    charset = result.charset.charset
+    if charset and _is_nul_suspicious( content_bytes, charset ):
+        raise ContentDecodeFailure( location, charset )
+    return result
+
+
+def _is_nul_suspicious( content_bytes: bytes, charset: str ) -> bool:
+    ''' Does content contain NUL bytes not explained by charset? '''
+    try: name = __.codecs.lookup( charset ).name
+    except LookupError: return True
+    if name.startswith( ( 'utf-16', 'utf-32' ) ): return False
+    return b'\x00' in content_bytes
+
+
+def _produce_detection_sample( content_bytes: bytes ) -> bytes:
+    ''' Produces sample of content which ends on line boundary. '''
+    sample = content_bytes[ : _detection_sample_size ]
+    # Avoid truncating multibyte sequences at end of sample.
+    index = sample.rfind( b'\n' )
+    if index > 0: return sample[ : index ]
+    return sample
+
+
 _files_to_ignore = frozenset( ( '.DS_Store', '.env' ) )
 _directories_to_ignore = frozenset( ( '.bzr', '.git', '.hg', '.svn' ) )
-def _collect_directory_files(
-    directory: __.Path, recursive: bool, no_ignores: bool = False
+def _collect_directory_files( # noqa: PLR0915
+    directory: __.Path,
+    recursive: bool,
+    no_ignores: bool = False,
+    changed_since: __.Absential[ int ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
 ) -> list[ __.Path ]:
     ''' Collects and filters files from directory hierarchy.
 
         When no_ignores is True, gitignore filtering is disabled.
         When gitignore filtering is enabled, warnings are emitted for
         filtered paths.
+        When changed_since is supplied, files with modification times at or
+        before it are skipped. Modification times come from the same
+        directory scan as the entries.
     '''
     import gitignorefile
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
     cache = gitignorefile.Cache( )
     paths: list[ __.Path ] = [ ]
     _scribe.debug( f"Collecting files in directory: {directory}" )
-    for entry in directory.iterdir( ):
-        if entry.is_dir( ) and entry.name in _directories_to_ignore:
-            _scribe.debug( f"Ignoring directory: {entry}" )
-            continue
-        if entry.is_file( ) and entry.name in _files_to_ignore:
-            _scribe.debug( f"Ignoring file: {entry}" )
-            continue
-        if not no_ignores and cache( str( entry ) ):
-            _scribe.warning(
-                f"Skipping path (matched by .gitignore): {entry}. "
-                "Use --no-ignores to include." )
-            continue
-        if entry.is_dir( ) and recursive:
-            collected = _collect_directory_files(
-                entry, recursive, no_ignores )
-            paths.extend( collected )
-        elif entry.is_file( ): paths.append( entry )
+    with __.os.scandir( directory ) as entries:
+        for entry in entries:
+            path = __.Path( entry.path )
+            is_dir = entry.is_dir( )
+            is_file = entry.is_file( )
+            if is_file: recorder.increment( 'files-scanned' )
+            if is_dir and entry.name in _directories_to_ignore:
+                _scribe.debug( f"Ignoring directory: {path}" )
+                continue
+            if is_file and entry.name in _files_to_ignore:
+                _scribe.debug( f"Ignoring file: {path}" )
+                recorder.increment( 'files-ignored' )
+                continue
+            if not no_ignores and _is_ignored( cache, entry.path, recorder ):
+                _scribe.warning(
+                    f"Skipping path (matched by .gitignore): {path}. "
+                    "Use --no-ignores to include." )
+                recorder.increment( 'files-ignored' )
+                continue
+            if is_dir and recursive:
+                collected = _collect_directory_files(
+                    path, recursive, no_ignores, changed_since, recorder )
+                paths.extend( collected )
+            elif is_file:
+                if not _is_changed( entry.stat( ), changed_since ):
+                    _scribe.debug( f"Skipping unchanged file: {path}" )
+                    recorder.increment( 'files-unchanged' )
+                    continue
+                paths.append( path )
     return paths
 
 
-def _produce_fs_tasks(
-    location: str | __.Path, recursive: bool = False, no_ignores: bool = False
+def _is_ignored(
+    cache: __.typx.Any, path: str, recorder: _metrics.Recorder
+) -> bool:
+    ''' Is path matched by applicable Git ignore rules? '''
+    with recorder.measure( 'ignore-evaluation' ): return bool( cache( path ) )
+
+
+def _is_changed(
+    status: __.os.stat_result, changed_since: __.Absential[ int ]
+) -> bool:
+    ''' Was file modified after threshold, if any? '''
+    if __.is_absent( changed_since ): return True
+    return status.st_mtime_ns > changed_since
+
+
+def _is_location_changed(
+    location: __.Path, changed_since: __.Absential[ int ]
+) -> bool:
+    ''' Was file at location modified after threshold, if any? '''
+    if __.is_absent( changed_since ): return True
+    try: status = location.stat( )
+    except OSError: return True # Acquisition reports the problem.
+    return _is_changed( status, changed_since )
+
+
+def _locate_in_scopes(
+    selected: __.Path,
+    anchors: __.cabc.Sequence[ tuple[ __.Path, __.Path ] ],
+    recursive: bool,
+    nested: dict[ __.Path, int ],
+) -> __.Absential[ __.Path ]:
+    ''' Locates selected file relative to first scope which admits it.
+
+        Files which only lie in subdirectories of scopes, when not
+        recursive, are tallied by scope in 'nested'.
+    '''
+    container: __.Absential[ __.Path ] = __.absent
+    for scope, anchor in anchors:
+        if selected == anchor: return scope
+        if not selected.is_relative_to( anchor ): continue
+        if recursive or selected.parent == anchor:
+            return scope / selected.relative_to( anchor )
+        container = scope
+    if not __.is_absent( container ):
+        nested[ container ] = nested.get( container, 0 ) + 1
+    return __.absent
+
+
+def _produce_fs_tasks( # noqa: PLR0913
+    location: str | __.Path,
+    recursive: bool = False,
+    no_ignores: bool = False,
+    *,
+    backend: __.Absential[ _iobackends.IoBackend ] = __.absent,
+    changed_since: __.Absential[ int ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
 ) -> tuple[ __.cabc.Coroutine[ None, None, _parts.Part ], ...]:
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
     location_ = __.Path( location )
     if location_.is_file( ) or location_.is_symlink( ):
-        return ( _acquire_from_file( location_ ), )
+        recorder.increment( 'files-scanned' )
+        if not _is_location_changed( location_, changed_since ):
+            _scribe.debug( f"Skipping unchanged file: {location_}" )
+            recorder.increment( 'files-unchanged' )
+            return ( )
+        return ( _acquire_from_file(
+            location_, backend = backend, recorder = recorder ), )
     if location_.is_dir( ):
-        files = _collect_directory_files( location_, recursive, no_ignores )
-        return tuple( _acquire_from_file( f ) for f in files )
+        files = _collect_directory_files(
+            location_, recursive, no_ignores, changed_since, recorder )
+        return tuple(
+            _acquire_from_file( f, backend = backend, recorder = recorder )
+            for f in files )
     raise _exceptions.ContentAcquireFailure( location )
 
 
+def _produce_selected_fs_tasks( # noqa: PLR0913
+    selection: __.Absential[ __.cabc.Sequence[ __.Path ] ],
+    scopes: __.cabc.Sequence[ __.Path ],
+    recursive: bool = False,
+    *,
+    backend: __.Absential[ _iobackends.IoBackend ] = __.absent,
+    changed_since: __.Absential[ int ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
+) -> tuple[ __.cabc.Coroutine[ None, None, _parts.Part ], ...]:
+    ''' Produces tasks for selected files which lie within scopes.
+
+        Locations are expressed relative to scopes as given, so that
+        parts are named as they would be from directory traversal.
+        Without selection, there are no tasks. Unless recursive, selected
+        files in subdirectories of scopes are skipped, with warning.
+    '''
+    if __.is_absent( selection ): return ( )
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    anchors = tuple( ( scope, scope.resolve( ) ) for scope in scopes )
+    tasks: list[ __.cabc.Coroutine[ None, None, _parts.Part ] ] = [ ]
+    nested: dict[ __.Path, int ] = { }
+    for selected in selection:
+        location = _locate_in_scopes( selected, anchors, recursive, nested )
+        if __.is_absent( location ): continue
+        if not location.is_file( ):
+            _scribe.debug( f"Skipping non-file selection: {location}" )
+            continue
+        recorder.increment( 'files-scanned' )
+        if not _is_location_changed( location, changed_since ):
+            _scribe.debug( f"Skipping unchanged file: {location}" )
+            recorder.increment( 'files-unchanged' )
+            continue
+        tasks.append( _acquire_from_file(
+            location, backend = backend, recorder = recorder ) )
+    for scope, count in nested.items( ):
+        _scribe.warning(
+            f"Skipped {count} selected files in subdirectories of "
+            f"'{scope}'. Recurse into directories to include them." )
+    return tuple( tasks )
+
+
 def _produce_http_task(
-    url: str
+    url: str, recorder: __.Absential[ _metrics.Recorder ] = __.absent
 ) -> __.cabc.Coroutine[ None, None, _parts.Part ]:
     # TODO: URL object rather than string.
     # TODO: Reuse clients for common hosts.
@@ -196,6 +438,6 @@ def _produce_http_task(
     async def _execute_session( ) -> _parts.Part:
         async with _httpx.AsyncClient( # nosec B113
             follow_redirects = True
-        ) as client: return await _acquire_via_http( client, url )
+        ) as client: return await _acquire_via_http( client, url, recorder )
 
     return _execute_session( )
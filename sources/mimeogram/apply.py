@@ -24,7 +24,10 @@
 
 from . import __
 from . import exceptions as _exceptions
+from . import fsprotect as _fsprotect
 from . import interfaces as _interfaces
+from . import iobackends as _iobackends
+from . import metrics as _metrics
 from . import parts as _parts
 from . import updaters as _updaters
 
@@ -32,6 +35,14 @@ from . import updaters as _updaters
 _scribe = __.produce_scribe( __name__ )
 
 
+class StreamFramings( __.enum.Enum ): # TODO: Python 3.11: StrEnum
+    ''' Framings of mimeograms within stream. '''
+
+    Concatenated =  'concatenated'  # Each ends at its final boundary.
+    Nul =           'nul'           # Separated by NUL characters.
+    Ndjson =        'ndjson'        # One JSON string or object per line.
+
+
 class Command(
     _interfaces.CliCommand,
     decorators = ( __.standard_tyro_class, ),
@@ -78,12 +89,40 @@ class Command(
         __.tyro.conf.DisallowNone[ bool | None ],
         __.typx.Doc( '''Override protected path checks.''' ),
     ] = None
+    stats_json: __.typx.Annotated[
+        __.typx.Optional[ str ],
+        __.typx.Doc(
+            ''' Write per-stage timings and counters as JSON to path. ''' ),
+    ] = None
+    stream: __.typx.Annotated[
+        bool,
+        __.typx.Doc(
+            ''' Apply stream of mimeograms from source, each as own batch.
+
+                Changes are applied without review. Failure of one batch
+                rolls back only that batch.
+            ''' ),
+    ] = False
+    framing: __.typx.Annotated[
+        StreamFramings,
+        __.typx.Doc(
+            ''' Framing of mimeograms within stream.
+
+                'concatenated': Each mimeogram ends at its final boundary.
+                'nul': Mimeograms are separated by NUL characters.
+                'ndjson': Each line is JSON string or object with
+                'mimeogram' field.
+            ''' ),
+    ] = StreamFramings.Concatenated
 
     async def __call__(
         self, auxdata: __.appcore.state.Globals
     ) -> None:
         ''' Executes command to apply mimeogram. '''
-        await apply( auxdata, self )
+        with _metrics.recording( 'apply', self.stats_json ) as recorder:
+            if self.stream:
+                await apply_stream( auxdata, self, recorder = recorder )
+            else: await apply( auxdata, self, recorder = recorder )
 
     def provide_configuration_edits(
         self,
@@ -121,11 +160,32 @@ class ContentAcquirer(
         ''' Acquires content from file. '''
         raise NotImplementedError
 
+    async def acquire_file_bytes( self, path: str | __.Path ) -> bytes:
+        ''' Acquires raw content from file, without decoding it.
+
+            Defaults to content from 'acquire_file', encoded as UTF-8.
+        '''
+        return ( await self.acquire_file( path ) ).encode( 'utf-8' )
+
+    @__.ctxl.asynccontextmanager
+    async def access_file_buffer(
+        self, path: str | __.Path
+    ) -> __.cabc.AsyncIterator[ _parts.Buffer ]:
+        ''' Provides raw content of file, valid within context.
+
+            Defaults to content from 'acquire_file_bytes'.
+        '''
+        yield await self.acquire_file_bytes( path )
+
     @__.abc.abstractmethod
     async def acquire_stdin( self ) -> str:
         ''' Acquires content from standard input. '''
         raise NotImplementedError
 
+    def stream_stdin( self ) -> __.cabc.Iterable[ str ]:
+        ''' Provides lines of standard input, as they arrive. '''
+        return __.sys.stdin
+
 
 class StandardContentAcquirer( ContentAcquirer ):
     ''' Standard implementation of content acquisition. '''
@@ -140,11 +200,27 @@ class StandardContentAcquirer( ContentAcquirer ):
     async def acquire_file( self, path: str | __.Path ) -> str:
         return await __.appcore.io.acquire_text_file_async( path )
 
+    async def acquire_file_bytes( self, path: str | __.Path ) -> bytes:
+        return await __.asyncio.to_thread( __.Path( path ).read_bytes )
+
+    @__.ctxl.asynccontextmanager
+    async def access_file_buffer(
+        self, path: str | __.Path
+    ) -> __.cabc.AsyncIterator[ _parts.Buffer ]:
+        # Memory map, so that pages of file are read as parts need them.
+        with open( path, 'rb' ) as stream:
+            if 0 == __.os.fstat( stream.fileno( ) ).st_size:
+                yield b''
+                return
+            with __.mmap.mmap(
+                stream.fileno( ), 0, access = __.mmap.ACCESS_READ
+            ) as buffer: yield buffer
+
     async def acquire_stdin( self ) -> str:
         return __.sys.stdin.read( )
 
 
-async def apply(
+async def apply( # noqa: PLR0913
     auxdata: __.appcore.state.Globals,
     command: Command,
     *,
@@ -155,47 +231,173 @@ async def apply(
     updater: __.Absential[
         __.cabc.Callable[
             [   __.appcore.state.Globals,
-                __.cabc.Sequence[ _parts.Part ],
+                __.cabc.Sequence[ _parts.Partlike ],
                 _updaters.ReviewModes ],
             __.cabc.Coroutine[ None, None, None ]
         ]
     ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
 ) -> __.typx.Never:
-    ''' Applies mimeogram. '''
+    ''' Applies mimeogram.
+
+        If 'recorder' is supplied, then it is also passed to updater.
+        If no parser is supplied, then mimeograms from files are accessed
+        as raw buffers, memory-mapped by standard acquirer, and parsed into
+        parts whose content is decoded on demand, so that updater need
+        only hold one part in memory at a time. Supplied parsers receive
+        text, as decoded by acquirer.
+    '''
     if __.is_absent( acquirer ):
         acquirer = StandardContentAcquirer( )
-    if __.is_absent( parser ):
-        from .parsers import parse as parser
     if __.is_absent( updater ):
         from .updaters import update as updater
-    review_mode = _determine_review_mode( command, acquirer )
-    with _exceptions.report_exceptions(
-        _scribe, "Could not acquire mimeogram to apply."
-    ): mgtext = await _acquire( auxdata, command, acquirer )
-    if not mgtext:
-        _scribe.error( "Cannot apply empty mimeogram." )
-        raise SystemExit( 1 )
-    with _exceptions.report_exceptions(
-        _scribe, "Could not parse mimeogram."
-    ):
-        parts = parser( mgtext )
     nomargs: dict[ str, __.typx.Any ] = { }
     if command.base: nomargs[ 'base' ] = command.base
-    with _exceptions.report_exceptions(
-        _scribe, "Could not apply mimeogram."
-    ):
-        await updater( auxdata, parts, review_mode, **nomargs )
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    else: nomargs[ 'recorder' ] = recorder
+    review_mode = _determine_review_mode( command, acquirer )
+    # Buffer of mimeogram must outlive parts which decode from it.
+    async with __.ctxl.AsyncExitStack( ) as exits:
+        with (
+            _exceptions.report_exceptions(
+                _scribe, "Could not acquire mimeogram to apply." ),
+            recorder.measure( 'acquire' ),
+        ):
+            mgtext = await _acquire(
+                auxdata, command, acquirer,
+                exits = exits if __.is_absent( parser ) else __.absent )
+        if not mgtext:
+            _scribe.error( "Cannot apply empty mimeogram." )
+            raise SystemExit( 1 )
+        with (
+            _exceptions.report_exceptions(
+                _scribe, "Could not parse mimeogram." ),
+            recorder.measure( 'parse' ),
+        ): parts = _parse( mgtext, parser, recorder )
+        recorder.increment( 'parts', len( parts ) )
+        with (
+            _exceptions.report_exceptions(
+                _scribe, "Could not apply mimeogram." ),
+            recorder.measure( 'update' ),
+        ):
+            await updater( auxdata, parts, review_mode, **nomargs )
     # TODO: If all parts ignored or inapplicable, then do not mention success.
     _scribe.info( "Successfully applied mimeogram" )
     raise SystemExit( 0 )
 
 
+async def apply_stream( # noqa: PLR0913
+    auxdata: __.appcore.state.Globals,
+    command: Command,
+    *,
+    acquirer: __.Absential[ ContentAcquirer ] = __.absent,
+    parser: __.Absential[
+        __.cabc.Callable[ [ str ], __.cabc.Sequence[ _parts.Part ] ]
+    ] = __.absent,
+    updater: __.Absential[
+        __.cabc.Callable[
+            [   __.appcore.state.Globals,
+                __.cabc.Sequence[ _parts.Part ],
+                _updaters.ReviewModes ],
+            __.cabc.Coroutine[ None, None, None ]
+        ]
+    ] = __.absent,
+    protector: __.Absential[ _fsprotect.Protector ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
+) -> __.typx.Never:
+    ''' Applies stream of mimeograms, each as transactional batch.
+
+        Parser, protector, and I/O backend are shared across batches.
+        Failure of a batch is reported and its updates are rolled back;
+        later batches are still applied. Exits with failure if any batch
+        failed.
+    '''
+    if __.is_absent( acquirer ):
+        acquirer = StandardContentAcquirer( )
+    if __.is_absent( parser ):
+        from .parsers import parse as parser
+    if __.is_absent( updater ):
+        from .updaters import update as updater
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    _validate_stream_options( auxdata, command )
+    if __.is_absent( protector ):
+        protector = _fsprotect.Cache.from_configuration( auxdata = auxdata )
+    nomargs: dict[ str, __.typx.Any ] = dict(
+        protector = protector,
+        backend = _iobackends.produce_backend( auxdata ),
+        recorder = recorder )
+    if command.base: nomargs[ 'base' ] = command.base
+    with __.ctxl.ExitStack( ) as exits:
+        if '-' == command.source: lines = acquirer.stream_stdin( )
+        else:
+            lines = exits.enter_context( open( # noqa: SIM115
+                command.source, encoding = 'utf-8', newline = '' ) )
+        failures = await _apply_frames(
+            auxdata, _produce_frames( lines, command.framing ),
+            command.framing,
+            parser = parser, updater = updater, nomargs = nomargs )
+    raise SystemExit( 1 if failures else 0 )
+
+
+async def _apply_frames( # noqa: PLR0913
+    auxdata: __.appcore.state.Globals,
+    frames: __.cabc.Iterator[ str ],
+    framing: StreamFramings,
+    *,
+    parser: __.cabc.Callable[ [ str ], __.cabc.Sequence[ _parts.Part ] ],
+    updater: __.cabc.Callable[ ..., __.cabc.Coroutine[ None, None, None ] ],
+    nomargs: __.cabc.Mapping[ str, __.typx.Any ],
+) -> int:
+    ''' Applies each frame of stream in turn. Returns count of failures. '''
+    recorder: _metrics.Recorder = nomargs[ 'recorder' ]
+    failures = 0
+    i = 0
+    while True:
+        # Reading frame may block on standard input; keep event loop free.
+        with recorder.measure( 'acquire' ):
+            frame = await __.asyncio.to_thread( next, frames, None )
+        if frame is None: break
+        i += 1
+        try:
+            mgtext = _decode_frame( frame, framing )
+            await _apply_text( auxdata, mgtext, parser, updater, nomargs )
+        except Exception:
+            _scribe.exception( f"Could not apply mimeogram {i}." )
+            failures += 1
+            continue
+        _scribe.info( f"Successfully applied mimeogram {i}." )
+    return failures
+
+
+async def _apply_text(
+    auxdata: __.appcore.state.Globals,
+    mgtext: str,
+    parser: __.cabc.Callable[ [ str ], __.cabc.Sequence[ _parts.Part ] ],
+    updater: __.cabc.Callable[ ..., __.cabc.Coroutine[ None, None, None ] ],
+    nomargs: __.cabc.Mapping[ str, __.typx.Any ],
+) -> None:
+    ''' Parses and applies one mimeogram of stream without review. '''
+    recorder: _metrics.Recorder = nomargs[ 'recorder' ]
+    recorder.increment( 'mimeograms' )
+    recorder.increment( 'mimeogram-characters', len( mgtext ) )
+    with recorder.measure( 'parse' ): parts = parser( mgtext )
+    recorder.increment( 'parts', len( parts ) )
+    with recorder.measure( 'update' ):
+        await updater(
+            auxdata, parts, _updaters.ReviewModes.Silent, **nomargs )
+
+
 async def _acquire(
     auxdata: __.appcore.state.Globals,
     cmd: Command,
     acquirer: ContentAcquirer,
-) -> str:
-    ''' Acquires content to parse from clipboard, file, or stdin. '''
+    exits: __.Absential[ __.ctxl.AsyncExitStack ] = __.absent,
+) -> str | _parts.Buffer:
+    ''' Acquires content to parse from clipboard, file, or stdin.
+
+        If exits are supplied, then content of file is not decoded and is
+        provided as raw buffer, which remains valid until exits are closed.
+    '''
     options = auxdata.configuration.get( 'apply', { } )
     if options.get( 'from-clipboard', False ):
         content = await acquirer.acquire_clipboard( )
@@ -207,7 +409,46 @@ async def _acquire(
         return content
     match cmd.source:
         case '-': return await acquirer.acquire_stdin( )
-        case _: return await acquirer.acquire_file( cmd.source )
+        case _:
+            if __.is_absent( exits ):
+                return await acquirer.acquire_file( cmd.source )
+            return await exits.enter_async_context(
+                acquirer.access_file_buffer( cmd.source ) )
+
+
+def _parse(
+    mgtext: str | _parts.Buffer,
+    parser: __.Absential[
+        __.cabc.Callable[ [ str ], __.cabc.Sequence[ _parts.Part ] ] ],
+    recorder: _metrics.Recorder,
+) -> __.cabc.Sequence[ _parts.Partlike ]:
+    ''' Parses mimeogram from text or raw buffer, recording its size.
+
+        Raw buffers are only acquired for default parser.
+    '''
+    from .parsers import parse, parse_mapped
+    if not isinstance( mgtext, str ):
+        recorder.increment( 'mimeogram-bytes', len( mgtext ) )
+        return parse_mapped( mgtext )
+    recorder.increment( 'mimeogram-characters', len( mgtext ) )
+    if __.is_absent( parser ): return parse( mgtext )
+    return parser( mgtext )
+
+
+def _decode_frame( frame: str, framing: StreamFramings ) -> str:
+    ''' Decodes mimeogram from frame of stream. '''
+    if StreamFramings.Ndjson is not framing: return frame
+    import json
+    from .exceptions import StreamFrameInvalidity
+    try: record = json.loads( frame )
+    except ValueError as exc:
+        raise StreamFrameInvalidity( str( exc ) ) from exc
+    if isinstance( record, dict ):
+        record = __.typx.cast( dict[ str, __.typx.Any ], record )
+        record = record.get( 'mimeogram' )
+    if not isinstance( record, str ):
+        raise StreamFrameInvalidity( reason = "No mimeogram in record." )
+    return record
 
 
 def _determine_review_mode(
@@ -221,3 +462,44 @@ def _determine_review_mode(
         _scribe.error( "Cannot use an interactive mode without terminal." )
         raise SystemExit( 1 )
     return command.mode
+
+
+def _produce_frames(
+    lines: __.cabc.Iterable[ str ], framing: StreamFramings
+) -> __.cabc.Iterator[ str ]:
+    ''' Produces frames of stream, skipping blank ones. '''
+    from .parsers import split_mimeograms
+    match framing:
+        case StreamFramings.Concatenated: frames = split_mimeograms( lines )
+        case StreamFramings.Nul: frames = _split_nul_frames( lines )
+        case StreamFramings.Ndjson: frames = iter( lines )
+    for frame in frames:
+        if frame and not frame.isspace( ): yield frame
+
+
+def _split_nul_frames(
+    lines: __.cabc.Iterable[ str ]
+) -> __.cabc.Iterator[ str ]:
+    ''' Splits stream on NUL characters. '''
+    pending: list[ str ] = [ ]
+    for line in lines:
+        *frames, rest = line.split( '\0' )
+        for frame in frames:
+            pending.append( frame )
+            yield ''.join( pending )
+            pending.clear( )
+        pending.append( rest )
+    yield ''.join( pending )
+
+
+def _validate_stream_options(
+    auxdata: __.appcore.state.Globals, command: Command
+) -> None:
+    ''' Rejects options which cannot apply to streams. '''
+    # Configured default of clipboard is irrelevant to streams.
+    if command.clip:
+        _scribe.error( "Cannot stream mimeograms from clipboard." )
+        raise SystemExit( 1 )
+    if command.mode not in ( None, _updaters.ReviewModes.Silent ):
+        _scribe.error( "Cannot review changes from stream interactively." )
+        raise SystemExit( 1 )
@@ -24,6 +24,7 @@
 from . import __
 from . import apply as _apply
 from . import create as _create
+from . import indexers as _indexers
 from . import interfaces as _interfaces
 from . import prompt as _prompt
 
@@ -83,6 +84,16 @@ class Cli(
             __.tyro.conf.subcommand(
                 'apply', prefix_name = False ),
         ],
+        __.typx.Annotated[
+            _indexers.IndexCommand,
+            __.tyro.conf.subcommand(
+                'index', prefix_name = False ),
+        ],
+        __.typx.Annotated[
+            _indexers.ExtractCommand,
+            __.tyro.conf.subcommand(
+                'extract', prefix_name = False ),
+        ],
         __.typx.Annotated[
             _prompt.Command,
             __.tyro.conf.subcommand(
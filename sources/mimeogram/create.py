@@ -25,12 +25,32 @@
 from . import __
 from . import exceptions as _exceptions
 from . import interfaces as _interfaces
+from . import metrics as _metrics
+from . import parts as _parts
 from . import tokenizers as _tokenizers
+from . import transformers as _transformers
 
 
 _scribe = __.produce_scribe( __name__ )
 
 
+TokenizerWarmup: __.typx.TypeAlias = __.asyncio.Task[ _tokenizers.Tokenizer ]
+
+
+# Tokenizers which can be produced without network services.
+# Providers from entry points may be backed by anything; never warmed up.
+_tokenizers_local = frozenset( (
+    _tokenizers.Tokenizers.Estimate.value,
+    _tokenizers.Tokenizers.Huggingface.value,
+    _tokenizers.Tokenizers.Tiktoken.value,
+) )
+# Tokenizers whose counts estimator is calibrated to approximate.
+_tokenizers_estimable = frozenset( (
+    _tokenizers.Tokenizers.Estimate.value,
+    _tokenizers.Tokenizers.Tiktoken.value,
+) )
+
+
 class Command(
     _interfaces.CliCommand,
     decorators = ( __.standard_tyro_class, ),
@@ -78,20 +98,138 @@ class Command(
         __.tyro.conf.arg( aliases = ( '--fail-on-invalid', ) ),
     ] = None
     tokenizer: __.typx.Annotated[
-        __.typx.Optional[ _tokenizers.Tokenizers ],
-        __.typx.Doc( ''' Which tokenizer to use for counting? ''' ),
+        __.typx.Optional[ str ],
+        __.typx.Doc(
+            ''' Which tokenizer to use for counting?
+
+                Built-in: 'tiktoken', 'estimate', 'anthropic-api',
+                'huggingface'. Others are provided by plugins.
+            ''' ),
     ] = None
     tokenizer_variant: __.typx.Annotated[
-        __.typx.Optional[ str ],
+        __.typx.Optional[ list[ str ] ],
         __.typx.Doc(
-            ''' Which tokenizer variant to use for counting?
+            ''' Which tokenizer variants to use for counting?
 
                 'tiktoken': 'cl100k_base', 'o200k_base', etc....
+                'estimate': 'cl100k_base' or 'o200k_base', per calibration.
 
                 Not all tokenizers have variants.
                 If not specified, then the default variant is used.
+                If several are specified, then tokens are counted with
+                each of them concurrently and first is primary.
+            ''' ),
+    ] = None
+    report_tokens: __.typx.Annotated[
+        bool,
+        __.typx.Doc(
+            ''' Report tokens of each part, per variant, heaviest first.
+
+                Report is written to standard error. Implies counting.
+            ''' ),
+    ] = False
+    changed_since: __.typx.Annotated[
+        __.typx.Optional[ str ],
+        __.typx.Doc(
+            ''' Only include files modified after this point.
+
+                ISO 8601 timestamp, seconds since the epoch, path of a
+                reference file (its modification time is used), or
+                'watermark' for the last recorded run in this directory.
+            ''' ),
+    ] = None
+    record_watermark: __.typx.Annotated[
+        __.tyro.conf.DisallowNone[ bool | None ],
+        __.typx.Doc(
+            ''' Record start of this run as watermark for this directory.
+
+                Use '--changed-since watermark' on later runs to include
+                only files modified since then.
             ''' ),
     ] = None
+    git_changed: __.typx.Annotated[
+        __.typx.Optional[ str ],
+        __.typx.Doc(
+            ''' Only include files changed relative to Git revision.
+
+                Modified, added, copied, and renamed files under current
+                directory are selected without traversing directories.
+                Sources limit the selection to files within them; files in
+                their subdirectories need recursion to be included.
+            ''' ),
+    ] = None
+    git_untracked: __.typx.Annotated[
+        bool,
+        __.typx.Doc(
+            ''' Include untracked, non-ignored files with Git changes. ''' ),
+    ] = False
+    transforms: __.typx.Annotated[
+        __.typx.Optional[ list[ _transformers.Transformers ] ],
+        __.typx.Doc(
+            ''' Transforms of contents, applied in order, to reduce tokens.
+
+                Characters, and tokens if counted, removed by each
+                transform are reported.
+            ''' ),
+    ] = None
+    since_mimeogram: __.typx.Annotated[
+        __.typx.Optional[ str ],
+        __.typx.Doc(
+            ''' Only include parts changed since previous mimeogram.
+
+                Path of previous mimeogram or of manifest written with
+                '--write-manifest'. Unchanged parts are listed, with their
+                digests, in a manifest part instead of being included.
+            ''' ),
+    ] = None
+    write_manifest: __.typx.Annotated[
+        __.typx.Optional[ str ],
+        __.typx.Doc(
+            ''' Write manifest of part digests to path.
+
+                Manifest can be used with '--since-mimeogram' on later
+                runs, when previous mimeogram itself is not kept.
+            ''' ),
+    ] = None
+    split_tokens: __.typx.Annotated[
+        __.typx.Optional[ int ],
+        __.typx.Doc(
+            ''' Split into several mimeograms under this many tokens each.
+
+                Parts from same directory are kept together, where they
+                fit. Files too large for one mimeogram are split into
+                ranges of lines. With '--output', mimeograms are written to
+                numbered files. With clipboard, they are copied in turn,
+                after confirmation. Tokens of each part are counted once.
+            ''' ),
+    ] = None
+    token_budget: __.typx.Annotated[
+        __.typx.Optional[ int ],
+        __.typx.Doc(
+            ''' Check mimeogram against budget of this many tokens.
+
+                Tokens are estimated first and are only counted exactly
+                when budget lies within confidence interval of estimate.
+                Warns if budget is exceeded. Takes precedence over
+                '--count-tokens'.
+            ''' ),
+    ] = None
+    stats_json: __.typx.Annotated[
+        __.typx.Optional[ str ],
+        __.typx.Doc(
+            ''' Write per-stage timings and counters as JSON to path. ''' ),
+    ] = None
+    output: __.typx.Annotated[
+        __.typx.Optional[ str ],
+        __.typx.Doc(
+            ''' Write mimeogram to path, or '-' for stdout, as formatted.
+
+                Parts are written one at a time rather than assembled in
+                memory first. Takes precedence over clipboard. Tokens, if
+                counted, are counted per part, in parallel, and summed.
+            ''' ),
+        __.tyro.conf.arg( aliases = ( '-o', ) ),
+    ] = None
     deterministic_boundary: __.typx.Annotated[
         __.tyro.conf.DisallowNone[ bool | None ],
         __.typx.Doc(
@@ -108,7 +246,8 @@ class Command(
         self, auxdata: __.appcore.state.Globals
     ) -> None:
         ''' Executes command to create mimeogram. '''
-        await create( auxdata, self )
+        with _metrics.recording( 'create', self.stats_json ) as recorder:
+            await create( auxdata, self, recorder = recorder )
 
     def provide_configuration_edits(
         self,
@@ -142,6 +281,14 @@ class Command(
             edits.append( __.appcore.dictedits.SimpleEdit( # pyright: ignore
                 address = ( 'create', 'deterministic-boundary' ),
                 value = self.deterministic_boundary ) )
+        if self.transforms is not None:
+            names = [ transform.value for transform in self.transforms ]
+            edits.append( __.appcore.dictedits.SimpleEdit( # pyright: ignore
+                address = ( 'transform-parts', 'enable' ), value = names ) )
+        if None is not self.record_watermark:
+            edits.append( __.appcore.dictedits.SimpleEdit( # pyright: ignore
+                address = ( 'create', 'record-watermark' ),
+                value = self.record_watermark ) )
         return tuple( edits )
 
 
@@ -152,6 +299,14 @@ async def _acquire_prompt(
     return await acquire_prompt( auxdata )
 
 
+async def _await_confirmation( prompt: str ) -> None:
+    from .exceptions import UserOperateCancellation
+    try: await __.asyncio.to_thread( input, prompt )
+    except ( EOFError, KeyboardInterrupt ) as exc:
+        print( ) # Add newline to avoid output mangling.
+        raise UserOperateCancellation( exc ) from exc
+
+
 async def _copy_to_clipboard( mimeogram: str ) -> None:
     from . import clipboard
     clipboard.copy_to_clipboard( mimeogram )
@@ -163,7 +318,7 @@ async def _edit_message( ) -> str:
     return edit_content( )
 
 
-async def create(
+async def create( # noqa: PLR0913,PLR0915
     auxdata: __.appcore.state.Globals,
     command: Command,
     *,
@@ -177,53 +332,665 @@ async def create(
         [ __.appcore.state.Globals ],
         __.cabc.Coroutine[ None, None, str ]
     ] = _acquire_prompt,
+    pauser: __.cabc.Callable[
+        [ str ], __.cabc.Coroutine[ None, None, None ]
+    ] = _await_confirmation,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
 ) -> __.typx.Never:
     ''' Creates mimeogram. '''
-    from .acquirers import acquire
-    from .formatters import format_mimeogram
-    with _exceptions.report_exceptions(
-        _scribe, "Could not acquire mimeogram parts."
-    ): parts = await acquire( auxdata, command.sources )
-    if command.edit:
-        with _exceptions.report_exceptions(
-            _scribe, "Could not acquire user message."
-        ): message = await editor( )
-    else: message = None
+    from .formatters import format_mimeogram_segments
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    started = __.time.time_ns( )
+    warmup = _start_tokenizer_warmup( auxdata, command )
+    with recorder.measure( 'acquire' ):
+        parts = await _acquire_parts( auxdata, command, recorder )
+    with recorder.measure( 'transform' ):
+        parts = await _transform_parts(
+            auxdata, command, parts, recorder, warmup = warmup )
     options = auxdata.configuration.get( 'create', { } )
     deterministic_boundary = (
         command.deterministic_boundary
         if command.deterministic_boundary is not None
         else options.get( 'deterministic-boundary', False ) )
-    mimeogram = format_mimeogram(
-        parts, message = message,
-        deterministic_boundary = deterministic_boundary )
-    # TODO? Pass prompt to 'format_mimeogram'.
-    if command.prepend_prompt:
-        prompt = await prompter( auxdata )
-        mimeogram = f"{prompt}\n\n{mimeogram}"
-    if options.get( 'count-tokens', False ):
+    parts = _digest_parts( command, parts, deterministic_boundary, recorder )
+    with recorder.measure( 'delta' ):
+        parts = _select_changed_parts( command, parts, recorder )
+    if command.edit:
         with _exceptions.report_exceptions(
-            _scribe, "Could not count mimeogram tokens."
+            _scribe, "Could not acquire user message."
+        ): message = await editor( )
+    else: message = None
+    if command.split_tokens is not None:
+        await _split_mimeogram(
+            auxdata, command, parts,
+            message = message,
+            deterministic_boundary = deterministic_boundary,
+            clipcopier = clipcopier,
+            pauser = pauser,
+            prompter = prompter,
+            recorder = recorder,
+            warmup = warmup )
+    elif command.output is not None:
+        await _write_mimeogram(
+            auxdata, command, parts,
+            message = message,
+            deterministic_boundary = deterministic_boundary,
+            prompter = prompter,
+            recorder = recorder,
+            warmup = warmup )
+    else:
+        with (
+            _exceptions.report_exceptions(
+                _scribe, "Could not format mimeogram." ),
+            recorder.measure( 'format' ),
         ):
-            tokenizer = await _tokenizer_from_command( auxdata, command )
-            tokens_count = await tokenizer.count( mimeogram )
-            _scribe.info( f"Total mimeogram size is {tokens_count} tokens." )
-    if options.get( 'to-clipboard', False ):
+            segments = tuple( format_mimeogram_segments(
+                parts, message = message,
+                deterministic_boundary = deterministic_boundary ) )
+        # TODO? Pass prompt to 'format_mimeogram'.
+        if command.prepend_prompt:
+            prompt = await prompter( auxdata )
+            segments = ( f"{prompt}\n\n", *segments )
+        mimeogram = ''.join( segments )
+        recorder.increment( 'mimeogram-characters', len( mimeogram ) )
+        if await _needs_exact_count( auxdata, command, segments, recorder ):
+            await _count_tokens(
+                auxdata, command, parts, segments,
+                recorder = recorder, warmup = warmup )
+        with recorder.measure( 'emit' ):
+            if options.get( 'to-clipboard', False ):
+                with _exceptions.report_exceptions(
+                    _scribe, "Could not copy mimeogram to clipboard."
+                ): await clipcopier( mimeogram )
+            else: print( mimeogram )
+    if options.get( 'record-watermark', False ):
+        _record_watermark( auxdata, started )
+    raise SystemExit( 0 )
+
+
+async def _acquire_parts(
+    auxdata: __.appcore.state.Globals,
+    command: Command,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
+) -> __.cabc.Sequence[ _parts.Part ]:
+    ''' Acquires parts, possibly only changed ones, from sources. '''
+    from .acquirers import acquire
+    with _exceptions.report_exceptions(
+        _scribe, "Could not acquire mimeogram parts."
+    ):
+        changed_since = _resolve_changed_since(
+            auxdata, command.changed_since )
+        selection = await _collect_git_changes( command )
+        return await acquire(
+            auxdata, command.sources,
+            changed_since = changed_since, selection = selection,
+            recorder = recorder )
+
+
+async def _count_tokens( # noqa: PLR0913
+    auxdata: __.appcore.state.Globals,
+    command: Command,
+    parts: __.cabc.Sequence[ _parts.Part ],
+    segments: __.cabc.Sequence[ str ],
+    *,
+    recorder: _metrics.Recorder,
+    warmup: __.Absential[ TokenizerWarmup ] = __.absent,
+) -> None:
+    ''' Counts tokens of mimeogram with each variant, concurrently.
+
+        First variant is primary; its count is recorded and checked against
+        token budget. Tokens of each part are reported, if requested.
+    '''
+    with _exceptions.report_exceptions(
+        _scribe, "Could not count mimeogram tokens."
+    ):
+        with recorder.measure( 'tokenize' ):
+            tokenizers = await _tokenizers_from_command(
+                auxdata, command, warmup = warmup )
+        with __.ctxl.ExitStack( ) as exits:
+            caches = [
+                exits.enter_context(
+                    _provide_counts_cache( auxdata, tokenizer ) )
+                for tokenizer in tokenizers ]
+            totals = await __.asyncio.gather( *(
+                _tokenizers.count_segments(
+                    tokenizer, segments, cache = cache, recorder = recorder )
+                for tokenizer, cache in zip( tokenizers, caches ) ) )
+            if command.report_tokens:
+                contents = [ part.content for part in parts ]
+                counts = await __.asyncio.gather( *(
+                    _tokenizers.count_texts(
+                        tokenizer, contents,
+                        cache = cache, recorder = recorder )
+                    for tokenizer, cache in zip( tokenizers, caches ) ) )
+                _report_part_tokens( parts, tokenizers, counts )
+    for tokenizer, total in zip( tokenizers, totals ):
+        suffix = (
+            f" with '{tokenizer.variant}'" if len( tokenizers ) > 1 else '' )
+        _scribe.info( f"Total mimeogram size is {total} tokens{suffix}." )
+    recorder.increment( 'tokens', totals[ 0 ] )
+    _report_token_budget( command, totals[ 0 ] )
+
+
+def _emit_segments(
+    stream: __.typx.TextIO,
+    segments: __.cabc.Iterable[ str ],
+    recorder: _metrics.Recorder,
+) -> None:
+    ''' Writes segments to stream, one at a time. '''
+    for segment in segments:
+        with recorder.measure( 'emit' ): stream.write( segment )
+        recorder.increment( 'mimeogram-characters', len( segment ) )
+
+
+async def _emit_numbered_mimeogram( # noqa: PLR0913
+    auxdata: __.appcore.state.Globals,
+    command: Command,
+    mimeogram: str,
+    *,
+    number: int,
+    total: int,
+    clipcopier: __.cabc.Callable[
+        [ str ], __.cabc.Coroutine[ None, None, None ]
+    ],
+    pauser: __.cabc.Callable[
+        [ str ], __.cabc.Coroutine[ None, None, None ]
+    ],
+) -> None:
+    ''' Emits one of several mimeograms to file, clipboard, or stdout. '''
+    options = auxdata.configuration.get( 'create', { } )
+    if command.output is not None:
+        output = _number_output( command.output, number )
+        with (
+            _exceptions.report_exceptions(
+                _scribe, f"Could not write mimeogram to '{output}'." ),
+            _open_output( output ) as stream,
+        ): stream.write( f"{mimeogram}\n" )
+    elif options.get( 'to-clipboard', False ):
+        if number > 1:
+            await pauser(
+                f"Press Enter to copy mimeogram {number} of {total}. " )
         with _exceptions.report_exceptions(
             _scribe, "Could not copy mimeogram to clipboard."
         ): await clipcopier( mimeogram )
     else: print( mimeogram )
-    raise SystemExit( 0 )
+
+
+async def _needs_exact_count(
+    auxdata: __.appcore.state.Globals,
+    command: Command,
+    segments: __.cabc.Sequence[ str ],
+    recorder: _metrics.Recorder,
+) -> bool:
+    ''' Determines whether tokens of mimeogram should be counted exactly.
+
+        With token budget, tokens are estimated first and are counted
+        exactly only if budget lies within interval of estimate. Estimates
+        are calibrated against Tiktoken encodings only, so tokens from
+        other tokenizers are always counted exactly.
+    '''
+    options = auxdata.configuration.get( 'create', { } )
+    budget = command.token_budget
+    if command.report_tokens: return True
+    if budget is None: return options.get( 'count-tokens', False )
+    name = _tokenizer_name_from_command( auxdata, command )
+    if name not in _tokenizers_estimable: return True
+    variant = (
+        command.tokenizer_variant[ 0 ] if command.tokenizer_variant
+        else None )
+    estimator = await _tokenizers.Estimator.from_variant(
+        variant if variant and variant in _tokenizers.estimator_calibrations
+        else __.absent )
+    with recorder.measure( 'estimate' ):
+        estimate = estimator.estimate( *segments )
+    recorder.increment( 'tokens-estimated', estimate.tokens )
+    _scribe.info(
+        f"Estimated mimeogram size is {estimate.tokens} tokens, "
+        f"between {estimate.low} and {estimate.high}." )
+    if estimate.low <= budget < estimate.high: return True
+    _report_token_budget( command, estimate.tokens )
+    return False
+
+
+def _number_output( output: str, number: int ) -> str:
+    ''' Numbers output file, such as 'bundle.2.mimeogram'. '''
+    if '-' == output: return output
+    location = __.Path( output )
+    return str( location.with_name(
+        f"{location.stem}.{number}{location.suffix}" ) )
+
+
+@__.ctxl.contextmanager
+def _open_output( output: str ) -> __.cabc.Iterator[ __.typx.TextIO ]:
+    ''' Opens output file for writing, or provides stdout for '-'. '''
+    if '-' == output:
+        yield __.sys.stdout
+        __.sys.stdout.flush( )
+        return
+    with open( output, 'w', encoding = 'utf-8', newline = '' ) as stream:
+        yield stream
+
+
+async def _collect_git_changes(
+    command: Command
+) -> __.Absential[ __.cabc.Sequence[ __.Path ] ]:
+    ''' Collects files changed relative to Git revision, if requested. '''
+    if command.git_changed is None: return __.absent
+    from .vcs import collect_git_changes
+    locations = await collect_git_changes(
+        command.git_changed, untracked = command.git_untracked )
+    _scribe.debug( f"Git reports {len( locations )} changed files." )
+    return locations
+
+
+@__.ctxl.contextmanager
+def _provide_counts_cache(
+    auxdata: __.appcore.state.Globals,
+    tokenizer: __.Absential[ _tokenizers.Tokenizer ],
+) -> __.cabc.Iterator[ __.Absential[ _tokenizers.CountsCache ] ]:
+    ''' Provides cache of token counts, if enabled, closing it after use.
+
+        Cache which cannot be opened is skipped with warning.
+    '''
+    options = auxdata.configuration.get( 'tokenizers', { } )
+    if __.is_absent( tokenizer ) or not options.get( 'cache', False ):
+        yield __.absent
+        return
+    location = auxdata.provide_cache_location( 'tokens.sqlite3' )
+    try:
+        cache = _tokenizers.CountsCache.from_location(
+            location,
+            tokenizer = type( tokenizer ).__name__,
+            variant = tokenizer.variant,
+            capacity = options.get( 'cache-capacity', 100_000 ) )
+    except ( OSError, __.sqlite3.Error ) as exc:
+        _scribe.warning( f"Could not open token counts cache: {exc}" )
+        yield __.absent
+        return
+    try: yield cache
+    finally: cache.close( )
+
+
+def _provide_watermark_location(
+    auxdata: __.appcore.state.Globals
+) -> __.Path:
+    ''' Provides location of watermark for current working directory. '''
+    directory = str( __.Path.cwd( ).resolve( ) )
+    key = __.hashlib.sha256( directory.encode( 'utf-8' ) ).hexdigest( )
+    return auxdata.provide_cache_location( 'watermarks', key[ : 32 ] )
+
+
+def _acquire_watermark(
+    auxdata: __.appcore.state.Globals
+) -> __.Absential[ int ]:
+    ''' Acquires recorded watermark, if any, for current directory. '''
+    location = _provide_watermark_location( auxdata )
+    try: return int( location.read_text( ).strip( ) )
+    except ( OSError, ValueError ): return __.absent
+
+
+def _record_watermark(
+    auxdata: __.appcore.state.Globals, watermark: int
+) -> None:
+    ''' Records watermark, as nanoseconds since epoch, for directory. '''
+    location = _provide_watermark_location( auxdata )
+    try:
+        location.parent.mkdir( parents = True, exist_ok = True )
+        location.write_text( f"{watermark}\n" )
+    except OSError as exc:
+        _scribe.warning( f"Could not record watermark. Cause: {exc}" )
+        return
+    _scribe.debug( f"Recorded watermark {watermark} at '{location}'." )
+
+
+def _report_part_tokens(
+    parts: __.cabc.Sequence[ _parts.Part ],
+    tokenizers: __.cabc.Sequence[ _tokenizers.Tokenizer ],
+    counts: __.cabc.Sequence[ __.cabc.Sequence[ int ] ],
+) -> None:
+    ''' Prints tokens of each part per variant, heaviest parts first. '''
+    variants = [ tokenizer.variant for tokenizer in tokenizers ]
+    width = max( 10, *map( len, variants ) )
+    rows = sorted(
+        zip( ( part.location for part in parts ), zip( *counts ) ),
+        key = lambda row: row[ 1 ][ 0 ], reverse = True )
+    lines = [ '  '.join( f"{variant:>{width}}" for variant in variants ) ]
+    lines[ 0 ] += '  Location'
+    lines.extend(
+        '  '.join( f"{count:>{width}}" for count in row_counts )
+        + f"  {location}" for location, row_counts in rows )
+    print( '\n'.join( lines ), file = __.sys.stderr )
+
+
+def _report_token_budget( command: Command, tokens_count: int ) -> None:
+    ''' Reports whether mimeogram fits within token budget, if any. '''
+    budget = command.token_budget
+    if budget is None: return
+    if tokens_count > budget:
+        _scribe.warning(
+            f"Mimeogram exceeds token budget of {budget} "
+            f"by {tokens_count - budget} tokens." )
+    else: _scribe.info( f"Mimeogram fits within token budget of {budget}." )
+
+
+def _resolve_changed_since(
+    auxdata: __.appcore.state.Globals,
+    specification: __.typx.Optional[ str ],
+) -> __.Absential[ int ]:
+    ''' Resolves modification threshold, in nanoseconds since epoch. '''
+    if specification is None: return __.absent
+    if 'watermark' == specification:
+        watermark = _acquire_watermark( auxdata )
+        if __.is_absent( watermark ):
+            _scribe.warning( "No watermark recorded. Including all files." )
+        return watermark
+    location = __.Path( specification )
+    if location.exists( ): return location.stat( ).st_mtime_ns
+    try: return round( float( specification ) * 1_000_000 ) * 1000
+    except ValueError: pass
+    from datetime import datetime
+    # Note: Python 3.10 does not accept 'Z' suffix for UTC.
+    if specification.endswith( ( 'Z', 'z' ) ):
+        specification = f"{specification[ : -1 ]}+00:00"
+    try: moment = datetime.fromisoformat( specification )
+    except ValueError as exc:
+        raise _exceptions.TimestampInvalidity( specification ) from exc
+    return round( moment.timestamp( ) * 1_000_000 ) * 1000
+
+
+def _digest_parts(
+    command: Command,
+    parts: __.cabc.Sequence[ _parts.Part ],
+    deterministic_boundary: bool,
+    recorder: _metrics.Recorder,
+) -> __.cabc.Sequence[ _parts.Part ]:
+    ''' Computes digests of parts, if boundary or manifests use them.
+
+        Digests are computed once and retained on parts, so that manifests
+        and deterministic boundary share them. Otherwise, content is not
+        hashed at all.
+    '''
+    if not (
+        deterministic_boundary
+        or command.since_mimeogram is not None
+        or command.write_manifest is not None
+    ): return parts
+    with recorder.measure( 'digest' ):
+        return tuple(
+            __.dcls.replace( part, digest = _parts.calculate_digest( part ) )
+            for part in parts )
+
+
+def _select_changed_parts(
+    command: Command,
+    parts: __.cabc.Sequence[ _parts.Part ],
+    recorder: _metrics.Recorder,
+) -> __.cabc.Sequence[ _parts.Part ]:
+    ''' Writes manifest and omits unchanged parts, if requested. '''
+    if command.since_mimeogram is None and command.write_manifest is None:
+        return parts
+    from . import manifests as _manifests
+    if command.write_manifest is not None:
+        with _exceptions.report_exceptions(
+            _scribe, "Could not write manifest."
+        ):
+            __.Path( command.write_manifest ).write_text(
+                _manifests.format_manifest(
+                    _manifests.produce_manifest( parts ),
+                    comment = '# Digests of mimeogram parts. SHA-256.' ),
+                encoding = 'utf-8' )
+    if command.since_mimeogram is None: return parts
+    with _exceptions.report_exceptions(
+        _scribe, "Could not acquire previous mimeogram."
+    ):
+        digests = _manifests.acquire_manifest(
+            __.Path( command.since_mimeogram ) )
+    changed, unchanged = _manifests.select_changed_parts( parts, digests )
+    recorder.increment( 'parts-unchanged', len( unchanged ) )
+    _scribe.info(
+        f"Omitting {len( unchanged )} unchanged parts. "
+        f"Including {len( changed )} changed parts." )
+    if not unchanged: return changed
+    return ( _manifests.produce_manifest_part( unchanged ), *changed )
+
+
+def _start_tokenizer_warmup(
+    auxdata: __.appcore.state.Globals, command: Command
+) -> __.Absential[ TokenizerWarmup ]:
+    ''' Starts producing tokenizer in background, if tokens may be counted.
+
+        Loading of encodings thus overlaps acquisition of parts rather
+        than delaying counting afterwards. Failures are reported when, and
+        if, tokenizer is awaited.
+    '''
+    options = auxdata.configuration.get( 'create', { } )
+    if not (
+        options.get( 'count-tokens', False )
+        or command.report_tokens
+        or command.split_tokens is not None
+        or command.token_budget is not None
+    ): return __.absent
+    # Tokenizers backed by services are not contacted speculatively.
+    name = _tokenizer_name_from_command( auxdata, command )
+    if name not in _tokenizers_local: return __.absent
+    warmup = __.asyncio.create_task(
+        _tokenizer_from_command( auxdata, command ) )
+    # Retrieve any failure, so that unawaited failure is not logged.
+    warmup.add_done_callback(
+        lambda task: task.cancelled( ) or task.exception( ) )
+    # Cancel on exit, if tokens were never counted.
+    auxdata.exits.push_async_callback( _stop_tokenizer_warmup, warmup )
+    return warmup
+
+
+async def _stop_tokenizer_warmup( warmup: TokenizerWarmup ) -> None:
+    ''' Cancels tokenizer warmup, if unfinished, and waits for it. '''
+    if warmup.done( ): return
+    warmup.cancel( )
+    # Wait without raising, so that cancellation of caller is preserved.
+    await __.asyncio.wait( ( warmup, ) )
+
+
+_split_boundary_digits = __.hashlib.sha256(
+    b'mimeogram split boundary' ).hexdigest( )
+async def _split_mimeogram( # noqa: PLR0913
+    auxdata: __.appcore.state.Globals,
+    command: Command,
+    parts: __.cabc.Sequence[ _parts.Part ],
+    *,
+    message: __.typx.Optional[ str ],
+    deterministic_boundary: bool,
+    clipcopier: __.cabc.Callable[
+        [ str ], __.cabc.Coroutine[ None, None, None ]
+    ],
+    pauser: __.cabc.Callable[
+        [ str ], __.cabc.Coroutine[ None, None, None ]
+    ],
+    prompter: __.cabc.Callable[
+        [ __.appcore.state.Globals ],
+        __.cabc.Coroutine[ None, None, str ]
+    ],
+    recorder: _metrics.Recorder,
+    warmup: __.Absential[ TokenizerWarmup ] = __.absent,
+) -> None:
+    ''' Packs parts into mimeograms under token ceiling and emits them. '''
+    from .formatters import format_mimeogram
+    from .splitters import measure_parts, pack_measurements
+    ceiling = __.typx.cast( int, command.split_tokens )
+    prefix = (
+        f"{await prompter( auxdata )}\n\n" if command.prepend_prompt
+        else '' )
+    # Actual boundaries are not known until parts are packed. Counts are
+    # taken with fixed placeholder of same length and of similar hex
+    # digits instead, so they are approximate by few tokens per part but
+    # same across runs and thus retrievable from cache of counts.
+    boundary = "====MIMEOGRAM_{digits}====".format(
+        digits = _split_boundary_digits[
+            : 64 if deterministic_boundary else 32 ] )
+    frame = (
+        format_mimeogram(
+            ( ), message = message,
+            deterministic_boundary = deterministic_boundary )
+        if message else f"--{boundary}--" )
+    with (
+        _exceptions.report_exceptions(
+            _scribe, "Could not count mimeogram tokens." ),
+        recorder.measure( 'tokenize' ),
+    ):
+        tokenizer = await _tokenizer_from_command(
+            auxdata, command, warmup = warmup )
+        overhead = await tokenizer.count( f"{prefix}{frame}\n" )
+    with (
+        _exceptions.report_exceptions( _scribe, "Could not split mimeogram." ),
+        _provide_counts_cache( auxdata, tokenizer ) as cache,
+    ):
+        if ceiling <= overhead:
+            raise _exceptions.TokenCeilingInvalidity( ceiling, overhead )
+        measurements = await measure_parts(
+            parts, tokenizer, boundary, ceiling - overhead,
+            cache = cache, recorder = recorder )
+    bins = pack_measurements( measurements, ceiling - overhead ) or ( ( ), )
+    for number, bin_ in enumerate( bins, start = 1 ):
+        with (
+            _exceptions.report_exceptions(
+                _scribe, "Could not format mimeogram." ),
+            recorder.measure( 'format' ),
+        ):
+            mimeogram = prefix + format_mimeogram(
+                [ measurement.part for measurement in bin_ ],
+                message = message,
+                deterministic_boundary = deterministic_boundary )
+        tokens_count = overhead + sum(
+            measurement.tokens for measurement in bin_ )
+        _scribe.info(
+            f"Mimeogram {number} of {len( bins )} "
+            f"is about {tokens_count} tokens." )
+        recorder.increment( 'mimeograms' )
+        recorder.increment( 'mimeogram-characters', len( mimeogram ) )
+        recorder.increment( 'tokens', tokens_count )
+        with recorder.measure( 'emit' ):
+            await _emit_numbered_mimeogram(
+                auxdata, command, mimeogram,
+                number = number, total = len( bins ),
+                clipcopier = clipcopier, pauser = pauser )
 
 
 async def _tokenizer_from_command(
     auxdata: __.appcore.state.Globals,
     command: Command,
+    warmup: __.Absential[ TokenizerWarmup ] = __.absent,
+    variant: __.Absential[ str ] = __.absent,
 ) -> _tokenizers.Tokenizer:
+    ''' Produces tokenizer for variant, primary variant by default.
+
+        Warmup, if any, is only used for primary variant.
+    '''
+    primary: __.Absential[ str ] = (
+        command.tokenizer_variant[ 0 ] if command.tokenizer_variant
+        else __.absent )
+    if __.is_absent( variant ): variant = primary
+    if not __.is_absent( warmup ) and variant == primary:
+        return await warmup
+    options = auxdata.configuration.get( 'tokenizers', { } )
+    name = _tokenizer_name_from_command( auxdata, command )
+    args = { } if __.is_absent( variant ) else dict( variant = variant )
+    # Preprocessed encodings: pre-seeded by user, then shipped.
+    locations = (
+        auxdata.provide_data_location( 'encodings' ),
+        auxdata.distribution.provide_data_location( 'encodings' ) )
+    return await _tokenizers.Tokenizers.produce(
+        name,
+        locations = locations,
+        options = options.get( name, { } ),
+        exits = auxdata.exits,
+        **args )
+
+
+def _tokenizer_name_from_command(
+    auxdata: __.appcore.state.Globals, command: Command
+) -> str:
+    ''' Determines tokenizer name from command or configuration. '''
     options = auxdata.configuration.get( 'tokenizers', { } )
-    name = (
-        command.tokenizer.value if command.tokenizer
-        else options.get( 'default', 'tiktoken' ) )
-    variant = command.tokenizer_variant
-    args = dict( variant = variant ) if variant else { }
-    return await _tokenizers.Tokenizers.produce( name, **args )
+    return command.tokenizer or options.get( 'default', 'tiktoken' )
+
+
+async def _tokenizers_from_command(
+    auxdata: __.appcore.state.Globals,
+    command: Command,
+    warmup: __.Absential[ TokenizerWarmup ] = __.absent,
+) -> tuple[ _tokenizers.Tokenizer, ... ]:
+    ''' Produces tokenizers for each requested variant, concurrently. '''
+    variants = ( command.tokenizer_variant or [ ] )[ 1 : ]
+    return tuple( await __.asyncio.gather(
+        _tokenizer_from_command( auxdata, command, warmup = warmup ),
+        *(  _tokenizer_from_command( auxdata, command, variant = variant )
+            for variant in variants ) ) )
+
+
+async def _transform_parts(
+    auxdata: __.appcore.state.Globals,
+    command: Command,
+    parts: __.cabc.Sequence[ _parts.Part ],
+    recorder: _metrics.Recorder,
+    warmup: __.Absential[ TokenizerWarmup ] = __.absent,
+) -> __.cabc.Sequence[ _parts.Part ]:
+    ''' Applies configured transforms to contents of parts. '''
+    names = auxdata.configuration.get(
+        'transform-parts', { } ).get( 'enable', [ ] )
+    if not names: return parts
+    options = auxdata.configuration.get( 'create', { } )
+    with _exceptions.report_exceptions(
+        _scribe, "Could not transform mimeogram parts."
+    ):
+        transformers = {
+            name: _transformers.Transformers( name ).produce( auxdata )
+            for name in names }
+        tokenizer: __.Absential[ _tokenizers.Tokenizer ] = __.absent
+        if options.get( 'count-tokens', False ):
+            tokenizer = await _tokenizer_from_command(
+                auxdata, command, warmup = warmup )
+        with _provide_counts_cache( auxdata, tokenizer ) as cache:
+            return await _transformers.transform_parts(
+                parts, transformers,
+                tokenizer = tokenizer, cache = cache, recorder = recorder )
+
+
+async def _write_mimeogram( # noqa: PLR0913
+    auxdata: __.appcore.state.Globals,
+    command: Command,
+    parts: __.cabc.Sequence[ _parts.Part ],
+    *,
+    message: __.typx.Optional[ str ],
+    deterministic_boundary: bool,
+    prompter: __.cabc.Callable[
+        [ __.appcore.state.Globals ],
+        __.cabc.Coroutine[ None, None, str ]
+    ],
+    recorder: _metrics.Recorder,
+    warmup: __.Absential[ TokenizerWarmup ] = __.absent,
+) -> None:
+    ''' Writes mimeogram to output, segment by segment. '''
+    from .formatters import format_mimeogram_segments
+    with (
+        _exceptions.report_exceptions(
+            _scribe, "Could not format mimeogram." ),
+        recorder.measure( 'format' ),
+    ):
+        formatted = format_mimeogram_segments(
+            parts, message = message,
+            deterministic_boundary = deterministic_boundary )
+    prefix = (
+        f"{await prompter( auxdata )}\n\n" if command.prepend_prompt
+        else '' )
+    # Segments only refer to contents of parts, which are not copied.
+    segments = ( prefix, *formatted, '\n' )
+    output = __.typx.cast( str, command.output )
+    with (
+        _exceptions.report_exceptions(
+            _scribe, f"Could not write mimeogram to '{output}'." ),
+        _open_output( output ) as stream,
+    ): _emit_segments( stream, segments, recorder )
+    if await _needs_exact_count( auxdata, command, segments, recorder ):
+        await _count_tokens(
+            auxdata, command, parts, segments,
+            recorder = recorder, warmup = warmup )
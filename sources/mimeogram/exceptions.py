@@ -74,6 +74,15 @@ class EditorFailure( Omnierror ):
         super( ).__init__( f"Could not edit content. Cause: {cause}" )
 
 
+class IoBackendInvalidity( Omnierror ):
+    ''' Invalid I/O backend. '''
+
+    def __init__( self, name: str, choices: __.cabc.Sequence[ str ] ):
+        valid = ', '.join( f"'{choice}'" for choice in choices )
+        super( ).__init__(
+            f"Invalid I/O backend '{name}'. Valid backends: {valid}" )
+
+
 class LocationInvalidity( Omnierror ):
     ''' Invalid location. '''
 
@@ -81,6 +90,14 @@ class LocationInvalidity( Omnierror ):
         super( ).__init__( f"Invalid location '{location}'." )
 
 
+class ManifestInvalidity( Omnierror ):
+    ''' Invalid manifest of part digests. '''
+
+    def __init__( self, location: str | __.Path, reason: str ):
+        super( ).__init__(
+            f"Invalid manifest at '{location}'. Reason: {reason}" )
+
+
 class MimeogramFormatEmpty( Omnierror ):
     ''' Attempt to format empty mimeogram. '''
 
@@ -88,6 +105,14 @@ class MimeogramFormatEmpty( Omnierror ):
         super( ).__init__( "Cannot format empty mimeogram." )
 
 
+class MimeogramIndexInvalidity( Omnierror ):
+    ''' Invalid or inconsistent index of mimeogram file. '''
+
+    def __init__( self, location: str | __.Path, reason: str ):
+        super( ).__init__(
+            f"Invalid index for mimeogram at '{location}'. Reason: {reason}" )
+
+
 class MimeogramParseFailure( Omnierror ):
     ''' Failure to parse mimeogram content. '''
 
@@ -109,6 +134,14 @@ class ProgramAbsenceError( Omnierror ):
         super( ).__init__( f"Could not discover valid {species}." )
 
 
+class StreamFrameInvalidity( Omnierror ):
+    ''' Invalid frame in stream of mimeograms. '''
+
+    def __init__( self, reason: str ):
+        super( ).__init__(
+            f"Invalid frame in mimeogram stream. Reason: {reason}" )
+
+
 class TextualMimetypeInvalidity( Omnierror ):
     ''' Invalid textual MIME type for content at location. '''
 
@@ -117,6 +150,47 @@ class TextualMimetypeInvalidity( Omnierror ):
             f"Invalid MIME type '{mimetype}' for content at '{location}'." )
 
 
+class TimestampInvalidity( Omnierror ):
+    ''' Invalid timestamp or reference file. '''
+
+    def __init__( self, specification: str ):
+        super( ).__init__(
+            f"Invalid timestamp or reference file '{specification}'." )
+
+
+class TokenCeilingInvalidity( Omnierror ):
+    ''' Token ceiling too low for mimeogram framing. '''
+
+    def __init__( self, ceiling: int, overhead: int ):
+        super( ).__init__(
+            f"Token ceiling of {ceiling} does not exceed {overhead} tokens "
+            "needed for prompt, message, and boundaries." )
+
+
+class TokenizerEncodingInvalidity( Omnierror ):
+    ''' Invalid preprocessed tokenizer encoding. '''
+
+    def __init__( self, location: str | __.Path, reason: str ):
+        super( ).__init__(
+            f"Invalid tokenizer encoding at '{location}'. Reason: {reason}" )
+
+
+class TokenizerProvideFailure( Omnierror ):
+    ''' Failure to provide tokenizer. '''
+
+    def __init__( self, name: str, reason: str ):
+        super( ).__init__(
+            f"Could not provide tokenizer '{name}'. Reason: {reason}" )
+
+
+class TokenizerQueryFailure( Omnierror ):
+    ''' Failure to query tokenizer service. '''
+
+    def __init__( self, name: str, reason: str ):
+        super( ).__init__(
+            f"Could not query tokenizer '{name}'. Reason: {reason}" )
+
+
 class TokenizerVariantInvalidity( Omnierror ):
     ''' Invalid tokenizer variant. '''
 
@@ -139,6 +213,16 @@ class UserOperateCancellation( Omniexception ):
         super( ).__init__( f"Operation cancelled by user. Cause: {cause}" )
 
 
+class VcsQueryFailure( Omnierror ):
+    ''' Failure of query to version control system. '''
+
+    def __init__( self, arguments: __.cabc.Sequence[ str ], reason: str ):
+        query = ' '.join( arguments )
+        super( ).__init__(
+            f"Could not query version control with '{query}'. "
+            f"Reason: {reason.strip( )}" )
+
+
 @_contextlib.contextmanager
 def report_exceptions(
     scribe: _logging.Logger,
@@ -26,11 +26,27 @@ from . import parts as _parts
 
 
 def format_mimeogram(
-    parts: __.cabc.Sequence[ _parts.Part ],
+    parts: __.cabc.Sequence[ _parts.Partlike ],
     message: __.typx.Optional[ str ] = None,
     deterministic_boundary: bool = False,
 ) -> str:
     ''' Formats parts into mimeogram. '''
+    return ''.join( format_mimeogram_segments(
+        parts, message = message,
+        deterministic_boundary = deterministic_boundary ) )
+
+
+def format_mimeogram_segments(
+    parts: __.cabc.Sequence[ _parts.Partlike ],
+    message: __.typx.Optional[ str ] = None,
+    deterministic_boundary: bool = False,
+) -> __.cabc.Iterator[ str ]:
+    ''' Formats parts into successive segments of mimeogram.
+
+        Segments alternate between boundary with headers and content of
+        part. Contents are not copied, so that only one part need be
+        materialized at a time. Concatenated segments form mimeogram.
+    '''
     if not parts and message is None:
         from .exceptions import MimeogramFormatEmpty
         raise MimeogramFormatEmpty( )
@@ -39,38 +55,50 @@ def format_mimeogram(
         boundary = f"====MIMEOGRAM_{content_hash}===="
     else:
         boundary = "====MIMEOGRAM_{uuid}====".format( uuid = __.uuid4( ).hex )
-    lines: list[ str ] = [ ]
+    prefix: list[ _parts.Partlike ] = [ ]
     if message:
-        message_part = _parts.Part(
+        prefix.append( _parts.Part(
             location = 'mimeogram://message',
             mimetype = 'text/plain', # TODO? Markdown
             charset = 'utf-8',
             linesep = __.detextive.LineSeparators.LF,
-            content = message )
-        lines.append( format_part( message_part, boundary ) )
-    for part in parts:
-        lines.append( format_part( part, boundary ) ) # noqa: PERF401
-    lines.append( f"--{boundary}--" )
-    return '\n'.join( lines )
+            content = message ) )
+    return _produce_segments( ( *prefix, *parts ), boundary )
+
+
+def format_mimeogram_to(
+    stream: __.typx.TextIO,
+    parts: __.cabc.Sequence[ _parts.Partlike ],
+    message: __.typx.Optional[ str ] = None,
+    deterministic_boundary: bool = False,
+) -> int:
+    ''' Writes mimeogram of parts to text stream, segment by segment.
+
+        Returns number of characters written.
+    '''
+    size = 0
+    for segment in format_mimeogram_segments(
+        parts, message = message,
+        deterministic_boundary = deterministic_boundary
+    ): size += stream.write( segment )
+    return size
 
 
-def format_part( part: _parts.Part, boundary: str ) -> str:
+def format_part( part: _parts.Partlike, boundary: str ) -> str:
     ''' Formats part with boundary marker and headers. '''
-    return '\n'.join( (
-        f"--{boundary}",
-        f"Content-Location: {part.location}",
-        f"Content-Type: {part.mimetype}; "
-        f"charset={part.charset}; "
-        f"linesep={part.linesep.name}",
-        '',
-        part.content ) )
+    return f"{_format_headers( part, boundary )}{part.content}"
 
 
 def _compute_content_hash(
-    parts: __.cabc.Sequence[ _parts.Part ],
+    parts: __.cabc.Sequence[ _parts.Partlike ],
     message: __.typx.Optional[ str ] = None,
 ) -> str:
-    ''' Computes deterministic hash for mimeogram content. '''
+    ''' Computes deterministic hash for mimeogram content.
+
+        Hash is derived from sequence of part digests. Digests already
+        computed for parts are used, so that content need not be hashed
+        again. Other parts are hashed here.
+    '''
     hasher = __.hashlib.sha256( )
     if message is not None:
         hasher.update( message.encode( 'utf-8' ) )
@@ -79,5 +107,29 @@ def _compute_content_hash(
         hasher.update( str( part.mimetype ).encode( 'utf-8' ) )
         hasher.update( str( part.charset ).encode( 'utf-8' ) )
         hasher.update( str( part.linesep.name ).encode( 'utf-8' ) )
-        hasher.update( str( part.content ).encode( 'utf-8' ) )
+        digest = _parts.calculate_digest( part )
+        hasher.update( digest.encode( 'ascii' ) )
     return hasher.hexdigest( )
+
+
+def _format_headers( part: _parts.Partlike, boundary: str ) -> str:
+    ''' Formats boundary marker and headers of part, with blank line. '''
+    return (
+        f"--{boundary}\n"
+        f"Content-Location: {part.location}\n"
+        f"Content-Type: {part.mimetype}; "
+        f"charset={part.charset}; "
+        f"linesep={part.linesep.name}\n"
+        "\n" )
+
+
+def _produce_segments(
+    parts: __.cabc.Iterable[ _parts.Partlike ], boundary: str
+) -> __.cabc.Iterator[ str ]:
+    ''' Produces headers and contents of parts and final boundary. '''
+    separator = ''
+    for part in parts:
+        yield f"{separator}{_format_headers( part, boundary )}"
+        yield part.content
+        separator = '\n'
+    yield f"{separator}--{boundary}--"
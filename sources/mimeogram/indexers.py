@@ -0,0 +1,292 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Random-access indexes of mimeogram files. '''
+
+
+from . import __
+from . import exceptions as _exceptions
+from . import interfaces as _interfaces
+from . import parsers as _parsers
+from . import parts as _parts
+
+
+_scribe = __.produce_scribe( __name__ )
+
+
+schema = 'mimeogram-index/1'
+suffix = '.mgindex'
+
+
+class IndexEntry( __.immut.DataclassObject ):
+    ''' Location of part body within mimeogram file. '''
+
+    location: str
+    mimetype: str
+    charset: str
+    linesep: __.detextive.LineSeparators
+    offset: int
+    length: int
+    digest: str # SHA-256 of body bytes, hexadecimal.
+
+
+class Index( __.immut.DataclassObject ):
+    ''' Index of parts within mimeogram file.
+
+        Size and modification time of indexed file are recorded, so that
+        stale indexes can be detected.
+    '''
+
+    size: int
+    mtime_ns: int
+    entries: tuple[ IndexEntry, ... ]
+
+    def is_fresh( self, location: __.Path ) -> bool:
+        ''' Does index match current state of mimeogram file? '''
+        status = location.stat( )
+        return (
+                self.size == status.st_size
+            and self.mtime_ns == status.st_mtime_ns )
+
+    def select(
+        self, patterns: __.cabc.Sequence[ str ]
+    ) -> tuple[ IndexEntry, ... ]:
+        ''' Selects entries by exact location or glob pattern. '''
+        from fnmatch import fnmatchcase
+        return tuple(
+            entry for entry in self.entries
+            if any(
+                entry.location == pattern
+                or fnmatchcase( entry.location, pattern )
+                for pattern in patterns ) )
+
+
+class IndexCommand(
+    _interfaces.CliCommand,
+    decorators = ( __.standard_tyro_class, ),
+):
+    ''' Builds index of parts alongside mimeogram file. '''
+
+    location: __.typx.Annotated[
+        __.tyro.conf.Positional[ str ],
+        __.typx.Doc( ''' Mimeogram file to index. ''' ),
+    ]
+
+    async def __call__(
+        self, auxdata: __.appcore.state.Globals
+    ) -> None:
+        ''' Executes command to build index. '''
+        location = __.Path( self.location )
+        with _exceptions.report_exceptions(
+            _scribe, f"Could not index mimeogram at '{location}'."
+        ):
+            index = build_index( location )
+            save_index( location, index )
+        print( f"Indexed {len( index.entries )} parts into "
+               f"'{provide_index_location( location )}'." )
+        raise SystemExit( 0 )
+
+    def provide_configuration_edits(
+        self,
+    ) -> __.appcore.dictedits.Edits:
+        ''' Provides edits against configuration from options. '''
+        return ( )
+
+
+class ExtractCommand(
+    _interfaces.CliCommand,
+    decorators = ( __.standard_tyro_class, ),
+):
+    ''' Extracts parts from mimeogram file by location or glob. '''
+
+    location: __.typx.Annotated[
+        __.tyro.conf.Positional[ str ],
+        __.typx.Doc( ''' Mimeogram file to extract parts from. ''' ),
+    ]
+    patterns: __.typx.Annotated[
+        __.tyro.conf.Positional[ list[ str ] ],
+        __.typx.Doc( ''' Part locations or glob patterns. ''' ),
+    ]
+
+    async def __call__(
+        self, auxdata: __.appcore.state.Globals
+    ) -> None:
+        ''' Executes command to extract parts. '''
+        from .formatters import format_mimeogram
+        location = __.Path( self.location )
+        with _exceptions.report_exceptions(
+            _scribe, f"Could not extract parts from '{location}'."
+        ):
+            parts = extract_parts( location, self.patterns )
+        if not parts:
+            _scribe.error( "No parts match." )
+            raise SystemExit( 1 )
+        print( format_mimeogram( parts ) )
+        raise SystemExit( 0 )
+
+    def provide_configuration_edits(
+        self,
+    ) -> __.appcore.dictedits.Edits:
+        ''' Provides edits against configuration from options. '''
+        return ( )
+
+
+def acquire_index( location: __.Path ) -> Index:
+    ''' Acquires fresh index for mimeogram file.
+
+        Sidecar index is used, if it matches file. Else, index is rebuilt
+        and saved, if possible.
+    '''
+    from .exceptions import MimeogramIndexInvalidity
+    index_location = provide_index_location( location )
+    if index_location.is_file( ):
+        try:
+            index = restore_index( location )
+            if index.is_fresh( location ): return index
+        except MimeogramIndexInvalidity as exc:
+            _scribe.warning( str( exc ) )
+        _scribe.debug( f"Rebuilding stale index for '{location}'." )
+    index = build_index( location )
+    try: save_index( location, index )
+    except OSError as exc:
+        _scribe.warning( f"Could not save index. Cause: {exc}" )
+    return index
+
+
+def build_index( location: __.Path ) -> Index:
+    ''' Builds index of mimeogram file in single pass over memory map. '''
+    with _map_file( location ) as ( buffer, status ):
+        entries = tuple(
+            IndexEntry(
+                location = span.location,
+                mimetype = span.mimetype,
+                charset = span.charset,
+                linesep = span.linesep,
+                offset = span.start,
+                length = span.end - span.start,
+                digest = __.hashlib.sha256(
+                    buffer[ span.start : span.end ] ).hexdigest( ) )
+            for span in _parsers.scan_buffer( buffer ) )
+    return Index(
+        size = status.st_size,
+        mtime_ns = status.st_mtime_ns,
+        entries = entries )
+
+
+def extract_parts(
+    location: __.Path,
+    patterns: __.cabc.Sequence[ str ],
+    index: __.Absential[ Index ] = __.absent,
+) -> tuple[ _parts.Part, ... ]:
+    ''' Extracts parts matching locations or globs from mimeogram file.
+
+        Only bodies of selected parts are read and decoded. Bodies are
+        decoded as by the parser: UTF-8 first, then the declared charset.
+    '''
+    from .exceptions import MimeogramIndexInvalidity
+    if __.is_absent( index ): index = acquire_index( location )
+    entries = index.select( patterns )
+    if not entries: return ( )
+    parts: list[ _parts.Part ] = [ ]
+    with _map_file( location ) as ( buffer, _ ):
+        for entry in entries:
+            body = buffer[ entry.offset : entry.offset + entry.length ]
+            if __.hashlib.sha256( body ).hexdigest( ) != entry.digest:
+                raise MimeogramIndexInvalidity(
+                    location, f"digest mismatch for '{entry.location}'" )
+            parts.append( _parts.LazyPart(
+                location = entry.location,
+                mimetype = entry.mimetype,
+                charset = entry.charset,
+                linesep = entry.linesep,
+                buffer = body,
+                start = 0,
+                end = entry.length ).materialize( ) )
+    return tuple( parts )
+
+
+def provide_index_location( location: __.Path ) -> __.Path:
+    ''' Provides location of sidecar index for mimeogram file. '''
+    return location.with_name( f"{location.name}{suffix}" )
+
+
+def restore_index( location: __.Path ) -> Index:
+    ''' Restores sidecar index for mimeogram file. '''
+    import json
+    from .exceptions import MimeogramIndexInvalidity
+    index_location = provide_index_location( location )
+    try:
+        document = json.loads( index_location.read_text( encoding = 'utf-8' ) )
+        if document[ 'schema' ] != schema:
+            raise MimeogramIndexInvalidity( # noqa: TRY301
+                location, f"unknown schema '{document[ 'schema' ]}'" )
+        entries = tuple(
+            IndexEntry(
+                location = entry[ 'location' ],
+                mimetype = entry[ 'mimetype' ],
+                charset = entry[ 'charset' ],
+                linesep = __.detextive.LineSeparators[ entry[ 'linesep' ] ],
+                offset = entry[ 'offset' ],
+                length = entry[ 'length' ],
+                digest = entry[ 'digest' ] )
+            for entry in document[ 'parts' ] )
+        return Index(
+            size = document[ 'size' ],
+            mtime_ns = document[ 'mtime-ns' ],
+            entries = entries )
+    except MimeogramIndexInvalidity: raise
+    except ( KeyError, TypeError, ValueError ) as exc:
+        raise MimeogramIndexInvalidity( location, str( exc ) ) from exc
+
+
+def save_index( location: __.Path, index: Index ) -> None:
+    ''' Saves index as JSON sidecar of mimeogram file. '''
+    import json
+    document: dict[ str, __.typx.Any ] = {
+        'schema': schema,
+        'size': index.size,
+        'mtime-ns': index.mtime_ns,
+        'parts': [
+            {   'location': entry.location,
+                'mimetype': entry.mimetype,
+                'charset': entry.charset,
+                'linesep': entry.linesep.name,
+                'offset': entry.offset,
+                'length': entry.length,
+                'digest': entry.digest,
+            } for entry in index.entries ],
+    }
+    provide_index_location( location ).write_text(
+        f"{json.dumps( document, indent = 1 )}\n", encoding = 'utf-8' )
+
+
+@__.ctxl.contextmanager
+def _map_file(
+    location: __.Path
+) -> __.cabc.Iterator[ tuple[ __.mmap.mmap, __.os.stat_result ] ]:
+    ''' Maps mimeogram file into memory for reading. '''
+    with location.open( 'rb' ) as stream:
+        status = __.os.fstat( stream.fileno( ) )
+        if 0 == status.st_size:
+            from .exceptions import MimeogramParseFailure
+            raise MimeogramParseFailure( reason = "Empty mimeogram." )
+        with __.mmap.mmap(
+            stream.fileno( ), 0, access = __.mmap.ACCESS_READ
+        ) as buffer: yield buffer, status
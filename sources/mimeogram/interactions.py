@@ -148,7 +148,7 @@ async def interact(
 
 
 def _calculate_differences(
-    part: _parts.Part,
+    part: _parts.Partlike,
     revision: str,
     original: __.Absential[ str ] = __.absent,
 ) -> list[ str ]:
@@ -168,7 +168,7 @@ def _calculate_differences(
 
 
 def _produce_actions_menu(
-    part: _parts.Part, content: str, protect: bool
+    part: _parts.Partlike, content: str, protect: bool
 ) -> str:
     size = len( content )
     size_str = (
@@ -0,0 +1,230 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Backends for file reads and atomic writes. '''
+
+
+from . import __
+
+
+_scribe = __.produce_scribe( __name__ )
+
+
+class IoBackends( __.enum.Enum ):
+    ''' Available backends for file I/O. '''
+
+    Aiofiles =  'aiofiles'  # Thread hop per open, read, write, and close.
+    Threads =   'threads'   # Thread hop per whole file operation.
+
+    def produce( self, synchronize: bool = False ) -> "IoBackend":
+        ''' Produces backend instance. '''
+        match self:
+            case IoBackends.Aiofiles:
+                return AiofilesBackend( synchronize = synchronize )
+            case IoBackends.Threads:
+                return ThreadsBackend( synchronize = synchronize )
+
+
+class IoBackend(
+    __.immut.DataclassProtocol, __.typx.Protocol,
+    decorators = ( __.typx.runtime_checkable, ),
+):
+    ''' Backend for file I/O.
+
+        If synchronize is true, then written content is flushed to storage
+        before it replaces file. This costs one fsync per written file.
+    '''
+
+    synchronize: bool = False
+
+    @__.abc.abstractmethod
+    async def acquire_bytes( self, location: __.Path ) -> bytes:
+        ''' Reads entire content of file. '''
+        raise NotImplementedError
+
+    @__.abc.abstractmethod
+    async def update_bytes_atomic(
+        self, location: __.Path, content: bytes
+    ) -> None:
+        ''' Replaces content of file atomically, if possible.
+
+            Raises 'ContentUpdateFailure' if content cannot be written.
+        '''
+        raise NotImplementedError
+
+
+class AiofilesBackend( IoBackend ):
+    ''' File I/O via 'aiofiles' package. '''
+
+    async def acquire_bytes( self, location: __.Path ) -> bytes:
+        import aiofiles
+        async with aiofiles.open( location, 'rb' ) as f: # pyright: ignore
+            return await f.read( )
+
+    async def update_bytes_atomic(
+        self, location: __.Path, content: bytes
+    ) -> None:
+        import aiofiles
+        from .exceptions import ContentUpdateFailure
+        try:
+            descriptor, filename = await __.asyncio.to_thread(
+                _create_temporary, location )
+        except OSError as exc: raise ContentUpdateFailure( location ) from exc
+        try:
+            async with aiofiles.open( # pyright: ignore
+                descriptor, 'wb', closefd = False
+            ) as stream: await stream.write( content )
+        except Exception as exc:
+            await __.asyncio.to_thread(
+                _discard_temporary, descriptor, filename )
+            raise ContentUpdateFailure( location ) from exc
+        try:
+            await __.asyncio.to_thread(
+                _finish_temporary,
+                descriptor, filename, location, self.synchronize )
+        except OSError as exc: raise ContentUpdateFailure( location ) from exc
+
+
+class ThreadsBackend( IoBackend ):
+    ''' File I/O with each file operation as one blocking unit in thread.
+
+        Amortizes thread pool handoffs across open, read or write, and
+        close. Favorable for trees with many small files.
+    '''
+
+    async def acquire_bytes( self, location: __.Path ) -> bytes:
+        return await __.asyncio.to_thread( location.read_bytes )
+
+    async def update_bytes_atomic(
+        self, location: __.Path, content: bytes
+    ) -> None:
+        from .exceptions import ContentUpdateFailure
+        try:
+            await __.asyncio.to_thread(
+                _update_bytes_atomic, location, content, self.synchronize )
+        except OSError as exc: raise ContentUpdateFailure( location ) from exc
+
+
+def produce_backend( auxdata: __.appcore.state.Globals ) -> IoBackend:
+    ''' Produces I/O backend from configuration. '''
+    options = auxdata.configuration.get( 'io-backends', { } )
+    synchronize = options.get( 'synchronize', False )
+    name = options.get( 'default', IoBackends.Aiofiles.value )
+    try: species = IoBackends( name )
+    except ValueError:
+        from .exceptions import IoBackendInvalidity
+        raise IoBackendInvalidity(
+            name, [ species.value for species in IoBackends ] ) from None
+    return species.produce( synchronize = synchronize )
+
+
+async def benchmark(
+    locations: __.cabc.Sequence[ __.Path ],
+    scratch: __.Path,
+    backends: __.cabc.Sequence[ IoBackends ] = tuple( IoBackends ),
+    repetitions: int = 3,
+    synchronize: bool = False,
+) -> __.cabc.Mapping[ IoBackends, float ]:
+    ''' Measures best wall time to read locations and write their copies.
+
+        Copies are written atomically into scratch directory, which must
+        exist. Reads and writes are fanned out concurrently, as during
+        acquisition and updates. Copies are flushed to storage, if
+        synchronize is true, as with same configuration option.
+    '''
+    from time import perf_counter
+    results: dict[ IoBackends, float ] = { }
+    for species in backends:
+        backend = species.produce( synchronize = synchronize )
+        best = float( 'inf' )
+        for _ in range( repetitions ):
+            start = perf_counter( )
+            contents = await __.asyncf.gather_async(
+                *( backend.acquire_bytes( location )
+                   for location in locations ) )
+            await __.asyncf.gather_async(
+                *(  backend.update_bytes_atomic(
+                        scratch / f"{i}.copy", content )
+                    for i, content in enumerate( contents ) ) )
+            best = min( best, perf_counter( ) - start )
+        results[ species ] = best
+        _scribe.debug( f"Backend '{species.value}': {best:.6f} seconds." )
+    return results
+
+
+def select_fastest(
+    results: __.cabc.Mapping[ IoBackends, float ]
+) -> IoBackends:
+    ''' Selects backend with lowest measured time. '''
+    return min( results, key = lambda species: results[ species ] )
+
+
+def _create_temporary( location: __.Path ) -> tuple[ int, str ]:
+    ''' Creates temporary file beside location. Returns descriptor, name. '''
+    from tempfile import mkstemp
+    return mkstemp( dir = location.parent, suffix = f"{location.suffix}.tmp" )
+
+
+def _discard_temporary( descriptor: int, filename: str ) -> None:
+    ''' Closes and removes temporary file after failed write. '''
+    with __.ctxl.suppress( OSError ): __.os.close( descriptor )
+    _remove_temporary( filename )
+
+
+def _finish_temporary(
+    descriptor: int, filename: str, location: __.Path, synchronize: bool
+) -> None:
+    ''' Closes temporary file, then replaces location with it.
+
+        Temporary file is flushed to storage first, if synchronize is true.
+        Temporary file is removed if anything fails. Shared by backends,
+        which differ only in how they write content to temporary file.
+    '''
+    try:
+        try:
+            if synchronize: __.os.fsync( descriptor )
+        finally: __.os.close( descriptor )
+        # Windows: Replace must happen after file handle is closed.
+        __.os.replace( filename, location )
+    except OSError:
+        _remove_temporary( filename )
+        raise
+
+
+def _remove_temporary( filename: str ) -> None:
+    ''' Removes temporary file, if it exists, warning on failure. '''
+    if not __.os.path.exists( filename ): return
+    try: __.os.remove( filename )
+    except OSError:
+        _scribe.warning( f"Could not remove temporary file: {filename}" )
+
+
+def _update_bytes_atomic(
+    location: __.Path, content: bytes, synchronize: bool
+) -> None:
+    ''' Writes temporary file and replaces location with it. '''
+    descriptor, filename = _create_temporary( location )
+    view = memoryview( content )
+    try:
+        while view: view = view[ __.os.write( descriptor, view ) : ]
+    except OSError:
+        _discard_temporary( descriptor, filename )
+        raise
+    _finish_temporary( descriptor, filename, location, synchronize )
@@ -0,0 +1,132 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Manifests of part digests for delta mimeograms.
+
+    Manifest maps locations of parts to digests of their contents, as from
+    'parts.digest_content'. Digests can thus be recomputed from parts of any
+    mimeogram, regardless of original encodings.
+'''
+
+
+from . import __
+from . import parts as _parts
+
+
+_scribe = __.produce_scribe( __name__ )
+
+
+part_location = 'mimeogram://manifest'
+preface = '# Parts unchanged since previous mimeogram. Digests are SHA-256.'
+
+
+Manifest: __.typx.TypeAlias = __.cabc.Mapping[ str, str ]
+
+
+def acquire_manifest( location: __.Path ) -> Manifest:
+    ''' Acquires manifest from previous mimeogram or manifest file.
+
+        Digests are computed for parts of previous mimeogram and merged
+        with any manifest part within it, so that deltas can be chained.
+        File without mimeogram boundary is read as manifest.
+    '''
+    from .exceptions import MimeogramParseFailure
+    from .parsers import parse_bytes
+    content = location.read_bytes( )
+    try: parts = parse_bytes( content )
+    except MimeogramParseFailure:
+        return restore_manifest(
+            content.decode( 'utf-8' ), location = location )
+    digests: dict[ str, str ] = { }
+    for part in parts:
+        if part.location == part_location:
+            digests.update( restore_manifest(
+                part.content, location = location ) )
+            continue
+        if part.location.startswith( 'mimeogram://' ): continue
+        digests[ part.location ] = _parts.calculate_digest( part )
+    _scribe.debug( f"Acquired {len( digests )} digests from '{location}'." )
+    return __.types.MappingProxyType( digests )
+
+
+def format_manifest( digests: Manifest, comment: str = preface ) -> str:
+    ''' Formats manifest as lines of digest and location. '''
+    lines = [ comment ]
+    lines.extend(
+        f"{digest}  {location}" for location, digest in digests.items( ) )
+    return '\n'.join( lines ) + '\n'
+
+
+def produce_manifest( parts: __.cabc.Sequence[ _parts.Part ] ) -> Manifest:
+    ''' Produces manifest for parts, excluding special parts. '''
+    return __.types.MappingProxyType( {
+        part.location: _parts.calculate_digest( part ) for part in parts
+        if not part.location.startswith( 'mimeogram://' ) } )
+
+
+def produce_manifest_part( digests: Manifest ) -> _parts.Part:
+    ''' Produces part which lists unchanged locations and digests. '''
+    return _parts.Part(
+        location = part_location,
+        mimetype = 'text/plain',
+        charset = 'utf-8',
+        linesep = __.detextive.LineSeparators.LF,
+        content = format_manifest( digests ) )
+
+
+def restore_manifest(
+    content: str, location: str | __.Path = part_location
+) -> Manifest:
+    ''' Restores manifest from lines of digest and location.
+
+        Blank lines and lines which start with '#' are ignored.
+    '''
+    from .exceptions import ManifestInvalidity
+    digests: dict[ str, str ] = { }
+    for number, line in enumerate( content.splitlines( ), start = 1 ):
+        if not line.strip( ) or line.startswith( '#' ): continue
+        mobject = _ENTRY_REGEX.fullmatch( line )
+        if not mobject:
+            raise ManifestInvalidity(
+                location, reason = f"malformed entry on line {number}" )
+        digests[ mobject.group( 'location' ) ] = mobject.group( 'digest' )
+    return __.types.MappingProxyType( digests )
+
+
+def select_changed_parts(
+    parts: __.cabc.Sequence[ _parts.Part ], digests: Manifest
+) -> tuple[ tuple[ _parts.Part, ... ], Manifest ]:
+    ''' Separates changed parts from unchanged ones.
+
+        Returns changed parts and manifest of unchanged parts. Parts at
+        locations absent from manifest are considered changed.
+    '''
+    changed: list[ _parts.Part ] = [ ]
+    unchanged: dict[ str, str ] = { }
+    for part in parts:
+        digest = _parts.calculate_digest( part )
+        if digests.get( part.location ) == digest:
+            unchanged[ part.location ] = digest
+        else: changed.append( part )
+    return tuple( changed ), __.types.MappingProxyType( unchanged )
+
+
+_ENTRY_REGEX = __.re.compile(
+    r'''(?P<digest>[0-9a-f]{64})  (?P<location>.+)''' )
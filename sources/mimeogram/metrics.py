@@ -0,0 +1,165 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Per-stage timings and counters for commands. '''
+
+
+from . import __
+
+
+_scribe = __.produce_scribe( __name__ )
+
+
+schema = 'mimeogram-stats/2'
+
+# Declared stages and counters are always rendered, zero if not reached,
+# so that consumers can rely on a fixed set of keys per command. Stages and
+# counters which are not declared, such as per-transformer removals, are
+# rendered under 'extras' so that they never change the fixed set of keys.
+_declarations: __.immut.Dictionary[
+    str, tuple[ tuple[ str, ... ], tuple[ str, ... ] ]
+] = __.immut.Dictionary(
+    apply = (
+        (   'acquire', 'parse', 'update', 'review', 'write' ),
+        (   'mimeograms', 'mimeogram-bytes', 'mimeogram-characters',
+            'parts', 'parts-applied', 'parts-ignored', 'parts-protected',
+            'bytes-written' ),
+    ),
+    create = (
+        (   'acquire', 'scan', 'ignore-evaluation', 'read', 'digest',
+            'decode', 'transform', 'delta', 'format', 'estimate', 'tokenize',
+            'emit' ),
+        (   'files-scanned', 'files-ignored', 'files-unchanged',
+            'files-rejected', 'bytes-read', 'parts', 'parts-unchanged',
+            'mimeograms', 'mimeogram-characters', 'tokens',
+            'tokens-estimated', 'token-cache-hits', 'token-cache-misses' ),
+    ),
+)
+
+
+class Recorder( __.immut.DataclassObject ):
+    ''' Records wall time and CPU time per stage and named counters.
+
+        Stages may nest. Stages entered by concurrent tasks accumulate
+        across those tasks, so their wall time may exceed total wall time.
+        CPU time is for the whole process, including worker threads.
+    '''
+
+    wall_times: dict[ str, float ] = (
+        __.dcls.field( default_factory = dict[ str, float ] ) )
+    cpu_times: dict[ str, float ] = (
+        __.dcls.field( default_factory = dict[ str, float ] ) )
+    calls: dict[ str, int ] = (
+        __.dcls.field( default_factory = dict[ str, int ] ) )
+    counters: dict[ str, int ] = (
+        __.dcls.field( default_factory = dict[ str, int ] ) )
+    wall_start: float = __.dcls.field( default_factory = __.time.perf_counter )
+    cpu_start: float = __.dcls.field( default_factory = __.time.process_time )
+    timestamp: float = __.dcls.field( default_factory = __.time.time )
+
+    def increment( self, counter: str, amount: int = 1 ) -> None:
+        ''' Increments named counter. '''
+        self.counters[ counter ] = self.counters.get( counter, 0 ) + amount
+
+    @__.ctxl.contextmanager
+    def measure( self, stage: str ) -> __.cabc.Iterator[ None ]:
+        ''' Measures wall time and CPU time of stage within context. '''
+        wall_start = __.time.perf_counter( )
+        cpu_start = __.time.process_time( )
+        try: yield
+        finally:
+            wall = __.time.perf_counter( ) - wall_start
+            cpu = __.time.process_time( ) - cpu_start
+            self.wall_times[ stage ] = self.wall_times.get( stage, 0.0 ) + wall
+            self.cpu_times[ stage ] = self.cpu_times.get( stage, 0.0 ) + cpu
+            self.calls[ stage ] = self.calls.get( stage, 0 ) + 1
+
+    def render(
+        self, command: str, status: int = 0
+    ) -> dict[ str, __.typx.Any ]:
+        ''' Renders records as JSON-compatible object in stable schema. '''
+        from datetime import datetime, timezone
+        stages_declared, counters_declared = (
+            _declarations.get( command, ( ( ), ( ) ) ) )
+        stages = {
+            stage: self._render_stage( stage ) for stage in stages_declared }
+        counters = {
+            counter: self.counters.get( counter, 0 )
+            for counter in counters_declared }
+        extras: dict[ str, dict[ str, __.typx.Any ] ] = {
+            'stages': {
+                stage: self._render_stage( stage ) for stage in self.calls
+                if stage not in stages_declared },
+            'counters': {
+                counter: count for counter, count in self.counters.items( )
+                if counter not in counters_declared },
+        }
+        started = datetime.fromtimestamp( self.timestamp, tz = timezone.utc )
+        return {
+            'schema': schema,
+            'command': command,
+            'status': status,
+            'started': started.isoformat( ),
+            'wall-seconds': __.time.perf_counter( ) - self.wall_start,
+            'cpu-seconds': __.time.process_time( ) - self.cpu_start,
+            'stages': stages,
+            'counters': counters,
+            'extras': extras,
+        }
+
+    def save(
+        self, location: __.Path, command: str, status: int = 0
+    ) -> None:
+        ''' Saves rendered records as JSON document. '''
+        import json
+        document = json.dumps(
+            self.render( command, status = status ), indent = 2 )
+        location.parent.mkdir( parents = True, exist_ok = True )
+        location.write_text( f"{document}\n", encoding = 'utf-8' )
+
+    def _render_stage( self, stage: str ) -> dict[ str, float ]:
+        return {
+            'calls': self.calls.get( stage, 0 ),
+            'cpu-seconds': self.cpu_times.get( stage, 0.0 ),
+            'wall-seconds': self.wall_times.get( stage, 0.0 ),
+        }
+
+
+@__.ctxl.contextmanager
+def recording(
+    command: str, location: __.typx.Optional[ str | __.Path ] = None
+) -> __.cabc.Iterator[ Recorder ]:
+    ''' Provides recorder and saves its records, if location is given.
+
+        Records are saved on success and on failure, along with exit status.
+    '''
+    recorder = Recorder( )
+    status = 1
+    try:
+        yield recorder
+        status = 0
+    except SystemExit as exc:
+        status = exc.code if isinstance( exc.code, int ) else 1
+        raise
+    finally:
+        if location is not None:
+            try: recorder.save( __.Path( location ), command, status )
+            except OSError as exc:
+                _scribe.warning( f"Could not save statistics. Cause: {exc}" )
@@ -28,29 +28,217 @@ from . import parts as _parts
 _scribe = __.produce_scribe( __name__ )
 
 
-def parse( mgtext: str ) -> __.cabc.Sequence[ _parts.Part ]:
-    ''' Parses mimeogram. '''
+class PartSpan( __.immut.DataclassObject ):
+    ''' Descriptor of part with span of its body within buffer. '''
+
+    location: str
+    mimetype: str
+    charset: str
+    linesep: __.detextive.LineSeparators
+    start: int
+    end: int
+
+
+parallel_threshold = 10_000 # Minimum number of parts for worker pool.
+
+
+def parse(
+    mgtext: str,
+    workers: __.typx.Optional[ int ] = 1,
+    threshold: int = parallel_threshold,
+) -> __.cabc.Sequence[ _parts.Part ]:
+    ''' Parses mimeogram.
+
+        If 'workers' is other than 1 and mimeogram has at least
+        'threshold' parts, then parts are parsed in shards across
+        a pool of that many worker processes, or one per CPU if None, and
+        reassembled in order. Smaller mimeograms are parsed serially.
+    '''
     # TODO? Accept 'strict' flag.
     from .exceptions import MimeogramParseFailure
-    if not mgtext.strip( ):
+    if not mgtext or mgtext.isspace( ):
         raise MimeogramParseFailure( reason = "Empty mimeogram." )
     boundary = _extract_boundary( mgtext )
-    ptexts = _separate_parts( mgtext, boundary )
-    parts: list[ _parts.Part ] = [ ]
-    for i, ptext in enumerate( ptexts, 1 ):
-        try: part = parse_part( ptext )
+    spans = _locate_parts( mgtext, boundary )
+    if 1 != workers and len( spans ) >= threshold:
+        parts = _parse_spans_parallel( mgtext, spans, workers )
+    else: parts = _parse_spans( mgtext, spans )
+    _scribe.debug( "Parsed {} parts.".format( len( parts ) ) )
+    return parts
+
+
+def parse_stream(
+    stream: __.cabc.Iterable[ str ]
+) -> __.cabc.Iterator[ _parts.Part ]:
+    ''' Parses mimeogram from text stream, yielding parts as completed.
+
+        Stream is consumed line by line, as from a file opened in text
+        mode, standard input, or an 'io.StringIO' buffer. Only the part
+        currently being parsed is retained.
+    '''
+    lines = iter( stream )
+    boundary = _scan_boundary( lines )
+    final_boundary = f"{boundary.rstrip( )}--"
+    plines: list[ str ] = [ ]
+    i, count = 1, 0
+    for line in lines:
+        if line == boundary:
+            part = _parse_part_lines( plines, i )
+            if part is not None:
+                count += 1
+                yield part
+            i += 1
+            plines = [ ]
+            continue
+        index = line.find( final_boundary )
+        if -1 != index:
+            _scribe.debug( "Found final boundary." )
+            plines.append( line[ : index ] )
+            break
+        plines.append( line )
+    else: _scribe.warning( "No final boundary found." )
+    part = _parse_part_lines( plines, i )
+    if part is not None:
+        count += 1
+        yield part
+    _scribe.debug( f"Parsed {count} parts." )
+
+
+def scan_buffer( buffer: _parts.Buffer ) -> __.cabc.Iterator[ PartSpan ]:
+    ''' Scans mimeogram buffer, encoded as UTF-8, for spans of part bodies.
+
+        Boundaries and headers are matched as bytes and bodies are not
+        decoded, so that memory maps of large files can be scanned
+        without copying them. Invalid parts are skipped, as with 'parse'.
+    '''
+    from .exceptions import MimeogramParseFailure
+    mobject = _BOUNDARY_BYTES_REGEX.search( buffer )
+    if not mobject:
+        if not _NONBLANK_BYTES_REGEX.search( buffer ):
+            raise MimeogramParseFailure( reason = "Empty mimeogram." )
+        raise MimeogramParseFailure( reason = "No mimeogram boundary found." )
+    boundary = mobject.group( ) + b'\n'
+    final_boundary = boundary.rstrip( ) + b'--'
+    limit = buffer.find( final_boundary )
+    if -1 == limit:
+        _scribe.warning( "No final boundary found." )
+        limit = len( buffer )
+    index = buffer.find( boundary, 0, limit )
+    i = 0
+    while -1 != index:
+        i += 1
+        start = index + len( boundary )
+        index = buffer.find( boundary, start, limit )
+        end = limit if -1 == index else index
+        try: span = _scan_part_span( buffer, start, end )
         except MimeogramParseFailure:
             _scribe.exception( f"Parse failure on part {i}." )
             continue
-        parts.append( part )
-        _scribe.debug( f"Parsed part {i} with location '{part.location}'." )
+        yield span
+
+
+def parse_buffer(
+    buffer: _parts.Buffer
+) -> __.cabc.Sequence[ _parts.LazyPart ]:
+    ''' Parses mimeogram buffer into parts with content decoded on demand.
+
+        Buffer must outlive parts. Memory map of mimeogram file may be used
+        so that content of only one part need be resident at a time.
+    '''
+    return tuple(
+        _parts.LazyPart(
+            location = span.location,
+            mimetype = span.mimetype,
+            charset = span.charset,
+            linesep = span.linesep,
+            buffer = buffer,
+            start = span.start,
+            end = span.end )
+        for span in scan_buffer( buffer ) )
+
+
+def parse_bytes(
+    content: _parts.Buffer
+) -> __.cabc.Sequence[ _parts.Part ]:
+    ''' Parses mimeogram from raw bytes.
+
+        Mimeograms in ASCII-compatible encodings, such as UTF-8, are not
+        decoded as whole: boundaries and headers are matched on raw bytes
+        and each part body is decoded on its own. Bodies are decoded as
+        UTF-8, as mimeograms are written, or else with declared charsets of
+        their parts, so that bodies embedded in their original encodings
+        are preserved. If a body is in neither, as when mimeogram was saved
+        in another encoding after creation, then mimeogram is decoded as
+        whole with its detected charset and parsed as text. So are
+        mimeograms with byte order marks or in UTF-16 or UTF-32.
+    '''
+    from .exceptions import ContentDecodeFailure
+    charset = _detect_wide_charset( content )
+    if charset is not None: return parse( str( content, charset ) )
+    try: parts = [ part.materialize( ) for part in parse_buffer( content ) ]
+    except ContentDecodeFailure as exc:
+        return _parse_bytes_as_whole( content, exc )
     _scribe.debug( "Parsed {} parts.".format( len( parts ) ) )
     return parts
 
 
+def parse_mapped(
+    buffer: _parts.Buffer
+) -> __.cabc.Sequence[ _parts.Partlike ]:
+    ''' Parses mimeogram buffer into parts decoded on demand, if possible.
+
+        As 'parse_bytes', except that parts of mimeograms in
+        ASCII-compatible encodings are not materialized. Each body is
+        decoded once, and discarded, to verify that it can be decoded.
+        Buffer, such as memory map of mimeogram file, must outlive parts.
+    '''
+    from .exceptions import ContentDecodeFailure
+    charset = _detect_wide_charset( buffer )
+    if charset is not None: return parse( str( buffer, charset ) )
+    parts = parse_buffer( buffer )
+    try:
+        for part in parts: _ = part.content
+    except ContentDecodeFailure as exc:
+        return _parse_bytes_as_whole( buffer, exc )
+    _scribe.debug( "Parsed {} parts.".format( len( parts ) ) )
+    return parts
+
+
+def split_mimeograms(
+    lines: __.cabc.Iterable[ str ]
+) -> __.cabc.Iterator[ str ]:
+    ''' Splits stream of concatenated mimeograms into text of each.
+
+        Each mimeogram ends at its final boundary. Text between mimeograms
+        is kept with following mimeogram. Trailing text without final
+        boundary is yielded last, unless blank.
+    '''
+    chunk: list[ str ] = [ ]
+    boundary: __.typx.Optional[ str ] = None
+    for line in lines:
+        chunk.append( line )
+        line_s = line.strip( )
+        if boundary is None:
+            if _BOUNDARY_REGEX.fullmatch( line_s ): boundary = line_s
+            continue
+        if line_s == f"{boundary}--":
+            text = ''.join( chunk )
+            chunk.clear( )
+            boundary = None
+            yield text
+    text = ''.join( chunk )
+    if text and not text.isspace( ): yield text
+
+
 def parse_part( ptext: str ) -> _parts.Part:
     ''' Parses mimeogram part. '''
-    descriptor, content = _parse_descriptor_and_content( ptext )
+    return _parse_part_span( ptext, 0, len( ptext ) )
+
+
+def _produce_part(
+    descriptor: __.cabc.Mapping[ str, str ], content: str
+) -> _parts.Part:
+    ''' Produces part from descriptor and content. '''
     _validate_descriptor( descriptor )
     mimetype, charset, linesep = (
         _parse_mimetype( descriptor[ 'Content-Type' ] ) )
@@ -60,6 +248,52 @@ def parse_part( ptext: str ) -> _parts.Part:
         content = content )
 
 
+def _parse_bytes_as_whole(
+    content: _parts.Buffer, failure: Exception
+) -> __.cabc.Sequence[ _parts.Part ]:
+    ''' Parses mimeogram decoded as whole, after failure to decode body. '''
+    if not isinstance( failure.__cause__, UnicodeDecodeError ): raise failure
+    charset = _detect_charset( content )
+    try: mgtext = str( content, charset )
+    except UnicodeDecodeError: raise failure from None
+    _scribe.warning( f"{failure} Decoding mimeogram as '{charset}'." )
+    return parse( mgtext )
+
+
+def _detect_charset( content: _parts.Buffer ) -> str:
+    ''' Detects charset of mimeogram from its content. '''
+    return __.detextive.detect_charset( bytes( content ) ) or 'utf-8'
+
+
+_BOMS = (
+    ( __.codecs.BOM_UTF32_LE, 'utf-32' ),
+    ( __.codecs.BOM_UTF32_BE, 'utf-32' ),
+    ( __.codecs.BOM_UTF8, 'utf-8-sig' ),
+    ( __.codecs.BOM_UTF16_LE, 'utf-16' ),
+    ( __.codecs.BOM_UTF16_BE, 'utf-16' ),
+)
+_BOUNDARY_PREFIX = '--====MIMEOGRAM_'
+_WIDE_CHARSETS = (
+    ( 'utf-32-le', 4 ), ( 'utf-32-be', 4 ),
+    ( 'utf-16-le', 2 ), ( 'utf-16-be', 2 ),
+)
+def _detect_wide_charset(
+    content: _parts.Buffer
+) -> __.typx.Optional[ str ]:
+    ''' Detects charset of mimeogram which cannot be scanned as bytes.
+
+        Returns None for mimeograms in ASCII-compatible encodings.
+    '''
+    for bom, charset in _BOMS:
+        if content[ : len( bom ) ] == bom: return charset
+    if -1 != content.find( _BOUNDARY_PREFIX.encode( 'ascii' ) ): return None
+    for charset, width in _WIDE_CHARSETS:
+        # Unaligned match may be from code units of other byte order.
+        index = content.find( _BOUNDARY_PREFIX.encode( charset ) )
+        if -1 != index and 0 == index % width: return charset
+    return None
+
+
 _BOUNDARY_REGEX = __.re.compile(
     r'''^--====MIMEOGRAM_[0-9a-fA-F]{16,}====\s*$''',
     __.re.IGNORECASE | __.re.MULTILINE )
@@ -79,33 +313,86 @@ def _extract_boundary( content: str ) -> str:
 
 _DESCRIPTOR_REGEX = __.re.compile(
     r'''^(?P<name>[\w\-]+)\s*:\s*(?P<value>.*)$''' )
-def _parse_descriptor_and_content(
-    content: str
-) -> tuple[ __.cabc.Mapping[ str, str ], str ]:
-    descriptor: __.cabc.Mapping[ str, str ] = { }
-    lines: list[ str ] = [ ]
-    in_matter = False
-    for line in content.splitlines( ):
-        if in_matter:
-            lines.append( line )
+def _parse_spans(
+    content: str,
+    spans: __.cabc.Sequence[ tuple[ int, int ] ],
+    index: int = 0,
+) -> list[ _parts.Part ]:
+    ''' Parses parts at spans of content, skipping invalid parts.
+
+        Index of first span within whole mimeogram is used for reporting.
+    '''
+    from .exceptions import MimeogramParseFailure
+    parts: list[ _parts.Part ] = [ ]
+    for i, ( start, end ) in enumerate( spans, index + 1 ):
+        try: part = _parse_part_span( content, start, end )
+        except MimeogramParseFailure:
+            _scribe.exception( f"Parse failure on part {i}." )
             continue
-        line_s = line.strip( )
+        parts.append( part )
+        _scribe.debug( f"Parsed part {i} with location '{part.location}'." )
+    return parts
+
+
+def _parse_spans_parallel(
+    content: str,
+    spans: __.cabc.Sequence[ tuple[ int, int ] ],
+    workers: __.typx.Optional[ int ],
+) -> list[ _parts.Part ]:
+    ''' Parses parts at spans of content in shards across worker processes.
+
+        Each worker receives only the slice of content covered by its shard.
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or __.os.cpu_count( ) or 1
+    # Several shards per worker balance uneven part sizes.
+    size = -( -len( spans ) // ( workers * 4 ) )
+    contents: list[ str ] = [ ]
+    shards: list[ list[ tuple[ int, int ] ] ] = [ ]
+    indices = range( 0, len( spans ), size )
+    for index in indices:
+        shard = spans[ index : index + size ]
+        base = shard[ 0 ][ 0 ]
+        contents.append( content[ base : shard[ -1 ][ 1 ] ] )
+        shards.append(
+            [ ( start - base, end - base ) for start, end in shard ] )
+    with ProcessPoolExecutor( max_workers = workers ) as executor:
+        results = executor.map( _parse_spans, contents, shards, indices )
+        return [ part for parts in results for part in parts ]
+
+
+def _parse_descriptor_span(
+    content: str, start: int, end: int
+) -> tuple[ __.cabc.Mapping[ str, str ], int ]:
+    ''' Parses headers at start of span and locates start of body. '''
+    descriptor: dict[ str, str ] = { }
+    position = start
+    while position < end:
+        newline = content.find( '\n', position, end )
+        after = end if -1 == newline else newline + 1
+        line_s = content[ position : after ].strip( )
         if not line_s:
-            in_matter = True
-            continue
-        mobject = _DESCRIPTOR_REGEX.fullmatch( line_s )
-        if not mobject:
+            position = after
+            break
+        header = _parse_header( line_s )
+        if header is None:
             _scribe.warning( "No blank line after headers." )
-            in_matter = True
-            lines.append( line )
-            continue
-        name = '-'.join( map(
-            str.capitalize, mobject.group( 'name' ).split( '-' ) ) )
-        value = mobject.group( 'value' )
+            break
+        name, value = header
         # TODO: Detect duplicates.
         descriptor[ name ] = value
+        position = after
     _scribe.debug( f"Descriptor: {descriptor}" )
-    return descriptor, '\n'.join( lines )
+    return descriptor, position
+
+
+def _parse_header( line: str ) -> tuple[ str, str ] | None:
+    ''' Parses header line into canonical name and value, if header. '''
+    mobject = _DESCRIPTOR_REGEX.fullmatch( line )
+    if not mobject: return None
+    name = '-'.join( map(
+        str.capitalize, mobject.group( 'name' ).split( '-' ) ) )
+    return name, mobject.group( 'value' )
 
 
 _QUOTES = '"\''
@@ -126,24 +413,112 @@ def _parse_mimetype(
     return mimetype, charset, linesep
 
 
-def _separate_parts( content: str, boundary: str ) -> list[ str ]:
-    ''' Splits content into parts using boundary. '''
-    boundary_s = boundary.rstrip( )
-    final_boundary = f"{boundary_s}--"
+def _parse_part_span( content: str, start: int, end: int ) -> _parts.Part:
+    ''' Parses part from span of mimeogram, slicing body exactly once.
+
+        The line separator which precedes the next boundary is not part of
+        the body. Carriage returns are normalized to newlines.
+    '''
+    descriptor, start = _parse_descriptor_span( content, start, end )
+    if content.endswith( '\r\n', start, end ): end -= 2
+    elif content.endswith( ( '\n', '\r' ), start, end ): end -= 1
+    body = content[ start : end ]
+    if '\r' in body:
+        body = body.replace( '\r\n', '\n' ).replace( '\r', '\n' )
+    return _produce_part( descriptor, body )
+
+
+def _parse_part_lines(
+    plines: __.cabc.Sequence[ str ], i: int
+) -> _parts.Part | None:
+    ''' Parses lines of part, logging failure. '''
+    from .exceptions import MimeogramParseFailure
+    ptext = ''.join( plines )
+    try: part = _parse_part_span( ptext, 0, len( ptext ) )
+    except MimeogramParseFailure:
+        _scribe.exception( f"Parse failure on part {i}." )
+        return None
+    _scribe.debug( f"Parsed part {i} with location '{part.location}'." )
+    return part
+
+
+def _scan_part_span(
+    buffer: _parts.Buffer, start: int, end: int
+) -> PartSpan:
+    ''' Parses headers as UTF-8 and locates body within span of buffer. '''
+    descriptor: dict[ str, str ] = { }
+    position = start
+    while position < end:
+        newline = buffer.find( b'\n', position, end )
+        after = end if -1 == newline else newline + 1
+        line = buffer[ position : after ]
+        line_s = line.decode( 'utf-8', errors = 'replace' ).strip( )
+        if not line_s:
+            position = after
+            break
+        header = _parse_header( line_s )
+        if header is None:
+            _scribe.warning( "No blank line after headers." )
+            break
+        name, value = header
+        descriptor[ name ] = value
+        position = after
+    _validate_descriptor( descriptor )
+    mimetype, charset, linesep = (
+        _parse_mimetype( descriptor[ 'Content-Type' ] ) )
+    tail = buffer[ max( position, end - 2 ) : end ]
+    if tail.endswith( b'\r\n' ): end -= 2
+    elif tail.endswith( ( b'\n', b'\r' ) ): end -= 1
+    return PartSpan(
+        location = descriptor[ 'Content-Location' ],
+        mimetype = mimetype, charset = charset, linesep = linesep,
+        start = position, end = end )
+
+
+def _scan_boundary( lines: __.cabc.Iterator[ str ] ) -> str:
+    ''' Consumes lines through first mimeogram boundary. '''
+    from .exceptions import MimeogramParseFailure
+    blank = True
+    for line in lines:
+        line_ = line[ : -1 ] if line.endswith( '\n' ) else line
+        if _BOUNDARY_REGEX.fullmatch( line_ ):
+            # Windows clipboard has CRLF newlines. Strip CR before display.
+            boundary_s = line_.rstrip( '\r' )
+            _scribe.debug( f"Found boundary: {boundary_s}" )
+            return f"{line_}\n"
+        if blank and line.strip( ): blank = False
+    if blank: raise MimeogramParseFailure( reason = "Empty mimeogram." )
+    raise MimeogramParseFailure( reason = "No mimeogram boundary found." )
+
+
+_BOUNDARY_BYTES_REGEX = __.re.compile(
+    rb'''^--====MIMEOGRAM_[0-9a-fA-F]{16,}====\s*$''',
+    __.re.IGNORECASE | __.re.MULTILINE )
+_NONBLANK_BYTES_REGEX = __.re.compile( rb'''\S''' )
+_NONBLANK_REGEX = __.re.compile( r'''\S''' )
+def _locate_parts(
+    content: str, boundary: str
+) -> list[ tuple[ int, int ] ]:
+    ''' Locates spans of parts between boundaries. '''
+    final_boundary = f"{boundary.rstrip( )}--"
     # Detect final boundary and trailing text first.
-    final_parts = content.split( final_boundary )
-    if len( final_parts ) > 1:
-        _scribe.debug( "Found final boundary." )
-        content_with_parts = final_parts[ 0 ]
-        trailing_text = final_parts[ 1 ].strip( )
-        if trailing_text: _scribe.debug( "Found trailing text." )
-    else:
+    end = content.find( final_boundary )
+    if -1 == end:
         _scribe.warning( "No final boundary found." )
-        content_with_parts = content
-    # Split remaining content on regular boundary and skip leading text.
-    parts = content_with_parts.split( boundary )[ 1: ]
-    _scribe.debug( "Found {} parts to parse.".format( len( parts ) ) )
-    return parts
+        end = len( content )
+    else:
+        _scribe.debug( "Found final boundary." )
+        if _NONBLANK_REGEX.search( content, end + len( final_boundary ) ):
+            _scribe.debug( "Found trailing text." )
+    # Locate parts between regular boundaries and skip leading text.
+    spans: list[ tuple[ int, int ] ] = [ ]
+    index = content.find( boundary, 0, end )
+    while -1 != index:
+        start = index + len( boundary )
+        index = content.find( boundary, start, end )
+        spans.append( ( start, end if -1 == index else index ) )
+    _scribe.debug( "Found {} parts to parse.".format( len( spans ) ) )
+    return spans
 
 
 _DESCRIPTOR_INDICES_REQUISITE = frozenset( (
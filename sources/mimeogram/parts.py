@@ -25,6 +25,9 @@ from . import __
 from . import fsprotect as _fsprotect
 
 
+Buffer: __.typx.TypeAlias = bytes | bytearray | __.mmap.mmap
+
+
 class Resolutions( __.enum.Enum ):
     ''' Available resolutions for each part. '''
 
@@ -39,13 +42,83 @@ class Part( __.immut.DataclassObject ):
     charset: str
     linesep: __.detextive.LineSeparators
     content: str
+    # Digest of content, as from 'digest_content', if already computed.
+    digest: __.typx.Optional[ str ] = (
+        __.dcls.field( default = None, compare = False, repr = False ) )
 
     # TODO? 'format' method
     # TODO? 'parse' method
 
 
+class LazyPart( __.immut.DataclassObject ):
+    ''' Part of mimeogram with content decoded on demand from buffer.
+
+        Content is decoded from span of buffer on each access and is not
+        retained. Content is decoded as UTF-8, as mimeograms are written,
+        whatever charset part declares for its file. Only if that fails is
+        content decoded with declared charset, so that bodies which were
+        embedded in their original encodings are preserved. Buffer may be
+        memory map of mimeogram file, which must remain open while part is
+        in use.
+    '''
+    location: str
+    mimetype: str
+    charset: str
+    linesep: __.detextive.LineSeparators
+    buffer: Buffer = __.dcls.field( repr = False )
+    start: int
+    end: int
+    digest: __.typx.Optional[ str ] = (
+        __.dcls.field( default = None, compare = False, repr = False ) )
+
+    @property
+    def content( self ) -> str:
+        ''' Content of part, decoded from buffer. '''
+        body = self.buffer[ self.start : self.end ]
+        try: content = body.decode( 'utf-8' )
+        except UnicodeDecodeError:
+            try: content = body.decode( self.charset )
+            except ( LookupError, UnicodeDecodeError ) as exc:
+                from .exceptions import ContentDecodeFailure
+                raise ContentDecodeFailure(
+                    self.location, self.charset ) from exc
+        if '\r' in content:
+            content = content.replace( '\r\n', '\n' ).replace( '\r', '\n' )
+        return content
+
+    def materialize( self ) -> Part:
+        ''' Produces part with content resident in memory. '''
+        return Part(
+            location = self.location,
+            mimetype = self.mimetype,
+            charset = self.charset,
+            linesep = self.linesep,
+            content = self.content,
+            digest = self.digest )
+
+
+Partlike: __.typx.TypeAlias = Part | LazyPart
+
+
+def calculate_digest( part: Partlike ) -> str:
+    ''' Calculates digest of part content, unless already computed. '''
+    if part.digest is not None: return part.digest
+    return digest_content( part.content )
+
+
+def digest_content( content: str ) -> str:
+    ''' Calculates digest of part content.
+
+        Digest is hexadecimal SHA-256 of content as UTF-8 with normalized
+        line separators, not of source bytes. So parts acquired from files
+        and parts parsed from mimeograms have equal digests when their
+        contents are equal, regardless of original encodings.
+    '''
+    return __.hashlib.sha256( content.encode( 'utf-8' ) ).hexdigest( )
+
+
 class Target( __.immut.DataclassObject ):
     ''' Target information for mimeogram part. '''
-    part: Part
+    part: Partlike
     destination: __.Path
     protection: _fsprotect.Status
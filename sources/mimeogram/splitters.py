@@ -0,0 +1,185 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Splitting of parts into several mimeograms under token ceiling. '''
+
+
+from . import __
+from . import metrics as _metrics
+from . import parts as _parts
+from . import tokenizers as _tokenizers
+
+
+_scribe = __.produce_scribe( __name__ )
+
+
+class Measurement( __.immut.DataclassObject ):
+    ''' Part with number of tokens in its formatted form. '''
+
+    part: _parts.Part
+    tokens: int
+
+
+async def measure_parts( # noqa: PLR0913
+    parts: __.cabc.Sequence[ _parts.Part ],
+    tokenizer: _tokenizers.Tokenizer,
+    boundary: str,
+    capacity: int,
+    *,
+    cache: __.Absential[ _tokenizers.CountsCache ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
+) -> tuple[ Measurement, ... ]:
+    ''' Counts tokens of each formatted part, splitting oversize parts.
+
+        Parts which exceed capacity are split into ranges of lines, with
+        RFC 5147 line fragments appended to their locations. Each part or
+        range is counted once. Counts are taken in batches, consulting
+        cache, if any.
+    '''
+    from .formatters import format_part
+    counts = await _tokenizers.count_texts(
+        tokenizer, [ f"{format_part( part, boundary )}\n" for part in parts ],
+        cache = cache, recorder = recorder )
+    measurements: list[ Measurement ] = [ ]
+    for part, tokens in zip( parts, counts ):
+        if tokens <= capacity:
+            measurements.append( Measurement( part = part, tokens = tokens ) )
+            continue
+        _scribe.debug(
+            f"Splitting part '{part.location}' with {tokens} tokens." )
+        measurements.extend( await _split_part(
+            part, tokens,
+            tokenizer = tokenizer, boundary = boundary, capacity = capacity,
+            cache = cache, recorder = recorder ) )
+    return tuple( measurements )
+
+
+def pack_measurements(
+    measurements: __.cabc.Sequence[ Measurement ], capacity: int
+) -> tuple[ tuple[ Measurement, ... ], ... ]:
+    ''' Packs measured parts into bins under capacity.
+
+        Parts from same directory are kept together, if they fit within
+        capacity together. Bins are filled first-fit in decreasing order
+        of size. Original order of parts is preserved within and across
+        bins, as far as packing allows.
+    '''
+    groups: dict[ str, list[ int ] ] = { }
+    for i, measurement in enumerate( measurements ):
+        key = _derive_directory( measurement.part.location )
+        groups.setdefault( key, [ ] ).append( i )
+    items: list[ tuple[ int, list[ int ] ] ] = [ ]
+    for indices in groups.values( ):
+        total = sum( measurements[ i ].tokens for i in indices )
+        if total <= capacity: items.append( ( total, indices ) )
+        else:
+            items.extend(
+                ( measurements[ i ].tokens, [ i ] ) for i in indices )
+    items.sort( key = lambda item: item[ 0 ], reverse = True )
+    sizes: list[ int ] = [ ]
+    bins: list[ list[ int ] ] = [ ]
+    for total, indices in items:
+        for j, size in enumerate( sizes ):
+            if size + total <= capacity:
+                sizes[ j ] += total
+                bins[ j ].extend( indices )
+                break
+        else:
+            sizes.append( total )
+            bins.append( list( indices ) )
+    ordered = sorted( sorted( members ) for members in bins )
+    return tuple(
+        tuple( measurements[ i ] for i in members ) for members in ordered )
+
+
+def _derive_directory( location: str ) -> str:
+    ''' Derives directory, or URL path prefix, of part location. '''
+    location = location.split( '#', 1 )[ 0 ]
+    return location.rsplit( '/', 1 )[ 0 ] if '/' in location else ''
+
+
+def _produce_range(
+    part: _parts.Part, lines: __.cabc.Sequence[ str ], start: int, end: int
+) -> _parts.Part:
+    ''' Produces part for range of lines, per RFC 5147 fragment. '''
+    return __.dcls.replace(
+        part,
+        location = f"{part.location}#line={start},{end}",
+        content = ''.join( lines[ start : end ] ),
+        digest = None )
+
+
+async def _split_part( # noqa: PLR0913
+    part: _parts.Part,
+    tokens: int,
+    *,
+    tokenizer: _tokenizers.Tokenizer,
+    boundary: str,
+    capacity: int,
+    cache: __.Absential[ _tokenizers.CountsCache ],
+    recorder: __.Absential[ _metrics.Recorder ],
+) -> list[ Measurement ]:
+    ''' Splits part into ranges of lines under capacity.
+
+        Ranges are estimated from token density of whole part and then
+        counted together. Ranges which still exceed capacity are bisected
+        and counted together again. Single lines which exceed capacity are
+        kept whole.
+    '''
+    from .formatters import format_part
+    lines = part.content.splitlines( keepends = True )
+    headers = format_part( __.dcls.replace( part, content = '' ), boundary )
+    overhead, = await _tokenizers.count_texts(
+        tokenizer, [ f"{headers}\n" ], cache = cache, recorder = recorder )
+    budget = max( capacity - overhead, 1 )
+    density = tokens / max( len( part.content ), 1 )
+    ranges: list[ tuple[ int, int ] ] = [ ]
+    start, estimate = 0, 0.0
+    for i, line in enumerate( lines ):
+        if i > start and estimate + len( line ) * density > budget:
+            ranges.append( ( start, i ) )
+            start, estimate = i, 0.0
+        estimate += len( line ) * density
+    ranges.append( ( start, len( lines ) ) )
+    measurements: list[ tuple[ int, Measurement ] ] = [ ]
+    while ranges:
+        ranges_ = [
+            _produce_range( part, lines, start, end )
+            for start, end in ranges ]
+        counts = await _tokenizers.count_texts(
+            tokenizer,
+            [ f"{format_part( range_, boundary )}\n" for range_ in ranges_ ],
+            cache = cache, recorder = recorder )
+        bisections: list[ tuple[ int, int ] ] = [ ]
+        for ( start, end ), range_, count in zip( ranges, ranges_, counts ):
+            if count > capacity and end - start > 1:
+                middle = ( start + end ) // 2
+                bisections.extend( ( ( start, middle ), ( middle, end ) ) )
+                continue
+            if count > capacity:
+                _scribe.warning(
+                    f"Line {start + 1} of '{part.location}' alone exceeds "
+                    f"token ceiling with {count} tokens." )
+            measurements.append(
+                ( start, Measurement( part = range_, tokens = count ) ) )
+        ranges = bisections
+    return [
+        measurement for _, measurement
+        in sorted( measurements, key = lambda item: item[ 0 ] ) ]
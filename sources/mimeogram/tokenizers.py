@@ -21,9 +21,11 @@
 ''' Language model tokenizers. '''
 
 
+import httpx as _httpx
 import tiktoken as _tiktoken
 
 from . import __
+from . import metrics as _metrics
 
 
 _scribe = __.produce_scribe( __name__ )
@@ -34,19 +36,51 @@ class Tokenizers( __.enum.Enum ):
     ''' Language model tokenizers. '''
 
     AnthropicApi =  'anthropic-api'
+    Estimate =      'estimate'
+    Huggingface =   'huggingface'
     Tiktoken =      'tiktoken'
 
     @classmethod
     async def produce(
-        selfclass, name: str, variant: __.Absential[ str ] = __.absent
+        selfclass,
+        name: str,
+        variant: __.Absential[ str ] = __.absent,
+        locations: __.cabc.Sequence[ __.Path ] = ( ),
+        options: __.Absential[ __.cabc.Mapping[ str, __.typx.Any ] ] = (
+            __.absent ),
+        exits: __.Absential[ __.ctxl.AsyncExitStack ] = __.absent,
     ) -> "Tokenizer":
-        ''' Produces tokenizer from name and optional variant. '''
-        tokenizer = selfclass( name )
+        ''' Produces tokenizer from name and optional variant.
+
+            Names other than those of built-in tokenizers are looked up
+            among providers registered under entry points. Locations are
+            searched for preprocessed encodings or tokenizer definitions,
+            where tokenizer supports them.
+        '''
+        if __.is_absent( options ): options = { }
+        try: tokenizer = selfclass( name )
+        except ValueError:
+            provider = survey_providers( ).get( name )
+            if provider is None:
+                from .exceptions import TokenizerProvideFailure
+                raise TokenizerProvideFailure(
+                    name, "no provider registered" ) from None
+            return await provider( variant, locations, options, exits )
         match tokenizer:
             case Tokenizers.AnthropicApi:
-                raise NotImplementedError( "Not implemented yet. Sorry." )
+                return await AnthropicApi.from_variant(
+                    name = variant, options = options, exits = exits )
+            case Tokenizers.Estimate:
+                return await Estimator.from_variant( name = variant )
+            case Tokenizers.Huggingface:
+                extras = tuple(
+                    __.Path( extra ).expanduser( )
+                    for extra in options.get( 'locations', ( ) ) )
+                return await Huggingface.from_variant(
+                    name = variant, locations = ( *locations, *extras ) )
             case Tokenizers.Tiktoken:
-                return await Tiktoken.from_variant( name = variant )
+                return await Tiktoken.from_variant(
+                    name = variant, locations = locations )
 
 
 class Tokenizer(
@@ -62,13 +96,284 @@ class Tokenizer(
     ) -> __.typx.Self:
         ''' Produces instance from name of variant. '''
 
+    @property
+    @__.abc.abstractmethod
+    def variant( self ) -> str:
+        ''' Name of variant, such as encoding or model. '''
+        raise NotImplementedError
+
     @__.abc.abstractmethod
     async def count( self, text: str ) -> int:
         ''' Counts number of tokens in text. '''
         raise NotImplementedError
 
+    async def count_many(
+        self, texts: __.cabc.Sequence[ str ]
+    ) -> tuple[ int, ... ]:
+        ''' Counts number of tokens in each of several texts. '''
+        return tuple( [ await self.count( text ) for text in texts ] )
+
+
+TokenizerProvider: __.typx.TypeAlias = __.cabc.Callable[
+    [   __.Absential[ str ],
+        __.cabc.Sequence[ __.Path ],
+        __.cabc.Mapping[ str, __.typx.Any ],
+        __.Absential[ __.ctxl.AsyncExitStack ] ],
+    __.cabc.Awaitable[ Tokenizer ] ]
+
+
+class AnthropicApi( Tokenizer ):
+    ''' Tokenization via token counting endpoint of Anthropic API.
+
+        Requests share one pooled HTTP client. Endpoint counts one message
+        per request, so batches are counted by concurrent requests, under
+        limit. Counts are memoized by digest of text for life of tokenizer.
+        Framing of message is measured once, on first count, and subtracted
+        from each count.
+        Transport is pluggable and base URL is configurable, so that local
+        stand-in server or mock transport can take place of API.
+    '''
+
+    client: _httpx.AsyncClient
+    model: str
+    limiter: __.asyncio.Semaphore
+    retries: int = 3
+    counts: dict[ str, int ] = __.dcls.field(
+        default_factory = dict[ str, int ] )
+    overheads: dict[ str, int ] = __.dcls.field(
+        default_factory = dict[ str, int ] )
+    overheads_mutex: __.asyncio.Lock = __.dcls.field(
+        default_factory = __.asyncio.Lock )
+
+    @classmethod
+    async def from_variant(
+        selfclass,
+        name: __.Absential[ str ] = __.absent,
+        options: __.Absential[ __.cabc.Mapping[ str, __.typx.Any ] ] = (
+            __.absent ),
+        transport: __.Absential[ _httpx.AsyncBaseTransport ] = __.absent,
+        exits: __.Absential[ __.ctxl.AsyncExitStack ] = __.absent,
+    ) -> __.typx.Self:
+        ''' Produces instance for model.
+
+            Options are from 'tokenizers.anthropic-api' configuration table.
+            Client is closed with exits, if supplied.
+        '''
+        from .exceptions import TokenizerQueryFailure
+        if __.is_absent( options ): options = { }
+        model: str = (
+            options.get( 'model', anthropic_model_default )
+            if __.is_absent( name ) else name )
+        variable = options.get( 'api-key-variable', 'ANTHROPIC_API_KEY' )
+        key = __.os.environ.get( variable, '' )
+        if not key:
+            raise TokenizerQueryFailure(
+                'anthropic-api', f"no API key in '{variable}'" )
+        concurrency = options.get( 'concurrency', 8 )
+        client = _httpx.AsyncClient(
+            base_url = options.get( 'base-url', anthropic_url_default ),
+            headers = {
+                'anthropic-version': anthropic_version, 'x-api-key': key },
+            limits = _httpx.Limits(
+                max_connections = concurrency,
+                max_keepalive_connections = concurrency ),
+            timeout = options.get( 'timeout', 30.0 ),
+            transport = None if __.is_absent( transport ) else transport )
+        if not __.is_absent( exits ):
+            await exits.enter_async_context( client )
+        return selfclass(
+            client = client,
+            model = model,
+            limiter = __.asyncio.Semaphore( concurrency ),
+            retries = options.get( 'retries', 3 ) )
+
+    @property
+    def variant( self ) -> str: return self.model
+
+    async def count( self, text: str ) -> int:
+        if not text: return 0
+        digest = __.hashlib.sha256( text.encode( 'utf-8' ) ).hexdigest( )
+        if digest not in self.counts:
+            overhead = await self.measure_overhead( )
+            self.counts[ digest ] = await self.query( text ) - overhead
+        return self.counts[ digest ]
+
+    async def count_many(
+        self, texts: __.cabc.Sequence[ str ]
+    ) -> tuple[ int, ... ]:
+        return tuple( await __.asyncio.gather(
+            *( self.count( text ) for text in texts ) ) )
+
+    async def measure_overhead( self ) -> int:
+        ''' Measures number of tokens in framing of message, once per model.
+
+            Probe is counted alone and doubled; framing is difference
+            between twice first count and second count. No count of probe
+            by itself is assumed. Failures are not remembered, so that
+            measurement is retried on next count.
+        '''
+        async with self.overheads_mutex:
+            if self.model not in self.overheads:
+                single = await self.query( _ANTHROPIC_PROBE )
+                double = await self.query( _ANTHROPIC_PROBE * 2 )
+                self.overheads[ self.model ] = 2 * single - double
+        return self.overheads[ self.model ]
+
+    async def query( self, text: str ) -> int:
+        ''' Queries number of tokens in message with text, framing included.
+
+            Rate-limited and overloaded responses are retried, after delay
+            advised by server or else exponential backoff.
+        '''
+        from .exceptions import TokenizerQueryFailure
+        document: dict[ str, __.typx.Any ] = {
+            'model': self.model,
+            'messages': [ { 'role': 'user', 'content': text } ] }
+        for attempt in range( self.retries + 1 ):
+            async with self.limiter:
+                try:
+                    response = await self.client.post(
+                        '/v1/messages/count_tokens', json = document )
+                except _httpx.HTTPError as exc:
+                    raise TokenizerQueryFailure(
+                        'anthropic-api', str( exc ) ) from exc
+            if response.status_code not in _RETRIABLE_STATUSES: break
+            if attempt < self.retries:
+                await __.asyncio.sleep( _calculate_retry_delay(
+                    response, attempt ) )
+        if response.status_code == _httpx.codes.NOT_FOUND:
+            from .exceptions import TokenizerVariantInvalidity
+            raise TokenizerVariantInvalidity( 'anthropic-api', self.model )
+        if response.is_error:
+            raise TokenizerQueryFailure(
+                'anthropic-api',
+                f"HTTP status {response.status_code}: {response.text}" )
+        try: return int( response.json( )[ 'input_tokens' ] )
+        except ( KeyError, TypeError, ValueError ) as exc:
+            raise TokenizerQueryFailure(
+                'anthropic-api', "malformed response" ) from exc
+
+
+class Calibration( __.immut.DataclassObject ):
+    ''' Weights of features and relative error of estimates for encoding.
+
+        Weights correspond to features from 'tally_features'. Deviation is
+        root mean square of relative errors against exact counts.
+    '''
+
+    weights: tuple[ float, ... ]
+    deviation: float
+
 
-# TODO: Implement 'AnthropicApi' tokenizer.
+class Estimate( __.immut.DataclassObject ):
+    ''' Estimated number of tokens, with confidence interval. '''
+
+    tokens: int
+    low: int
+    high: int
+
+
+class Estimator( Tokenizer ):
+    ''' Estimation of tokens from statistics of byte classes.
+
+        Bytes of text are classified by one translation and features, such
+        as words, numbers, punctuation, and line starts, are tallied by
+        byte counts, which run at memory speed rather than through
+        byte-pair merges. Large texts are tallied from evenly spaced
+        samples. Tokens are estimated as weighted sum of features, with
+        weights calibrated per encoding against exact counts of reference
+        corpus. Intervals are at about 95% confidence for texts which
+        resemble reference corpus.
+    '''
+
+    calibration: Calibration
+    encoding: str
+
+    @classmethod
+    async def from_variant(
+        selfclass, name: __.Absential[ str ] = __.absent
+    ) -> __.typx.Self:
+        if __.is_absent( name ): name = 'cl100k_base'
+        if name not in estimator_calibrations:
+            from .exceptions import TokenizerVariantInvalidity
+            raise TokenizerVariantInvalidity( 'estimate', name )
+        return selfclass(
+            calibration = estimator_calibrations[ name ], encoding = name )
+
+    @property
+    def variant( self ) -> str: return self.encoding
+
+    async def count( self, text: str ) -> int:
+        return self.estimate( text ).tokens
+
+    def estimate( self, *texts: str ) -> Estimate:
+        ''' Estimates tokens of concatenated texts, with interval. '''
+        features = [ 0.0 ] * len( self.calibration.weights )
+        for text in texts:
+            for i, tally in enumerate( _sample_features( text ) ):
+                features[ i ] += tally
+        tokens = sum(
+            weight * tally for weight, tally
+            in zip( self.calibration.weights, features ) )
+        margin = _CONFIDENCE_FACTOR * self.calibration.deviation * tokens
+        return Estimate(
+            tokens = round( tokens ),
+            low = max( 0, __.math.floor( tokens - margin ) ),
+            high = __.math.ceil( tokens + margin ) )
+
+
+class Huggingface( Tokenizer ):
+    ''' Tokenization from local definitions in HuggingFace format.
+
+        Variant is path to 'tokenizer.json' file or name under which
+        definition is found in locations, as '<name>.json' or as
+        '<name>/tokenizer.json'. Requires optional 'tokenizers' package,
+        which encodes batches in parallel threads, outside of GIL.
+    '''
+
+    codec: __.typx.Any
+    name: str
+
+    @classmethod
+    async def from_variant(
+        selfclass,
+        name: __.Absential[ str ] = __.absent,
+        locations: __.cabc.Sequence[ __.Path ] = ( ),
+    ) -> __.typx.Self:
+        from .exceptions import (
+            TokenizerEncodingInvalidity,
+            TokenizerProvideFailure,
+            TokenizerVariantInvalidity,
+        )
+        try: from tokenizers import Tokenizer as Codec # pyright: ignore
+        except ImportError as exc:
+            raise TokenizerProvideFailure(
+                'huggingface', "package 'tokenizers' is not installed"
+            ) from exc
+        if __.is_absent( name ): name = 'tokenizer'
+        file = _locate_definition( name, locations )
+        if file is None:
+            raise TokenizerVariantInvalidity( 'huggingface', name )
+        try:
+            codec = await __.asyncio.to_thread( # pyright: ignore
+                Codec.from_file, str( file ) ) # pyright: ignore
+        except Exception as exc:
+            raise TokenizerEncodingInvalidity( file, str( exc ) ) from exc
+        return selfclass( codec = codec, name = name )
+
+    @property
+    def variant( self ) -> str: return self.name
+
+    async def count( self, text: str ) -> int:
+        return len( self.codec.encode( text, add_special_tokens = False ) )
+
+    async def count_many(
+        self, texts: __.cabc.Sequence[ str ]
+    ) -> tuple[ int, ... ]:
+        encodings = await __.asyncio.to_thread(
+            self.codec.encode_batch, list( texts ),
+            add_special_tokens = False )
+        return tuple( map( len, encodings ) )
 
 
 class Tiktoken( Tokenizer ):
@@ -78,15 +383,482 @@ class Tiktoken( Tokenizer ):
 
     @classmethod
     async def from_variant(
-        selfclass, name: __.Absential[ str ] = __.absent
+        selfclass,
+        name: __.Absential[ str ] = __.absent,
+        locations: __.cabc.Sequence[ __.Path ] = ( ),
     ) -> __.typx.Self:
         if __.is_absent( name ): name = 'cl100k_base'
-        from tiktoken import get_encoding
-        try: codec = get_encoding( name )
-        except ValueError as exc:
-            from .exceptions import TokenizerVariantInvalidity
-            raise TokenizerVariantInvalidity( 'tiktoken', name ) from exc
+        codec = await __.asyncio.to_thread( acquire_encoding, name, locations )
         return selfclass( codec = codec )
 
+    @property
+    def variant( self ) -> str: return self.codec.name
+
     async def count( self, text: str ) -> int:
         return len( self.codec.encode( text ) )
+
+    async def count_many(
+        self, texts: __.cabc.Sequence[ str ]
+    ) -> tuple[ int, ... ]:
+        # Encoder releases GIL, so batch is encoded in parallel threads.
+        tokens = await __.asyncio.to_thread(
+            self.codec.encode_batch, list( texts ),
+            num_threads = __.os.cpu_count( ) or 1 )
+        return tuple( map( len, tokens ) )
+
+
+class CountsCache( __.immut.DataclassObject ):
+    ''' Persistent cache of token counts, keyed on digests of texts.
+
+        Counts are kept per tokenizer and variant. Least recently used
+        counts beyond capacity are evicted when cache is closed. Texts
+        shorter than minimum size are cheaper to count than to look up
+        and are not cached.
+    '''
+
+    connection: __.sqlite3.Connection
+    tokenizer: str
+    variant: str
+    capacity: int = 100_000
+    minimum_size: int = 512
+
+    @classmethod
+    def from_location(
+        selfclass,
+        location: __.Path,
+        tokenizer: str,
+        variant: str,
+        capacity: int = 100_000,
+    ) -> __.typx.Self:
+        ''' Opens cache at location, creating it if necessary. '''
+        location.parent.mkdir( parents = True, exist_ok = True )
+        connection = __.sqlite3.connect( location )
+        try: connection.executescript( _COUNTS_CACHE_SCHEMA )
+        except __.sqlite3.Error:
+            connection.close( )
+            raise
+        return selfclass(
+            connection = connection,
+            tokenizer = tokenizer, variant = variant, capacity = capacity )
+
+    def access( self, digests: __.cabc.Sequence[ str ] ) -> dict[ str, int ]:
+        ''' Retrieves counts for digests, marking them as recently used. '''
+        if not digests: return { }
+        placeholders = ', '.join( '?' * len( digests ) )
+        # Only placeholders are interpolated; digests are bound parameters.
+        scope = (
+            f"tokenizer = ? AND variant = ? AND digest IN ( {placeholders} )" )
+        query = f"SELECT digest, tokens FROM counts WHERE {scope}" # noqa: S608
+        update = f"UPDATE counts SET accessed = ? WHERE {scope}" # noqa: S608
+        arguments = ( self.tokenizer, self.variant, *digests )
+        with self.connection:
+            rows = self.connection.execute( query, arguments ).fetchall( )
+            if rows:
+                self.connection.execute(
+                    update, ( __.time.time( ), *arguments ) )
+        return dict( rows )
+
+    def close( self ) -> None:
+        ''' Evicts least recently used counts and closes cache. '''
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM counts WHERE rowid IN ( "
+                    "SELECT rowid FROM counts ORDER BY accessed DESC "
+                    "LIMIT -1 OFFSET ? )", ( self.capacity, ) )
+        finally: self.connection.close( )
+
+    def record( self, counts: __.cabc.Mapping[ str, int ] ) -> None:
+        ''' Records counts for digests. '''
+        accessed = __.time.time( )
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO counts "
+                "( digest, tokenizer, variant, tokens, accessed ) "
+                "VALUES ( ?, ?, ?, ?, ? )",
+                [   ( digest, self.tokenizer, self.variant, tokens, accessed )
+                    for digest, tokens in counts.items( ) ] )
+
+
+anthropic_model_default = 'claude-sonnet-4-5'
+anthropic_url_default = 'https://api.anthropic.com'
+anthropic_version = '2023-06-01'
+encoding_suffix = '.ranks'
+providers_group = 'mimeogram.tokenizers'
+
+
+# Weights and deviations for source code and prose. Regenerate from exact
+# counts of reference corpus with '.auxiliary/scripts/calibrate-estimator.py'.
+# Reference corpus is 419 texts, 4.1 million characters: packages 'asyncio',
+# 'concurrent', 'email', 'http', 'importlib', 'json', 'logging', and
+# 'unittest' of CPython 3.11.7 standard library, its C headers, and UTF-8
+# texts of its 'test/cjkencodings'; Debian common licenses; and sources and
+# documentation of this project. Estimation measured 83 times faster than
+# exact encoding for 'cl100k_base' and 64 times faster for 'o200k_base'.
+estimator_calibrations: __.immut.Dictionary[ str, Calibration ] = (
+    __.immut.Dictionary( {
+        'cl100k_base': Calibration(
+            weights = (
+                0.761, 0.100, 2.475, 0.207, 0.119, 1.283, 0.787, -0.010,
+                0.366 ),
+            deviation = 0.082 ),
+        'o200k_base': Calibration(
+            weights = (
+                0.686, 0.121, 2.575, 0.196, 0.132, 1.256, 0.908, -0.026,
+                0.250 ),
+            deviation = 0.085 ),
+    } ) )
+
+
+def acquire_encoding(
+    name: str, locations: __.cabc.Sequence[ __.Path ] = ( )
+) -> _tiktoken.Encoding:
+    ''' Acquires 'tiktoken' encoding by name, memoized for process.
+
+        Preprocessed encoding in first of locations which has one is
+        loaded without network access. Otherwise, encoding is acquired by
+        'tiktoken', which downloads ranks on first use.
+    '''
+    with _encodings_mutex:
+        if name in _encodings: return _encodings[ name ]
+        for location in locations:
+            file = location / f"{name}{encoding_suffix}"
+            if file.is_file():
+                _scribe.debug( f"Restoring encoding from '{file}'." )
+                encoding = restore_encoding( file )
+                break
+        else:
+            from tiktoken import get_encoding
+            try: encoding = get_encoding( name )
+            except ValueError as exc:
+                from .exceptions import TokenizerVariantInvalidity
+                raise TokenizerVariantInvalidity( 'tiktoken', name ) from exc
+        _encodings[ name ] = encoding
+        return encoding
+
+
+async def count_segments(
+    tokenizer: Tokenizer,
+    segments: __.cabc.Iterable[ str ],
+    batch_size: int = 256,
+    cache: __.Absential[ CountsCache ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
+) -> int:
+    ''' Counts tokens of concatenated segments, in batches of units.
+
+        Segments are regrouped into units which only begin at lines which
+        start with non-whitespace. Byte-pair encodings which never join
+        pieces across such line starts, such as 'cl100k_base' and
+        'o200k_base', thus count same total as for whole text, without
+        whole text being held in memory. Segments are consumed lazily.
+
+        If cache is supplied, then units with cached counts, such as
+        unchanged files or constant prompts, are not counted again.
+    '''
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    total = 0
+    batch: list[ str ] = [ ]
+    for unit in _regroup_segments( segments ):
+        batch.append( unit )
+        if len( batch ) < batch_size: continue
+        with recorder.measure( 'tokenize' ):
+            total += sum(
+                await _count_batch( tokenizer, batch, cache, recorder ) )
+        batch = [ ]
+    if batch:
+        with recorder.measure( 'tokenize' ):
+            total += sum(
+                await _count_batch( tokenizer, batch, cache, recorder ) )
+    return total
+
+
+async def count_texts(
+    tokenizer: Tokenizer,
+    texts: __.cabc.Sequence[ str ],
+    batch_size: int = 256,
+    cache: __.Absential[ CountsCache ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
+) -> tuple[ int, ... ]:
+    ''' Counts tokens of each text, in batches, consulting cache, if any. '''
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    counts: list[ int ] = [ ]
+    for i in range( 0, len( texts ), batch_size ):
+        with recorder.measure( 'tokenize' ):
+            counts.extend( await _count_batch(
+                tokenizer, texts[ i : i + batch_size ], cache, recorder ) )
+    return tuple( counts )
+
+
+async def _count_batch(
+    tokenizer: Tokenizer,
+    batch: __.cabc.Sequence[ str ],
+    cache: __.Absential[ CountsCache ],
+    recorder: _metrics.Recorder,
+) -> list[ int ]:
+    ''' Counts tokens of batch of texts, consulting cache, if any. '''
+    if __.is_absent( cache ):
+        return list( await tokenizer.count_many( batch ) )
+    digests = [
+        __.hashlib.sha256( text.encode( 'utf-8' ) ).hexdigest( )
+        if len( text ) >= cache.minimum_size else None
+        for text in batch ]
+    cached = cache.access(
+        [ digest for digest in digests if digest is not None ] )
+    misses = [
+        i for i, digest in enumerate( digests ) if digest not in cached ]
+    counts = await tokenizer.count_many( [ batch[ i ] for i in misses ] )
+    results = [ 0 ] * len( batch )
+    for i, digest in enumerate( digests ):
+        if digest in cached: results[ i ] = cached[ digest ]
+    recorded: dict[ str, int ] = { }
+    for i, count in zip( misses, counts ):
+        results[ i ] = count
+        digest = digests[ i ]
+        if digest is not None: recorded[ digest ] = count
+    if recorded: cache.record( recorded )
+    recorder.increment( 'token-cache-hits', len( batch ) - len( misses ) )
+    recorder.increment( 'token-cache-misses', len( recorded ) )
+    return results
+
+
+def restore_encoding( location: __.Path ) -> _tiktoken.Encoding:
+    ''' Restores 'tiktoken' encoding from preprocessed file.
+
+        File is memory-mapped while it is read, so that ranks are sliced
+        from it directly rather than decoded from Base64 lines. Ranks are
+        copied into mapping for 'tiktoken', so only parsing is faster.
+    '''
+    import json
+    from .exceptions import TokenizerEncodingInvalidity
+    with (
+        location.open( 'rb' ) as stream,
+        __.mmap.mmap(
+            stream.fileno( ), 0, access = __.mmap.ACCESS_READ ) as buffer,
+    ):
+        if buffer[ : len( _ENCODING_MAGIC ) ] != _ENCODING_MAGIC:
+            raise TokenizerEncodingInvalidity(
+                location, reason = "Unrecognized format." )
+        position = len( _ENCODING_MAGIC )
+        ( size, ) = __.struct.unpack_from( '<I', buffer, position )
+        position += 4
+        header = json.loads(
+            buffer[ position : position + size ].decode( 'utf-8' ) )
+        position += size
+        count = header[ 'count' ]
+        offsets = __.struct.unpack_from( f"<{count + 1}I", buffer, position )
+        position += 4 * ( count + 1 )
+        ranks = __.struct.unpack_from( f"<{count}I", buffer, position )
+        position += 4 * count
+        if position + offsets[ -1 ] != len( buffer ):
+            raise TokenizerEncodingInvalidity(
+                location, reason = "Truncated ranks." )
+        mergeable_ranks = {
+            buffer[ position + start : position + end ]: rank
+            for start, end, rank in zip( offsets, offsets[ 1 : ], ranks ) }
+    return _tiktoken.Encoding(
+        header[ 'name' ],
+        pat_str = header[ 'pat_str' ],
+        mergeable_ranks = mergeable_ranks,
+        special_tokens = header[ 'special_tokens' ],
+        explicit_n_vocab = header.get( 'explicit_n_vocab' ) )
+
+
+def save_encoding( # noqa: PLR0913
+    location: __.Path,
+    name: str,
+    pat_str: str,
+    mergeable_ranks: __.cabc.Mapping[ bytes, int ],
+    special_tokens: __.cabc.Mapping[ str, int ],
+    *,
+    explicit_n_vocab: __.typx.Optional[ int ] = None,
+) -> None:
+    ''' Saves 'tiktoken' encoding to preprocessed file.
+
+        Arguments match those of encoding constructors from 'tiktoken',
+        so that their results can be passed directly.
+    '''
+    import json
+    header = json.dumps( {
+        'name': name,
+        'pat_str': pat_str,
+        'special_tokens': dict( special_tokens ),
+        'explicit_n_vocab': explicit_n_vocab,
+        'count': len( mergeable_ranks ),
+    } ).encode( 'utf-8' )
+    offsets = [ 0 ]
+    for token in mergeable_ranks:
+        offsets.append( offsets[ -1 ] + len( token ) )
+    count = len( mergeable_ranks )
+    location.parent.mkdir( parents = True, exist_ok = True )
+    with location.open( 'wb' ) as stream:
+        stream.write( _ENCODING_MAGIC )
+        stream.write( __.struct.pack( '<I', len( header ) ) )
+        stream.write( header )
+        stream.write( __.struct.pack( f"<{count + 1}I", *offsets ) )
+        stream.write( __.struct.pack(
+            f"<{count}I", *mergeable_ranks.values( ) ) )
+        stream.write( b''.join( mergeable_ranks ) )
+
+
+def survey_providers( ) -> __.cabc.Mapping[ str, TokenizerProvider ]:
+    ''' Surveys tokenizer providers registered under entry points.
+
+        Entry points in 'mimeogram.tokenizers' group are named for
+        tokenizers and refer to provider callables, which are awaited with
+        variant, locations, options, and exits. Names of built-in
+        tokenizers cannot be taken. Entry points which fail to load are
+        logged and skipped. Survey is memoized for process.
+    '''
+    with _providers_mutex:
+        if _providers_surveyed.is_set( ):
+            return __.types.MappingProxyType( _providers )
+        from importlib.metadata import entry_points
+        builtins = frozenset( tokenizer.value for tokenizer in Tokenizers )
+        for entry in entry_points( group = providers_group ):
+            if entry.name in builtins:
+                _scribe.warning(
+                    f"Ignoring provider '{entry.value}' for "
+                    f"built-in tokenizer '{entry.name}'." )
+                continue
+            try: _providers[ entry.name ] = entry.load( )
+            except Exception:
+                _scribe.exception(
+                    f"Could not load provider '{entry.value}' "
+                    f"for tokenizer '{entry.name}'." )
+        _providers_surveyed.set( )
+        return __.types.MappingProxyType( _providers )
+
+
+def tally_features( text: str ) -> tuple[ int, ... ]:
+    ''' Tallies features of text for estimation of tokens.
+
+        Features are, in order: words, letters, numbers, digits,
+        punctuation, lines, indented lines, spaces, and non-ASCII bytes.
+    '''
+    classes = text.encode( 'utf-8' ).translate( _BYTE_CLASSES )
+    letters = classes.translate( _LETTERS_MASK )
+    digits = classes.translate( _DIGITS_MASK )
+    return (
+        letters.count( b' L' ) + letters.startswith( b'L' ),
+        classes.count( b'L' ),
+        digits.count( b' D' ) + digits.startswith( b'D' ),
+        classes.count( b'D' ),
+        classes.count( b'P' ),
+        classes.count( b'N' ),
+        classes.count( b'NS' ),
+        classes.count( b'S' ),
+        classes.count( b'U' ),
+    )
+
+
+def _calculate_retry_delay( response: _httpx.Response, attempt: int ) -> float:
+    ''' Calculates delay before retry, preferring advice of server. '''
+    advice = response.headers.get( 'retry-after', '' )
+    try: return max( float( advice ), 0.0 )
+    except ValueError: return _RETRY_DELAY_BASE * 2 ** attempt
+
+
+def _locate_definition(
+    name: str, locations: __.cabc.Sequence[ __.Path ]
+) -> __.Path | None:
+    ''' Locates tokenizer definition by path or by name in locations. '''
+    file = __.Path( name ).expanduser( )
+    if file.suffix == '.json': return file if file.is_file( ) else None
+    for location in locations:
+        for file in (
+            location / f"{name}.json", location / name / 'tokenizer.json'
+        ):
+            if file.is_file( ): return file
+    return None
+
+
+def _regroup_segments(
+    segments: __.cabc.Iterable[ str ]
+) -> __.cabc.Iterator[ str ]:
+    ''' Regroups segments into units which split only after newlines.
+
+        Split points are newlines followed by non-whitespace characters.
+    '''
+    pending: list[ str ] = [ ]
+    for segment in segments:
+        if not segment: continue
+        remainder = segment
+        if pending and pending[ -1 ].endswith( '\n' ) and (
+            not segment[ 0 ].isspace( )
+        ):
+            yield ''.join( pending )
+            pending = [ ]
+        elif segment.startswith( '\n' ) and segment[ 1 : 2 ].strip( ):
+            pending.append( '\n' )
+            yield ''.join( pending )
+            pending = [ ]
+            remainder = segment[ 1 : ]
+        pending.append( remainder )
+    if pending: yield ''.join( pending )
+
+
+_RETRIABLE_STATUSES = frozenset( (
+    _httpx.codes.TOO_MANY_REQUESTS,
+    _httpx.codes.INTERNAL_SERVER_ERROR,
+    _httpx.codes.BAD_GATEWAY,
+    _httpx.codes.SERVICE_UNAVAILABLE,
+    _httpx.codes.GATEWAY_TIMEOUT,
+    529, # Overloaded
+) )
+_RETRY_DELAY_BASE = 0.5
+# Line which tokenizes same when repeated, for measurement of framing.
+_ANTHROPIC_PROBE = 'probe\n'
+
+
+_COUNTS_CACHE_SCHEMA = '''
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS counts (
+    digest TEXT NOT NULL,
+    tokenizer TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY ( digest, tokenizer, variant ) );
+CREATE INDEX IF NOT EXISTS counts_accessed ON counts ( accessed );
+'''
+
+
+def _sample_features( text: str ) -> tuple[ float, ... ]:
+    ''' Tallies features of text, from evenly spaced samples if large. '''
+    size = len( text )
+    if size <= _SAMPLE_STRIDE * 2: return tally_features( text )
+    sample = ''.join(
+        text[ i : i + _SAMPLE_SPAN ]
+        for i in range( 0, size, _SAMPLE_STRIDE ) )
+    scale = size / len( sample )
+    return tuple( tally * scale for tally in tally_features( sample ) )
+
+
+def _produce_byte_classes( ) -> bytes:
+    ''' Produces translation of bytes to classes for tallies of features.
+
+        Classes are: 'L', ASCII letter; 'D', digit; 'S', space or tab;
+        'N', line ending; 'P', other ASCII; 'U', byte of non-ASCII.
+    '''
+    table = bytearray( b'P' * 256 )
+    for byte in range( 0x80, 0x100 ): table[ byte ] = ord( 'U' )
+    for byte in b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz':
+        table[ byte ] = ord( 'L' )
+    for byte in b'0123456789': table[ byte ] = ord( 'D' )
+    for byte in b' \t': table[ byte ] = ord( 'S' )
+    for byte in b'\r\n': table[ byte ] = ord( 'N' )
+    return bytes( table )
+
+
+_BYTE_CLASSES = _produce_byte_classes( )
+_ENCODING_MAGIC = b'MIMEOGRAM-RANKS\x01'
+_CONFIDENCE_FACTOR = 1.96
+_DIGITS_MASK = bytes.maketrans( b'LSNPU', b'     ' )
+_encodings: dict[ str, _tiktoken.Encoding ] = { }
+_encodings_mutex = __.threading.Lock( )
+_providers: dict[ str, TokenizerProvider ] = { }
+_providers_mutex = __.threading.Lock( )
+_providers_surveyed = __.threading.Event( )
+_LETTERS_MASK = bytes.maketrans( b'DSNPU', b'     ' )
+_SAMPLE_SPAN = 2048
+_SAMPLE_STRIDE = 32768
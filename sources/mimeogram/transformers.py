@@ -0,0 +1,309 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Transforms of part contents for reduction of tokens. '''
+
+
+from . import __
+from . import metrics as _metrics
+from . import parts as _parts
+from . import tokenizers as _tokenizers
+
+
+_scribe = __.produce_scribe( __name__ )
+
+
+license_patterns_default = (
+    r'SPDX-License-Identifier:',
+    r'Licensed under the',
+    r'Permission is hereby granted',
+    r'GNU (?:Lesser |Affero )?General Public License',
+    r'Copyright (?:\(c\)|©|\d{4})',
+    r'All rights reserved',
+)
+
+
+class Transformers( __.enum.Enum ):
+    ''' Available transforms of part contents. '''
+
+    Comments =              'comments'
+    LicenseHeaders =        'license-headers'
+    TrailingWhitespace =    'trailing-whitespace'
+
+    def produce(
+        self, auxdata: __.appcore.state.Globals
+    ) -> "Transformer":
+        ''' Produces transformer, configured from application options. '''
+        match self:
+            case Transformers.Comments: return CommentsStripper( )
+            case Transformers.LicenseHeaders:
+                options = auxdata.configuration.get( 'transform-parts', { } )
+                patterns = options.get(
+                    'license-patterns', license_patterns_default )
+                return LicenseHeadersStripper.from_patterns( patterns )
+            case Transformers.TrailingWhitespace:
+                return TrailingWhitespaceStripper( )
+
+
+class Transformer(
+    __.immut.DataclassProtocol, __.typx.Protocol,
+    decorators = ( __.typx.runtime_checkable, ),
+):
+    ''' Transform of part content. '''
+
+    @__.abc.abstractmethod
+    def transform( self, part: _parts.Part ) -> str:
+        ''' Transforms content of part. '''
+        raise NotImplementedError
+
+
+class CommentsStripper( Transformer ):
+    ''' Removes whole-line comments, by language of file.
+
+        Only lines which contain nothing but a comment are removed, so that
+        comment markers after code or within strings on same line are not
+        mistaken. Python sources are tokenized, so that lines within
+        multi-line strings are never mistaken either. For other languages,
+        lines within multi-line strings or heredocs which begin with comment
+        marker are removed too. Shebang lines are preserved.
+    '''
+
+    def transform( self, part: _parts.Part ) -> str:
+        suffix = _extract_suffix( part.location )
+        if suffix not in _comment_markers: return part.content
+        content = part.content
+        shebang = ''
+        if content.startswith( '#!' ):
+            index = content.find( '\n' ) + 1 or len( content )
+            shebang, content = content[ : index ], content[ index : ]
+        if suffix in _python_suffixes:
+            return shebang + _strip_python_comments( content )
+        regex = _produce_comment_line_regex( _comment_markers[ suffix ] )
+        return shebang + regex.sub( '', content )
+
+
+class LicenseHeadersStripper( Transformer ):
+    ''' Removes leading comment blocks which match license patterns.
+
+        Comment markers are chosen by language of file. Patterns are
+        compiled into one alternation, so that each leading block is
+        scanned once regardless of number of patterns.
+    '''
+
+    automaton: __.re.Pattern[ str ]
+
+    @classmethod
+    def from_patterns(
+        selfclass, patterns: __.cabc.Sequence[ str ]
+    ) -> __.typx.Self:
+        ''' Produces instance from regular expressions. '''
+        alternation = '|'.join( f"(?:{pattern})" for pattern in patterns )
+        return selfclass( automaton = __.re.compile(
+            alternation or r'(?!)', __.re.IGNORECASE ) )
+
+    def transform( self, part: _parts.Part ) -> str:
+        suffix = _extract_suffix( part.location )
+        regex = _produce_leading_block_regex( suffix )
+        content = part.content
+        if regex is None: return content
+        position = 0
+        if content.startswith( '#!' ):
+            position = content.find( '\n' ) + 1 or len( content )
+        shebang = content[ : position ]
+        retained: list[ str ] = [ ]
+        removed = False
+        while mobject := regex.match( content, position ):
+            block = mobject.group( )
+            if self.automaton.search( block ): removed = True
+            else: retained.append( block.lstrip( '\n' ) )
+            position = mobject.end( )
+        if not removed: return content
+        # Retained blocks and remainder are separated by one blank line.
+        head = '\n'.join( retained )
+        tail = content[ position : ].lstrip( '\n' )
+        if head and tail: return f"{shebang}{head}\n{tail}"
+        return f"{shebang}{head}{tail}"
+
+
+class TrailingWhitespaceStripper( Transformer ):
+    ''' Removes trailing whitespace from lines and end of content. '''
+
+    def transform( self, part: _parts.Part ) -> str:
+        content = _TRAILING_WHITESPACE_REGEX.sub( '', part.content )
+        stripped = content.rstrip( '\n' )
+        return f"{stripped}\n" if stripped != content else content
+
+
+async def transform_parts(
+    parts: __.cabc.Sequence[ _parts.Part ],
+    transformers: __.cabc.Mapping[ str, Transformer ],
+    *,
+    tokenizer: __.Absential[ _tokenizers.Tokenizer ] = __.absent,
+    cache: __.Absential[ _tokenizers.CountsCache ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
+) -> tuple[ _parts.Part, ... ]:
+    ''' Applies transforms, in order, to contents of parts.
+
+        Characters removed by each transform are recorded as counters. If
+        tokenizer is supplied, then tokens removed are also recorded, by
+        counting only those contents which each transform changes. Contents
+        changed by each transform are counted together in batches,
+        consulting cache, if any.
+    '''
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    results = list( parts )
+    indices = [
+        i for i, part in enumerate( parts )
+        if not part.location.startswith( 'mimeogram://' ) ]
+    # Tokens of current content of each part, once counted.
+    tokens: dict[ int, int ] = { }
+    for name, transformer in transformers.items( ):
+        changes: dict[ int, _parts.Part ] = { }
+        for i in indices:
+            content = transformer.transform( results[ i ] )
+            if content == results[ i ].content: continue
+            recorder.increment(
+                f"characters-removed-{name}",
+                len( results[ i ].content ) - len( content ) )
+            changes[ i ] = __.dcls.replace(
+                results[ i ], content = content, digest = None )
+        if not __.is_absent( tokenizer ) and changes:
+            await _count_removed_tokens(
+                name, results, changes, tokens,
+                tokenizer = tokenizer, cache = cache, recorder = recorder )
+        for i, result in changes.items( ): results[ i ] = result
+    for name in transformers:
+        characters = recorder.counters.get( f"characters-removed-{name}", 0 )
+        message = f"Transform '{name}' removed {characters} characters"
+        if not __.is_absent( tokenizer ):
+            removed = recorder.counters.get( f"tokens-removed-{name}", 0 )
+            message = f"{message} and {removed} tokens"
+        _scribe.info( f"{message}." )
+    return tuple( results )
+
+
+_comment_markers: __.immut.Dictionary[ str, str ] = __.immut.Dictionary( {
+    '.bash': '#', '.cfg': '#', '.ini': ';', '.pl': '#', '.py': '#',
+    '.pyi': '#', '.r': '#', '.rb': '#', '.sh': '#', '.toml': '#',
+    '.yaml': '#', '.yml': '#', '.zsh': '#',
+    '.c': '//', '.cc': '//', '.cpp': '//', '.cs': '//', '.go': '//',
+    '.h': '//', '.hpp': '//', '.java': '//', '.js': '//', '.jsx': '//',
+    '.kt': '//', '.rs': '//', '.scala': '//', '.swift': '//', '.ts': '//',
+    '.tsx': '//',
+    '.hs': '--', '.lua': '--', '.sql': '--',
+} )
+
+
+_block_comment_delimiters: __.immut.Dictionary[ str, tuple[ str, str ] ] = (
+    __.immut.Dictionary( {
+        **{ suffix: ( '/*', '*/' ) for suffix in (
+            '.c', '.cc', '.cpp', '.cs', '.css', '.go', '.h', '.hpp',
+            '.java', '.js', '.jsx', '.kt', '.less', '.rs', '.scala',
+            '.scss', '.sql', '.swift', '.ts', '.tsx' ) },
+        **{ suffix: ( '<!--', '-->' ) for suffix in (
+            '.htm', '.html', '.md', '.svg', '.xml' ) },
+    } ) )
+_python_suffixes = frozenset( ( '.py', '.pyi' ) )
+
+
+async def _count_removed_tokens( # noqa: PLR0913
+    name: str,
+    results: __.cabc.Sequence[ _parts.Part ],
+    changes: __.cabc.Mapping[ int, _parts.Part ],
+    tokens: dict[ int, int ],
+    *,
+    tokenizer: _tokenizers.Tokenizer,
+    cache: __.Absential[ _tokenizers.CountsCache ],
+    recorder: _metrics.Recorder,
+) -> None:
+    ''' Records tokens removed by transform, counting changes together.
+
+        Contents before change are counted only if not counted already,
+        as results of earlier transforms. Counts after change are retained.
+    '''
+    uncounted = [ i for i in changes if i not in tokens ]
+    counts = await _tokenizers.count_texts(
+        tokenizer,
+        [   *( results[ i ].content for i in uncounted ),
+            *( part.content for part in changes.values( ) ) ],
+        cache = cache, recorder = recorder )
+    tokens.update( zip( uncounted, counts ) )
+    counts_after = dict( zip( changes, counts[ len( uncounted ) : ] ) )
+    recorder.increment(
+        f"tokens-removed-{name}",
+        sum( tokens[ i ] - count for i, count in counts_after.items( ) ) )
+    tokens.update( counts_after )
+
+
+def _extract_suffix( location: str ) -> str:
+    ''' Extracts suffix of file from location, ignoring any fragment. '''
+    return __.Path( location.split( '#', 1 )[ 0 ] ).suffix.lower( )
+
+
+def _produce_comment_line_regex( marker: str ) -> __.re.Pattern[ str ]:
+    ''' Produces regex for whole lines of comment with marker. '''
+    return __.re.compile(
+        rf'''^[ \t]*{__.re.escape( marker )}[^\n]*(?:\n|\Z)''',
+        __.re.MULTILINE )
+
+
+def _produce_leading_block_regex(
+    suffix: str
+) -> __.typx.Optional[ __.re.Pattern[ str ] ]:
+    ''' Produces regex for leading comment block, by language of file.
+
+        Block is blank lines, then run of line comments or one block
+        comment. Returns None if no comment syntax is known for suffix.
+    '''
+    alternatives: list[ str ] = [ ]
+    if suffix in _comment_markers:
+        marker = __.re.escape( _comment_markers[ suffix ] )
+        alternatives.append( rf'''(?:[ \t]*{marker}[^\n]*(?:\n|\Z))+''' )
+    if suffix in _block_comment_delimiters:
+        opener, closer = map(
+            __.re.escape, _block_comment_delimiters[ suffix ] )
+        alternatives.append(
+            rf'''[ \t]*{opener}.*?{closer}[^\n]*(?:\n|\Z)''' )
+    if not alternatives: return None
+    return __.re.compile(
+        rf'''\n*(?:{'|'.join( alternatives )})''', __.re.DOTALL )
+
+
+def _strip_python_comments( content: str ) -> str:
+    ''' Removes whole-line comments from Python source, via tokenizer.
+
+        Source which cannot be tokenized is returned unchanged.
+    '''
+    import tokenize
+    from io import StringIO
+    lines = StringIO( content ).readlines( )
+    comments: set[ int ] = set( )
+    try:
+        for token in tokenize.generate_tokens( iter( lines ).__next__ ):
+            if tokenize.COMMENT != token.type: continue
+            if token.line[ : token.start[ 1 ] ].strip( ): continue
+            comments.add( token.start[ 0 ] )
+    except ( SyntaxError, tokenize.TokenError ): return content
+    return ''.join(
+        line for i, line in enumerate( lines, 1 ) if i not in comments )
+
+
+_TRAILING_WHITESPACE_REGEX = __.re.compile(
+    r'''[ \t]+$''', __.re.MULTILINE )
@@ -25,12 +25,18 @@ from . import __
 from . import fsprotect as _fsprotect
 from . import interactions as _interactions
 from . import interfaces as _interfaces
+from . import iobackends as _iobackends
+from . import metrics as _metrics
 from . import parts as _parts
 
 
 _scribe = __.produce_scribe( __name__ )
 
 
+_Update: __.typx.TypeAlias = (
+    tuple[ _parts.Partlike, __.Path, __.typx.Optional[ str ] ] )
+
+
 class ReviewModes( __.enum.Enum ): # TODO: Python 3.11: StrEnum
     ''' Controls how updates are reviewed and applied. '''
 
@@ -46,11 +52,27 @@ class Reverter( __.immut.DataclassObject ):
         __.dcls.field( default_factory = dict[ __.Path, str ] ) )
     revisions: list[ __.Path ] = (
         __.dcls.field( default_factory = list[ __.Path ] ) )
+    backend: _iobackends.IoBackend = (
+        __.dcls.field( default_factory = _iobackends.AiofilesBackend ) )
+    spool: __.Absential[ __.Path ] = __.absent
+    spooled: dict[ __.Path, __.Path ] = (
+        __.dcls.field( default_factory = dict[ __.Path, __.Path ] ) )
+
+    async def save( self, part: _parts.Partlike, path: __.Path ) -> None:
+        ''' Saves original file content if it exists.
 
-    async def save( self, part: _parts.Part, path: __.Path ) -> None:
-        ''' Saves original file content if it exists. '''
+            If spool directory is given, then original content is copied
+            there rather than held in memory.
+        '''
         from .exceptions import ContentAcquireFailure
         if not path.exists( ): return
+        if not __.is_absent( self.spool ):
+            copy = self.spool / str( len( self.spooled ) )
+            try: await __.asyncio.to_thread( _copy_file, path, copy )
+            except Exception as exc:
+                raise ContentAcquireFailure( path ) from exc
+            self.spooled[ path ] = copy
+            return
         try:
             content = (
                 await __.appcore.io.acquire_text_file_async(
@@ -66,70 +88,124 @@ class Reverter( __.immut.DataclassObject ):
             if path in self.originals:
                 try:
                     await _update_content_atomic(
-                        path, self.originals[ path ] )
+                        path, self.originals[ path ], backend = self.backend )
                 except ContentUpdateFailure:
                     _scribe.exception( "Failed to restore {path}" )
+            elif path in self.spooled:
+                try:
+                    await self.backend.update_bytes_atomic(
+                        path, await self.backend.acquire_bytes(
+                            self.spooled[ path ] ) )
+                except Exception:
+                    _scribe.exception( f"Failed to restore {path}" )
             else: path.unlink( )
 
 
 class Queue( __.immut.DataclassObject ):
     ''' Manages queued file updates for batch application. '''
 
-    updates: list[ tuple[ _parts.Part, __.Path, str ] ] = (
-        __.dcls.field(
-            default_factory = list[ tuple[ _parts.Part, __.Path, str ] ] ) )
+    updates: list[ _Update ] = (
+        __.dcls.field( default_factory = list[ _Update ] ) )
     reverter: Reverter = ( __.dcls.field( default_factory = Reverter ) )
+    backend: _iobackends.IoBackend = (
+        __.dcls.field( default_factory = _iobackends.AiofilesBackend ) )
+    recorder: _metrics.Recorder = (
+        __.dcls.field( default_factory = _metrics.Recorder ) )
+    bounded: bool = False
 
     def enqueue(
-        self, part: _parts.Part, target: __.Path, content: str
+        self,
+        part: _parts.Partlike,
+        target: __.Path,
+        content: __.typx.Optional[ str ],
     ) -> None:
-        ''' Adds a file update to queue. '''
+        ''' Adds a file update to queue.
+
+            If content is absent, then it is taken from part when applied.
+        '''
         self.updates.append( ( part, target, content ) )
 
     async def apply( self ) -> None:
-        ''' Applies all queued updates with parallel async fanout. '''
+        ''' Applies all queued updates.
+
+            Updates are fanned out in parallel, unless queue is bounded.
+            Bounded queues apply updates one at a time, so that content of
+            only one part is resident at a time.
+        '''
         try:
-            await __.asyncf.gather_async(
-                *(  self.reverter.save( part, target )
-                    for part, target, _ in self.updates ),
-                error_message = "Failed to backup files." )
-            await __.asyncf.gather_async(
-                *(  _update_content_atomic(
-                        target, content, charset = part.charset )
-                    for part, target, content in self.updates ),
-                error_message = "Failed to apply updates." )
+            if self.bounded:
+                for part, target, _ in self.updates:
+                    await self.reverter.save( part, target )
+                for update in self.updates:
+                    await self._apply_update( *update )
+            else:
+                await __.asyncf.gather_async(
+                    *(  self.reverter.save( part, target )
+                        for part, target, _ in self.updates ),
+                    error_message = "Failed to backup files." )
+                await __.asyncf.gather_async(
+                    *(  self._apply_update( *update )
+                        for update in self.updates ),
+                    error_message = "Failed to apply updates." )
         except Exception:
             await self.reverter.restore( )
             raise
         for _, target, _ in self.updates:
             self.reverter.revisions.append( target )
 
+    async def _apply_update(
+        self,
+        part: _parts.Partlike,
+        target: __.Path,
+        content: __.typx.Optional[ str ],
+    ) -> None:
+        await _update_content_atomic(
+            target, part.content if content is None else content,
+            charset = part.charset,
+            backend = self.backend,
+            recorder = self.recorder )
+
 
 async def update( # noqa: PLR0913
     auxdata: __.appcore.state.Globals,
-    parts: __.cabc.Sequence[ _parts.Part ],
+    parts: __.cabc.Sequence[ _parts.Partlike ],
     mode: ReviewModes,
     base: __.Absential[ __.Path ] = __.absent,
     interactor: __.Absential[ _interfaces.PartInteractor ] = __.absent,
     protector: __.Absential[ _fsprotect.Protector ] = __.absent,
+    *,
+    backend: __.Absential[ _iobackends.IoBackend ] = __.absent,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
 ) -> None:
-    ''' Updates filesystem locations from mimeogram. '''
+    ''' Updates filesystem locations from mimeogram.
+
+        If any parts have content decoded on demand, then updates are
+        applied one at a time and original contents are spooled to a
+        temporary directory, so that memory use is bounded by largest part
+        rather than by whole mimeogram.
+    '''
+    from tempfile import TemporaryDirectory
     if __.is_absent( base ): base = __.Path( )
     if __.is_absent( protector ):
         protector = _fsprotect.Cache.from_configuration( auxdata = auxdata )
-    queue = Queue( ) # pyright: ignore
-    for part in parts:
-        if part.location.startswith( 'mimeogram://' ): continue
-        destination = _derive_location( part.location, base = base )
-        target = _parts.Target(
-            part = part,
-            destination = destination,
-            protection = protector.verify( destination ) )
-        action, content = await update_part(
-            auxdata, target, mode = mode, interactor = interactor )
-        if _parts.Resolutions.Ignore is action: continue
-        queue.enqueue( target.part, target.destination, content )
-    await queue.apply( )
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
+    if __.is_absent( backend ):
+        backend = _iobackends.produce_backend( auxdata )
+    bounded = any( isinstance( part, _parts.LazyPart ) for part in parts )
+    with __.ctxl.ExitStack( ) as exits:
+        spool: __.Absential[ __.Path ] = __.absent
+        if bounded:
+            spool = __.Path( exits.enter_context( TemporaryDirectory( ) ) )
+        queue = Queue( # pyright: ignore
+            reverter = Reverter( backend = backend, spool = spool ),
+            backend = backend,
+            recorder = recorder,
+            bounded = bounded )
+        await _enqueue_updates(
+            auxdata, queue, parts, mode,
+            base = base, interactor = interactor, protector = protector )
+        with recorder.measure( 'write' ): await queue.apply( )
+    recorder.increment( 'parts-applied', len( queue.updates ) )
 
 
 async def update_part(
@@ -151,6 +227,12 @@ async def update_part(
     return _parts.Resolutions.Apply, content
 
 
+def _copy_file( source: __.Path, destination: __.Path ) -> None:
+    ''' Copies file content without metadata. '''
+    from shutil import copyfile
+    copyfile( source, destination )
+
+
 def _derive_location(
     location: __.typx.Annotated[
         str, __.typx.Doc( "Part location (URL or filesystem path)." ) ],
@@ -178,36 +260,61 @@ def _derive_location(
     return __.Path( ) / location_
 
 
-async def _update_content_atomic(
+async def _enqueue_updates( # noqa: PLR0913
+    auxdata: __.appcore.state.Globals,
+    queue: Queue,
+    parts: __.cabc.Sequence[ _parts.Partlike ],
+    mode: ReviewModes,
+    *,
+    base: __.Path,
+    interactor: __.Absential[ _interfaces.PartInteractor ],
+    protector: _fsprotect.Protector,
+) -> None:
+    ''' Reviews parts and enqueues updates for those to apply. '''
+    recorder = queue.recorder
+    for part in parts:
+        if part.location.startswith( 'mimeogram://' ): continue
+        if '#line=' in part.location:
+            _scribe.warning(
+                f"Skipping range of lines at '{part.location}'. "
+                "Only whole files can be applied." )
+            recorder.increment( 'parts-ignored' )
+            continue
+        destination = _derive_location( part.location, base = base )
+        target = _parts.Target(
+            part = part,
+            destination = destination,
+            protection = protector.verify( destination ) )
+        if target.protection: recorder.increment( 'parts-protected' )
+        with recorder.measure( 'review' ):
+            action, content = await update_part(
+                auxdata, target, mode = mode, interactor = interactor )
+        if _parts.Resolutions.Ignore is action:
+            recorder.increment( 'parts-ignored' )
+            continue
+        # Unreviewed content is taken from part again when applied.
+        queue.enqueue(
+            target.part, target.destination,
+            None if ReviewModes.Silent is mode else content )
+
+
+async def _update_content_atomic( # noqa: PLR0913
     location: __.Path,
     content: str,
     charset: str = 'utf-8',
-    linesep: __.detextive.LineSeparators = __.detextive.LineSeparators.LF
+    linesep: __.detextive.LineSeparators = __.detextive.LineSeparators.LF,
+    backend: __.Absential[ _iobackends.IoBackend ] = __.absent,
+    *,
+    recorder: __.Absential[ _metrics.Recorder ] = __.absent,
 ) -> None:
     ''' Updates file content atomically, if possible. '''
-    import aiofiles.os as os # noqa: PLR0402
-    from aiofiles.tempfile import NamedTemporaryFile # pyright: ignore
+    if __.is_absent( backend ): backend = _iobackends.AiofilesBackend( )
+    if __.is_absent( recorder ): recorder = _metrics.Recorder( )
     location.parent.mkdir( parents = True, exist_ok = True )
     content = linesep.nativize( content )
-    has_error = False
-    async with NamedTemporaryFile(
-        delete = False,
-        dir = location.parent,
-        suffix = f"{location.suffix}.tmp",
-    ) as stream:
-        filename = str( stream.name )
-        try: await stream.write( content.encode( charset ) )
-        except Exception:
-            has_error = True
-    # Windows: Replace must happen after file handle is closed.
-    if not has_error:
-        try: await os.replace( filename, str( location ) )
-        except Exception:
-            has_error = True
-    if await os.path.exists( filename ):
-        try: await os.remove( filename )
-        except Exception:
-            _scribe.warning( f"Could not remove temporary file: {filename}" )
-    if has_error:
+    try: content_bytes = content.encode( charset )
+    except Exception as exc:
         from .exceptions import ContentUpdateFailure
-        raise ContentUpdateFailure( location )
+        raise ContentUpdateFailure( location ) from exc
+    await backend.update_bytes_atomic( location, content_bytes )
+    recorder.increment( 'bytes-written', len( content_bytes ) )
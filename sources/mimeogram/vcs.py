@@ -0,0 +1,92 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Queries of version control systems for changed files. '''
+
+
+from . import __
+
+
+_scribe = __.produce_scribe( __name__ )
+
+
+async def collect_git_changes(
+    revision: str,
+    untracked: bool = False,
+    directory: __.Absential[ __.Path ] = __.absent,
+) -> tuple[ __.Path, ... ]:
+    ''' Collects files changed in working tree relative to Git revision.
+
+        Includes modified, added, copied, renamed, and type-changed files
+        within directory. Deleted files are excluded, as they have no
+        content to acquire. Untracked files, which are not ignored, are
+        included on request. Locations are absolute and in order reported
+        by Git.
+    '''
+    if __.is_absent( directory ): directory = __.Path.cwd( )
+    root = directory.resolve( )
+    # Note: Both commands report paths relative to directory.
+    queries = [ _run_git(
+        root, 'diff', '--name-status', '-z', '--relative', revision, '--' ) ]
+    if untracked:
+        queries.append( _run_git(
+            root, 'ls-files', '--others', '--exclude-standard', '-z' ) )
+    reports = await __.asyncio.gather( *queries )
+    names = list( _parse_name_status( reports[ 0 ] ) )
+    if untracked:
+        names.extend(
+            __.os.fsdecode( name )
+            for name in reports[ 1 ].split( b'\0' ) if name )
+    return tuple( root / name for name in dict.fromkeys( names ) )
+
+
+def _parse_name_status( report: bytes ) -> __.cabc.Iterator[ str ]:
+    ''' Parses NUL-delimited output of 'git diff --name-status -z'. '''
+    fields = report.split( b'\0' )
+    i = 0
+    while i < len( fields ) and fields[ i ]:
+        status = fields[ i ].decode( )
+        # Renames and copies report source and destination paths.
+        if status[ 0 ] in ( 'C', 'R' ):
+            yield __.os.fsdecode( fields[ i + 2 ] )
+            i += 3
+            continue
+        if 'D' != status: yield __.os.fsdecode( fields[ i + 1 ] )
+        i += 2
+
+
+async def _run_git( directory: __.Path, *arguments: str ) -> bytes:
+    ''' Runs Git command and captures its output. '''
+    from .exceptions import ProgramAbsenceError, VcsQueryFailure
+    command = ( 'git', '-C', str( directory ), *arguments )
+    _scribe.debug( f"Running: {' '.join( command )}" )
+    try:
+        process = await __.asyncio.create_subprocess_exec(
+            *command,
+            stdin = __.asyncio.subprocess.DEVNULL,
+            stdout = __.asyncio.subprocess.PIPE,
+            stderr = __.asyncio.subprocess.PIPE )
+    except FileNotFoundError as exc:
+        raise ProgramAbsenceError( 'git' ) from exc
+    output, error = await process.communicate( )
+    if process.returncode:
+        reason = error.decode( errors = 'replace' )
+        raise VcsQueryFailure( arguments, reason )
+    return output
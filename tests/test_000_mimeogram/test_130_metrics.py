@@ -0,0 +1,125 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+
+''' Tests for metrics module. '''
+
+
+import json
+
+import pytest
+
+from . import PACKAGE_NAME, cache_import_module
+
+
+def test_100_recorder_measures_and_counts( ):
+    ''' Recorder accumulates stage timings, calls, and counters. '''
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    recorder = metrics.Recorder( )
+    for _ in range( 2 ):
+        with recorder.measure( 'format' ): sum( range( 1000 ) )
+    recorder.increment( 'parts' )
+    recorder.increment( 'parts', 2 )
+    assert recorder.calls[ 'format' ] == 2
+    assert recorder.wall_times[ 'format' ] > 0
+    assert recorder.counters[ 'parts' ] == 3
+
+
+def test_110_recorder_measures_failures( ):
+    ''' Stage is recorded even if it raises. '''
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    recorder = metrics.Recorder( )
+    with pytest.raises( ValueError ), recorder.measure( 'parse' ):
+        raise ValueError
+    assert recorder.calls[ 'parse' ] == 1
+
+
+def test_200_render_stable_schema( ):
+    ''' Declared stages and counters are rendered, even if unrecorded. '''
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    recorder = metrics.Recorder( )
+    with recorder.measure( 'custom' ): pass
+    recorder.increment( 'tokens', 42 )
+    document = recorder.render( 'create', status = 0 )
+    assert document[ 'schema' ] == metrics.schema
+    assert document[ 'command' ] == 'create'
+    assert document[ 'status' ] == 0
+    assert document[ 'wall-seconds' ] >= 0
+    assert set( document[ 'stages' ] ) >= {
+        'acquire', 'scan', 'ignore-evaluation', 'read', 'decode',
+        'format', 'tokenize', 'emit' }
+    assert document[ 'stages' ][ 'read' ] == {
+        'calls': 0, 'cpu-seconds': 0.0, 'wall-seconds': 0.0 }
+    assert document[ 'counters' ][ 'tokens' ] == 42
+    assert document[ 'counters' ][ 'files-scanned' ] == 0
+    apply_document = recorder.render( 'apply' )
+    assert 'parts-protected' in apply_document[ 'counters' ]
+    assert 'write' in apply_document[ 'stages' ]
+    assert 'tokens' not in apply_document[ 'counters' ]
+    assert apply_document[ 'extras' ][ 'counters' ][ 'tokens' ] == 42
+
+
+def test_210_render_undeclared_extras( ):
+    ''' Undeclared stages and counters are rendered only under extras. '''
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    recorder = metrics.Recorder( )
+    declared = recorder.render( 'create' )
+    with recorder.measure( 'custom' ): pass
+    recorder.increment( 'characters-removed-comments', 7 )
+    recorder.increment( 'parts', 2 )
+    document = recorder.render( 'create' )
+    assert set( document[ 'stages' ] ) == set( declared[ 'stages' ] )
+    assert set( document[ 'counters' ] ) == set( declared[ 'counters' ] )
+    assert declared[ 'extras' ] == { 'stages': { }, 'counters': { } }
+    extras = document[ 'extras' ]
+    assert extras[ 'stages' ][ 'custom' ][ 'calls' ] == 1
+    assert extras[ 'counters' ] == { 'characters-removed-comments': 7 }
+    assert document[ 'counters' ][ 'parts' ] == 2
+
+
+def test_300_recording_saves_on_exit( provide_tempdir ):
+    ''' Records are saved with exit status on success and failure. '''
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    location = provide_tempdir / 'stats' / 'create.json'
+    with metrics.recording( 'create', str( location ) ) as recorder:
+        recorder.increment( 'parts' )
+    document = json.loads( location.read_text( ) )
+    assert document[ 'status' ] == 0
+    assert document[ 'counters' ][ 'parts' ] == 1
+    with (
+        pytest.raises( SystemExit ),
+        metrics.recording( 'apply', location ),
+    ): raise SystemExit( 2 )
+    document = json.loads( location.read_text( ) )
+    assert document[ 'command' ] == 'apply'
+    assert document[ 'status' ] == 2
+    with (
+        pytest.raises( RuntimeError ),
+        metrics.recording( 'apply', location ),
+    ): raise RuntimeError
+    assert json.loads( location.read_text( ) )[ 'status' ] == 1
+
+
+def test_310_recording_without_location( provide_tempdir ):
+    ''' Nothing is saved without location. '''
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    with metrics.recording( 'create' ) as recorder:
+        recorder.increment( 'parts' )
+    assert not list( provide_tempdir.iterdir( ) )
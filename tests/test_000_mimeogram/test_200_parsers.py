@@ -293,3 +293,254 @@ def test_110_no_empty_line_between_headers( ):
     assert len( parsed_parts ) == 1
     assert parsed_parts[ 0 ].location == 'test.txt'
     assert parsed_parts[ 0 ].content == 'Content'
+
+
+_STREAM_SAMPLES = (
+    _create_sample_mimeogram( ),
+    _create_sample_mimeogram( content = '你好世界 Hello World 🌍\n\nMore' ),
+    (   "Leading text\n"
+        "--====MIMEOGRAM_0123456789abcdef====\n"
+        "Content-Location: first.txt\n"
+        "Content-Type: text/plain; charset=utf-8; linesep=LF\n"
+        "\n"
+        "First content\n"
+        "\n"
+        "--====MIMEOGRAM_0123456789abcdef====\n"
+        "content-location: second.txt\n"
+        "Content-Type: text/html; charset=utf-8; linesep=LF\n"
+        "\n"
+        "<html>Second content</html>\n"
+        "--====MIMEOGRAM_0123456789abcdef====--\n"
+        "Some trailing text" ),
+    (   "--====MIMEOGRAM_0123456789abcdef====\r\n"
+        "Content-Location: test.txt\r\n"
+        "Content-Type: text/plain; charset=utf-8; linesep=CRLF\r\n"
+        "\r\n"
+        "Content\r\n"
+        "--====MIMEOGRAM_0123456789abcdef====--\r\n" ),
+    (   "--====MIMEOGRAM_0123456789abcdef====\n"
+        "Content-Location: first.txt\n"
+        "Content-Type: text/plain; charset=utf-8; linesep=LF\n"
+        "First content\n"
+        "--====MIMEOGRAM_0123456789abcdef====\n"
+        "Content-Location: invalid.txt\n"
+        "\n"
+        "Invalid part\n"
+        "--====MIMEOGRAM_0123456789abcdef====\n"
+        "Content-Location: last.txt\n"
+        "Content-Type: text/plain; charset=utf-8; linesep=LF\n"
+        "\n"
+        "Unterminated content\n" ),
+)
+
+
+@pytest.mark.parametrize( 'text', _STREAM_SAMPLES )
+def test_200_parse_stream_equivalence( text ):
+    ''' Streaming parser produces same parts as whole-text parser. '''
+    from io import StringIO
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    expected = parsers.parse( text )
+    assert list( parsers.parse_stream( StringIO( text ) ) ) == expected
+    assert list( parsers.parse_stream( text.splitlines( True ) ) ) == (
+        expected )
+
+
+def test_210_parse_stream_is_incremental( ):
+    ''' Parts are yielded before rest of stream is consumed. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    consumed = [ ]
+
+    def produce_lines( ):
+        for line in _STREAM_SAMPLES[ 2 ].splitlines( True ):
+            consumed.append( line )
+            yield line
+        consumed.append( None )
+
+    parts = parsers.parse_stream( produce_lines( ) )
+    first = next( parts )
+    assert first.location == 'first.txt'
+    assert first.content == 'First content\n'
+    assert consumed[ -1 ] == "--====MIMEOGRAM_0123456789abcdef====\n"
+    assert [ part.location for part in parts ] == [ 'second.txt' ]
+    assert None not in consumed
+
+
+def test_220_parse_stream_failures( ):
+    ''' Streaming parser rejects empty or boundary-less streams. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    with pytest.raises( exceptions.MimeogramParseFailure, match = 'Empty' ):
+        list( parsers.parse_stream( [ '\n', '  \n' ] ) )
+    with pytest.raises(
+        exceptions.MimeogramParseFailure, match = 'No mimeogram boundary'
+    ): list( parsers.parse_stream( [ 'Just some text\n' ] ) )
+
+
+def test_230_parse_preserves_content_characters( ):
+    ''' Only newlines and carriage returns are treated as line breaks. '''
+    from io import StringIO
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    content = 'page one\x0cpage two\u2028same line\r\nnext\rlast\n'
+    text = _create_sample_mimeogram( content = content )
+    expected = 'page one\x0cpage two\u2028same line\nnext\nlast\n'
+    assert parsers.parse( text )[ 0 ].content == expected
+    parts = list( parsers.parse_stream( StringIO( text, newline = '' ) ) )
+    assert parts[ 0 ].content == expected
+    ptext = text.split( '\n', 1 )[ 1 ]
+    ptext = ptext[ : ptext.index( '--====MIMEOGRAM' ) ]
+    assert parsers.parse_part( ptext ).content == expected
+
+
+@pytest.mark.parametrize( 'text', _STREAM_SAMPLES )
+def test_240_parse_buffer_equivalence( text ):
+    ''' Lazy parts from buffer materialize to same parts as parser. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    parts = parsers.parse_buffer( text.encode( 'utf-8' ) )
+    assert [ part.materialize( ) for part in parts ] == (
+        list( parsers.parse( text ) ) )
+
+
+def test_250_parse_bytes_per_part_charsets( ):
+    ''' Raw parser decodes bodies not in UTF-8 with declared charsets. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    boundary = '====MIMEOGRAM_0123456789abcdef===='
+    content = b''.join( (
+        f"--{boundary}\n".encode( ),
+        b'Content-Location: utf8.txt\n',
+        b'Content-Type: text/plain; linesep=LF\n\n',
+        'café\n'.encode( 'utf-8' ),
+        f"--{boundary}\n".encode( ),
+        b'Content-Location: latin1.txt\n',
+        b'Content-Type: text/plain; charset=iso-8859-1; linesep=LF\n\n',
+        'naïve\r\n'.encode( 'iso-8859-1' ),
+        f"--{boundary}\n".encode( ),
+        b'Content-Location: utf16.txt\n',
+        b'Content-Type: text/plain; charset=utf-16-le; linesep=LF\n\n',
+        'é'.encode( 'utf-16-le' ) + b'\n',
+        f"--{boundary}--\n".encode( ),
+    ) )
+    parts = parsers.parse_bytes( content )
+    assert [ part.location for part in parts ] == (
+        [ 'utf8.txt', 'latin1.txt', 'utf16.txt' ] )
+    assert [ part.content for part in parts ] == [ 'café', 'naïve', 'é' ]
+    assert parts[ 1 ].charset == 'iso-8859-1'
+    text = _create_sample_mimeogram( content = 'résumé' )
+    assert parsers.parse_bytes( text.encode( 'utf-8' ) ) == (
+        parsers.parse( text ) )
+
+
+@pytest.mark.parametrize(
+    'charset', ( 'iso-8859-1', 'utf-16', 'utf-16-le', 'utf-32' ) )
+def test_251_parse_bytes_utf8_bodies_first( charset ):
+    ''' Raw parser decodes bodies as UTF-8, as written, before charset. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    boundary = '====MIMEOGRAM_0123456789abcdef===='
+    content = b''.join( (
+        f"--{boundary}\n".encode( ),
+        b'Content-Location: test.txt\n',
+        f"Content-Type: text/plain; charset={charset}; linesep=LF\n\n"
+        .encode( ),
+        'café naïve abcd\n'.encode( 'utf-8' ),
+        f"--{boundary}--\n".encode( ),
+    ) )
+    parts = parsers.parse_bytes( content )
+    assert [ part.content for part in parts ] == [ 'café naïve abcd' ]
+    assert parts[ 0 ].charset == charset
+
+
+@pytest.mark.parametrize(
+    'charset',
+    ( 'utf-8-sig', 'utf-16', 'utf-16-le', 'utf-16-be', 'utf-32',
+      'utf-32-le' ) )
+def test_252_parse_bytes_wide_charsets( charset ):
+    ''' Raw parser decodes mimeograms with byte order marks or wide units. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    text = _create_sample_mimeogram( content = 'résumé “quoted”' )
+    parts = parsers.parse_bytes( text.encode( charset ) )
+    assert parts == parsers.parse( text )
+    assert parts[ 0 ].content == 'résumé “quoted”'
+
+
+@pytest.mark.parametrize( 'charset', ( 'cp1252', 'iso-8859-1' ) )
+def test_254_parse_bytes_legacy_container( charset ):
+    ''' Raw parser decodes bodies with charset of resaved mimeogram. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    content = 'naïve café, déjà vu, façade, crème brûlée\n' * 8
+    text = _create_sample_mimeogram( content = content )
+    parts = parsers.parse_bytes( text.encode( charset ) )
+    assert len( parts ) == 1
+    assert parts[ 0 ].content == content
+    assert parts[ 0 ].charset == 'utf-8'
+
+
+def test_256_parse_bytes_reports_decode_failures( ):
+    ''' Raw parser raises on bodies which cannot be decoded. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    boundary = '====MIMEOGRAM_0123456789abcdef===='
+    content = b''.join( (
+        f"--{boundary}\n".encode( ),
+        b'Content-Location: bogus.txt\n',
+        b'Content-Type: text/plain; charset=bogus; linesep=LF\n\n',
+        b'\xff\xfe\n',
+        f"--{boundary}--\n".encode( ),
+    ) )
+    with pytest.raises( exceptions.ContentDecodeFailure, match = 'bogus' ):
+        parsers.parse_bytes( content )
+    lazy_part = parsers.parse_buffer( content )[ 0 ]
+    with pytest.raises( exceptions.ContentDecodeFailure ):
+        lazy_part.content
+
+
+def test_258_parse_mapped( ):
+    ''' Mapped parser defers decoding unless mimeogram must be decoded. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    content = 'naïve café, déjà vu\n'
+    text = _create_sample_mimeogram( content = content )
+    for charset, species in (
+        ( 'utf-8', parts.LazyPart ),
+        ( 'cp1252', parts.Part ),
+        ( 'utf-16', parts.Part ),
+    ):
+        mparts = parsers.parse_mapped( text.encode( charset ) )
+        assert [ type( part ) for part in mparts ] == [ species ]
+        assert mparts[ 0 ].content == content
+
+
+def test_260_parse_parallel_equivalence( ):
+    ''' Parallel parse reassembles parts in order and skips invalid ones. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    boundary = '====MIMEOGRAM_0123456789abcdef===='
+    chunks = [ ]
+    for i in range( 24 ):
+        location = f"Content-Location: file{i:02d}.txt\n" if i % 7 else ''
+        chunks.append(
+            f"--{boundary}\n"
+            f"{location}"
+            "Content-Type: text/plain; charset=utf-8; linesep=LF\n"
+            "\n"
+            f"Content {i}\r\n" )
+    text = ''.join( chunks ) + f"--{boundary}--\n"
+    expected = parsers.parse( text )
+    assert len( expected ) == 20
+    assert parsers.parse( text, workers = 2, threshold = 1 ) == expected
+    assert parsers.parse( text, workers = 2 ) == expected
+
+
+def test_270_split_mimeograms( ):
+    ''' Concatenated mimeograms are split at their final boundaries. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    first = _create_sample_mimeogram( location = 'first.txt' )
+    second = _create_sample_mimeogram(
+        location = 'second.txt',
+        boundary = '====MIMEOGRAM_fedcba9876543210====' )
+    stream = f"{first}Some prose.\n{second}\n  \n"
+    texts = list( parsers.split_mimeograms(
+        stream.splitlines( True ) ) )
+    assert texts == [ first, f"Some prose.\n{second}" ]
+    assert [ parsers.parse( text )[ 0 ].location for text in texts ] == (
+        [ 'first.txt', 'second.txt' ] )
+    texts = list( parsers.split_mimeograms(
+        [ *first.splitlines( True ), 'x' ] ) )
+    assert texts == [ first, 'x' ]
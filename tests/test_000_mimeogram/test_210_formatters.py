@@ -21,6 +21,7 @@
 ''' Tests for formatters module. '''
 
 
+import hashlib
 import re
 
 import pytest
@@ -334,3 +335,69 @@ def test_120_deterministic_boundary_metadata_sensitivity( ):
         [ part2 ], deterministic_boundary = True
     )
     assert mimeogram1 != mimeogram2
+
+
+def test_130_deterministic_boundary_from_digests( ):
+    ''' Deterministic boundary derives from acquisition digests. '''
+    formatters = cache_import_module( f"{PACKAGE_NAME}.formatters" )
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    part = _create_sample_part( content = 'Digested content' )
+    digest = hashlib.sha256( b'Digested content' ).hexdigest( )
+    digested = parts.Part(
+        location = part.location,
+        mimetype = part.mimetype,
+        charset = part.charset,
+        linesep = part.linesep,
+        content = part.content,
+        digest = digest )
+    assert digested == part
+    boundary_pattern = r'--====MIMEOGRAM_([0-9a-f]{64})===='
+    mimeogram1 = formatters.format_mimeogram(
+        [ part ], deterministic_boundary = True )
+    mimeogram2 = formatters.format_mimeogram(
+        [ digested ], deterministic_boundary = True )
+    assert mimeogram1 == mimeogram2
+    # Content is not hashed again when digest is present.
+    stale = parts.Part(
+        location = part.location,
+        mimetype = part.mimetype,
+        charset = part.charset,
+        linesep = part.linesep,
+        content = part.content,
+        digest = '0' * 64 )
+    mimeogram3 = formatters.format_mimeogram(
+        [ stale ], deterministic_boundary = True )
+    match1 = re.search( boundary_pattern, mimeogram1 )
+    match3 = re.search( boundary_pattern, mimeogram3 )
+    assert match1 is not None
+    assert match3 is not None
+    assert match1.group( 1 ) != match3.group( 1 )
+
+
+@pytest.mark.parametrize( 'message', ( None, '', 'Hello' ) )
+def test_200_format_to_stream_equivalence( message ):
+    ''' Segments written to stream form same mimeogram as formatted text. '''
+    from io import StringIO
+    formatters = cache_import_module( f"{PACKAGE_NAME}.formatters" )
+    parts = [
+        _create_sample_part( location = 'first.txt', content = 'First\n' ),
+        _create_sample_part( location = 'second.txt', content = 'Second' ),
+    ]
+    expected = formatters.format_mimeogram(
+        parts, message = message, deterministic_boundary = True )
+    stream = StringIO( )
+    size = formatters.format_mimeogram_to(
+        stream, parts, message = message, deterministic_boundary = True )
+    assert stream.getvalue( ) == expected
+    assert size == len( expected )
+    segments = list( formatters.format_mimeogram_segments(
+        parts, message = message, deterministic_boundary = True ) )
+    assert any( segment is parts[ 0 ].content for segment in segments )
+
+
+def test_210_format_segments_empty( ):
+    ''' Empty mimeogram is rejected before any segment is produced. '''
+    formatters = cache_import_module( f"{PACKAGE_NAME}.formatters" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    with pytest.raises( exceptions.MimeogramFormatEmpty ):
+        formatters.format_mimeogram_segments( [ ] )
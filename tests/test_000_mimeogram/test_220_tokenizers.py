@@ -29,8 +29,18 @@ try:  # pragma: no cover - skip if tiktoken resources unavailable
 
     _tiktoken.get_encoding( "cl100k_base" )
 except Exception:  # best-effort check
-    pytest.skip( "tiktoken resources unavailable", allow_module_level = True )
+    _resources_available = False
+else: _resources_available = True
 
+requires_resources = pytest.mark.skipif(
+    not _resources_available, reason = "tiktoken resources unavailable" )
+
+try: import tokenizers as _huggingface_tokenizers
+except ImportError: _huggingface_available = False
+else: _huggingface_available = True
+
+
+@requires_resources
 @pytest.mark.asyncio
 async def test_100_produce_tokenizer_default_tiktoken( ):
     ''' Default Tiktoken tokenizer uses expected variant. '''
@@ -39,6 +49,7 @@ async def test_100_produce_tokenizer_default_tiktoken( ):
     assert isinstance( tokenizer, tokenizers.Tiktoken )
     assert tokenizer.codec.name == "cl100k_base"
 
+@requires_resources
 @pytest.mark.asyncio
 async def test_110_produce_tokenizer_tiktoken_variant( ):
     ''' Tiktoken tokenizer applies specified variant. '''
@@ -48,6 +59,7 @@ async def test_110_produce_tokenizer_tiktoken_variant( ):
     assert isinstance( tokenizer, tokenizers.Tiktoken )
     assert tokenizer.codec.name == "o200k_base"
 
+@requires_resources
 @pytest.mark.asyncio
 async def test_120_validate_tokenizer_tiktoken_invalid_variant( ):
     ''' Invalid variant for Tiktoken raises TokenizerVariantInvalidity. '''
@@ -60,13 +72,16 @@ async def test_120_validate_tokenizer_tiktoken_invalid_variant( ):
     assert "tiktoken" in str( exc_info.value )
 
 @pytest.mark.asyncio
-async def test_130_produce_tokenizer_anthropic_not_implemented( ):
-    ''' AnthropicApi tokenizer emits NotImplementedError. '''
+async def test_130_produce_tokenizer_anthropic_without_key( monkeypatch ):
+    ''' AnthropicApi tokenizer requires API key in environment. '''
     tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
-    with pytest.raises( NotImplementedError ) as exc_info:
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    monkeypatch.delenv( "ANTHROPIC_API_KEY", raising = False )
+    with pytest.raises( exceptions.TokenizerQueryFailure ) as exc_info:
         await tokenizers.Tokenizers.produce( "anthropic-api" )
-    assert "Not implemented yet" in str( exc_info.value )
+    assert "ANTHROPIC_API_KEY" in str( exc_info.value )
 
+@requires_resources
 @pytest.mark.asyncio
 async def test_140_calculate_token_count_tiktoken( ):
     ''' Tiktoken counts tokens in text as nonzero integer. '''
@@ -77,6 +92,7 @@ async def test_140_calculate_token_count_tiktoken( ):
     assert count > 0
     assert isinstance( count, int )
 
+@requires_resources
 @pytest.mark.asyncio
 async def test_150_calculate_token_count_tiktoken_empty_text( ):
     ''' Tiktoken assigns zero tokens to empty text. '''
@@ -84,3 +100,401 @@ async def test_150_calculate_token_count_tiktoken_empty_text( ):
     tokenizer = await tokenizers.Tokenizers.produce( "tiktoken" )
     count = await tokenizer.count( "" )
     assert count == 0
+
+# Pattern of 'cl100k_base' with small merge table, usable offline.
+_CL100K_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+|"""
+    r""" ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s""" )
+
+def _produce_offline_codec( ):
+    ranks = { bytes( [ i ] ): i for i in range( 256 ) }
+    for pair in ( b'\n\n', b'  ', b'--', b'in', b'th' ):
+        ranks[ pair ] = len( ranks )
+    return _tiktoken.Encoding(
+        name = "offline", pat_str = _CL100K_PATTERN,
+        mergeable_ranks = ranks, special_tokens = { } )
+
+@pytest.mark.asyncio
+async def test_200_count_many_matches_count( ):
+    ''' Tiktoken counts batch of texts same as each text alone. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    tokenizer = tokenizers.Tiktoken( codec = _produce_offline_codec( ) )
+    texts = ( "within this", "", "  \n\n--x", "thin things\n" )
+    counts = await tokenizer.count_many( texts )
+    assert counts == tuple( [ await tokenizer.count( t ) for t in texts ] )
+
+@pytest.mark.parametrize( 'segments', (
+    ( "Prompt\n\n", "--boundary\n", "Content-Location: a\n\n",
+      "thin  \n\n\n", "\n", "--boundary\n", "in  ", "\n", "--b--", "\n" ),
+    ( "x\n", "\ny", "\n\n", "  z\n", "w" ),
+    ( "", "\n", "", "text" ),
+) )
+@pytest.mark.asyncio
+async def test_210_count_segments_matches_whole( segments ):
+    ''' Counts of regrouped segments sum to count of whole text. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    tokenizer = tokenizers.Tiktoken( codec = _produce_offline_codec( ) )
+    expected = await tokenizer.count( ''.join( segments ) )
+    for batch_size in ( 1, 2, 256 ):
+        assert expected == await tokenizers.count_segments(
+            tokenizer, iter( segments ), batch_size = batch_size )
+
+class _LengthsTokenizer:
+    ''' Counts characters as tokens and records texts which it counts. '''
+
+    def __init__( self ): self.texts = [ ]
+
+    async def count_many( self, texts ):
+        self.texts.extend( texts )
+        return tuple( len( text ) for text in texts )
+
+def test_300_counts_cache_eviction( provide_tempdir ):
+    ''' Counts cache keeps most recently used counts within capacity. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    location = provide_tempdir / 'cache' / 'tokens.sqlite3'
+    cache = tokenizers.CountsCache.from_location(
+        location, tokenizer = 'Tiktoken', variant = 'a', capacity = 2 )
+    cache.record( { 'x': 1, 'y': 2 } )
+    cache.record( { 'z': 3 } )
+    assert cache.access( [ 'x' ] ) == { 'x': 1 }
+    cache.close( )
+    cache = tokenizers.CountsCache.from_location(
+        location, tokenizer = 'Tiktoken', variant = 'a', capacity = 2 )
+    assert cache.access( [ 'x', 'y', 'z' ] ) == { 'x': 1, 'z': 3 }
+    cache.close( )
+    cache = tokenizers.CountsCache.from_location(
+        location, tokenizer = 'Tiktoken', variant = 'b' )
+    assert cache.access( [ 'x', 'z' ] ) == { }
+    cache.close( )
+
+@pytest.mark.asyncio
+async def test_310_count_segments_with_cache( provide_tempdir ):
+    ''' Cached units are not counted again and totals are unchanged. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    location = provide_tempdir / 'tokens.sqlite3'
+    large = "x" * 600 + "\n"
+    segments = ( "Prompt\n\n", large, "--b\n", "small\n", "--b--", "\n" )
+    expected = len( ''.join( segments ) )
+    totals = [ ]
+    recorder = metrics.Recorder( )
+    for _ in range( 2 ):
+        tokenizer = _LengthsTokenizer( )
+        cache = tokenizers.CountsCache.from_location(
+            location, tokenizer = 'Lengths', variant = '' )
+        totals.append( await tokenizers.count_segments(
+            tokenizer, segments, cache = cache, recorder = recorder ) )
+        cache.close( )
+    assert totals == [ expected, expected ]
+    assert large not in tokenizer.texts
+    assert "small\n" in tokenizer.texts
+    assert recorder.counters[ 'token-cache-hits' ] == 1
+    assert recorder.counters[ 'token-cache-misses' ] == 1
+
+@pytest.mark.asyncio
+async def test_320_count_texts_with_cache( provide_tempdir ):
+    ''' Counts of texts are returned in order, with cached ones reused. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    location = provide_tempdir / 'tokens.sqlite3'
+    texts = ( "y" * 700, "short", "z" * 900 )
+    results = [ ]
+    for _ in range( 2 ):
+        tokenizer = _LengthsTokenizer( )
+        cache = tokenizers.CountsCache.from_location(
+            location, tokenizer = 'Lengths', variant = '' )
+        results.append( await tokenizers.count_texts(
+            tokenizer, texts, batch_size = 2, cache = cache ) )
+        cache.close( )
+    assert results == [ ( 700, 5, 900 ), ( 700, 5, 900 ) ]
+    assert tokenizer.texts == [ "short" ]
+
+def test_400_tally_features( ):
+    ''' Features of text are tallied by byte class. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    text = "def f( x1 ):\n    return 42 + ü\n"
+    assert tokenizers.tally_features( text ) == (
+        4, 11, 2, 3, 4, 2, 1, 10, 2 )
+
+@pytest.mark.asyncio
+async def test_410_estimator_interval( ):
+    ''' Estimator brackets estimate with interval, additively over texts. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    estimator = await tokenizers.Tokenizers.produce( "estimate" )
+    assert estimator.variant == "cl100k_base"
+    texts = ( "The quick brown fox.\n", "def jump( over ):\n    pass\n" )
+    estimate = estimator.estimate( *texts )
+    assert 0 < estimate.low <= estimate.tokens <= estimate.high
+    assert estimate == estimator.estimate( ''.join( texts ) )
+    assert await estimator.count( "" ) == 0
+    lines = ( "Lorem ipsum dolor sit amet.\n", ) * 20000
+    sampled = await estimator.count( ''.join( lines ) )
+    tallied = estimator.estimate( *lines ).tokens
+    assert abs( sampled - tallied ) < tallied * 0.02
+
+@requires_resources
+@pytest.mark.parametrize( 'encoding', ( 'cl100k_base', 'o200k_base' ) )
+@pytest.mark.asyncio
+async def test_415_estimator_interval_covers_exact( encoding ):
+    ''' Intervals of estimates cover exact counts of held-out corpus.
+
+        Corpus is modules of standard library which are not in reference
+        corpus for calibration of estimator.
+    '''
+    import sysconfig
+    from pathlib import Path
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    codec = _tiktoken.get_encoding( encoding )
+    estimator = await tokenizers.Tokenizers.produce(
+        "estimate", variant = encoding )
+    library = Path( sysconfig.get_paths( )[ 'stdlib' ] )
+    paths = sorted(
+        path for name in (
+            'multiprocessing', 'sqlite3', 'urllib', 'wsgiref', 'xml',
+            'zoneinfo' )
+        for path in ( library / name ).rglob( '*.py' ) )
+    texts = [
+        text for text in (
+            path.read_text( encoding = 'utf-8' ) for path in paths )
+        if len( text ) >= 256 ]
+    if not texts: pytest.skip( "standard library sources unavailable" )
+    exacts = [
+        len( codec.encode( text, disallowed_special = ( ) ) )
+        for text in texts ]
+    estimates = [ estimator.estimate( text ) for text in texts ]
+    covered = sum(
+        estimate.low <= exact <= estimate.high
+        for estimate, exact in zip( estimates, exacts ) )
+    assert covered >= 0.9 * len( texts )
+    estimate = estimator.estimate( *texts )
+    assert estimate.low <= sum( exacts ) <= estimate.high
+
+@pytest.mark.asyncio
+async def test_420_estimator_invalid_variant( ):
+    ''' Estimator rejects variants without calibration. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    with pytest.raises( exceptions.TokenizerVariantInvalidity ):
+        await tokenizers.Tokenizers.produce(
+            "estimate", variant = "invalid_variant" )
+
+def test_500_save_restore_encoding( provide_tempdir ):
+    ''' Preprocessed encoding restores with same ranks and tokens. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    ranks = { bytes( [ i ] ): i for i in range( 256 ) }
+    ranks.update( { b'th': 256, b'in': 257 } )
+    location = provide_tempdir / f"offline{tokenizers.encoding_suffix}"
+    tokenizers.save_encoding(
+        location, name = "offline", pat_str = _CL100K_PATTERN,
+        mergeable_ranks = ranks, special_tokens = { "<|end|>": 258 } )
+    restored = tokenizers.restore_encoding( location )
+    assert restored.name == "offline"
+    assert restored.n_vocab == 259
+    assert restored.encode( "thin things" ) == (
+        _tiktoken.Encoding(
+            name = "other", pat_str = _CL100K_PATTERN,
+            mergeable_ranks = ranks, special_tokens = { } )
+        .encode( "thin things" ) )
+
+def test_510_restore_encoding_invalid( provide_tempdir ):
+    ''' Files not in preprocessed format are rejected. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    location = provide_tempdir / "bogus.ranks"
+    location.write_bytes( b'dGhl 0\n' )
+    with pytest.raises( exceptions.TokenizerEncodingInvalidity ):
+        tokenizers.restore_encoding( location )
+
+@pytest.mark.asyncio
+async def test_520_produce_tiktoken_from_locations( provide_tempdir ):
+    ''' Tiktoken loads encoding from locations, memoized for process. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    ranks = { bytes( [ i ] ): i for i in range( 256 ) }
+    name = "offline_memoized"
+    tokenizers.save_encoding(
+        provide_tempdir / f"{name}{tokenizers.encoding_suffix}",
+        name = name, pat_str = _CL100K_PATTERN,
+        mergeable_ranks = ranks, special_tokens = { } )
+    tokenizer = await tokenizers.Tokenizers.produce(
+        "tiktoken", variant = name,
+        locations = ( provide_tempdir / 'absent', provide_tempdir ) )
+    assert tokenizer.variant == name
+    assert await tokenizer.count( "abc" ) == 3
+    again = await tokenizers.Tiktoken.from_variant( name = name )
+    assert again.codec is tokenizer.codec
+
+
+class _CountingServer:
+    ''' Local stand-in for token counting endpoint. Counts words. '''
+
+    framing = 7
+
+    def __init__( self, failures = ( ), weight = 1 ):
+        self.failures = list( failures )
+        self.weight = weight
+        self.active = 0
+        self.peak = 0
+        self.texts = [ ]
+
+    async def __call__( self, request ):
+        import asyncio
+        import json
+
+        import httpx
+        if self.failures:
+            return httpx.Response(
+                self.failures.pop( 0 ), headers = { 'retry-after': '0' } )
+        assert request.url.path == '/v1/messages/count_tokens'
+        assert request.headers[ 'x-api-key' ] == 'test-key'
+        document = json.loads( request.content )
+        if document[ 'model' ] == 'bogus': return httpx.Response( 404 )
+        text = document[ 'messages' ][ 0 ][ 'content' ]
+        self.texts.append( text )
+        self.active += 1
+        self.peak = max( self.peak, self.active )
+        await asyncio.sleep( 0.01 )
+        self.active -= 1
+        tokens = self.weight * len( text.split( ) ) + self.framing
+        return httpx.Response( 200, json = { 'input_tokens': tokens } )
+
+
+@pytest.mark.asyncio
+async def test_600_anthropic_api_counts( monkeypatch ):
+    ''' Counts exclude framing, are memoized, and run under limit. '''
+    import httpx
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    monkeypatch.setenv( "ANTHROPIC_API_KEY", "test-key" )
+    server = _CountingServer( )
+    tokenizer = await tokenizers.AnthropicApi.from_variant(
+        options = { 'concurrency': 2, 'base-url': 'http://localhost:9' },
+        transport = httpx.MockTransport( server ) )
+    assert tokenizer.variant == tokenizers.anthropic_model_default
+    assert not server.texts
+    texts = [ f"{'word ' * index}end" for index in range( 6 ) ]
+    assert await tokenizer.count_many( texts ) == tuple( range( 1, 7 ) )
+    assert await tokenizer.measure_overhead( ) == server.framing
+    assert server.peak == 2
+    assert await tokenizer.count( texts[ 3 ] ) == 4
+    assert await tokenizer.count( "" ) == 0
+    assert server.texts.count( texts[ 3 ] ) == 1
+    await tokenizer.client.aclose( )
+
+
+@pytest.mark.asyncio
+async def test_610_anthropic_api_failures( monkeypatch ):
+    ''' Overloaded responses are retried and other failures are raised. '''
+    import httpx
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    monkeypatch.setenv( "ANTHROPIC_API_KEY", "test-key" )
+    server = _CountingServer( failures = ( 429, 529 ) )
+    tokenizer = await tokenizers.AnthropicApi.from_variant(
+        transport = httpx.MockTransport( server ) )
+    assert await tokenizer.count( "one two" ) == 2
+    server.failures.extend( ( 503, ) * ( tokenizer.retries + 1 ) )
+    with pytest.raises( exceptions.TokenizerQueryFailure ):
+        await tokenizer.count( "three" )
+    tokenizer = await tokenizers.AnthropicApi.from_variant(
+        name = 'bogus', transport = httpx.MockTransport( server ) )
+    with pytest.raises( exceptions.TokenizerVariantInvalidity ):
+        await tokenizer.count( "four" )
+
+
+@pytest.mark.asyncio
+async def test_620_anthropic_api_overhead( monkeypatch ):
+    ''' Framing is measured lazily, without assumed count of probe. '''
+    import httpx
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    monkeypatch.setenv( "ANTHROPIC_API_KEY", "test-key" )
+    server = _CountingServer( failures = ( 400, ), weight = 3 )
+    tokenizer = await tokenizers.AnthropicApi.from_variant(
+        transport = httpx.MockTransport( server ) )
+    assert not server.texts
+    with pytest.raises( exceptions.TokenizerQueryFailure ):
+        await tokenizer.count( "one two" )
+    assert not tokenizer.overheads
+    assert await tokenizer.count( "one two" ) == 6
+    assert await tokenizer.measure_overhead( ) == server.framing
+    probes = len( server.texts ) - 1
+    assert await tokenizer.count( "three" ) == 3
+    assert len( server.texts ) - probes == 2
+
+
+_PLUGIN_SOURCE = '''
+from mimeogram import tokenizers
+
+async def provide( variant, locations, options, exits ):
+    return await tokenizers.Estimator.from_variant(
+        name = options.get( 'encoding', variant ) )
+'''
+
+
+@pytest.mark.asyncio
+async def test_700_providers_from_entry_points(
+    provide_tempdir, monkeypatch
+):
+    ''' Providers registered under entry points produce tokenizers. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    ( provide_tempdir / 'estimateplugin.py' ).write_text( _PLUGIN_SOURCE )
+    metadata = provide_tempdir / 'estimateplugin-1.0.dist-info'
+    metadata.mkdir( )
+    ( metadata / 'METADATA' ).write_text(
+        "Metadata-Version: 2.1\nName: estimateplugin\nVersion: 1.0\n" )
+    ( metadata / 'entry_points.txt' ).write_text(
+        "[mimeogram.tokenizers]\n"
+        "estimate-plugin = estimateplugin:provide\n"
+        "tiktoken = estimateplugin:provide\n"
+        "broken = estimateplugin:absent\n" )
+    monkeypatch.syspath_prepend( str( provide_tempdir ) )
+    tokenizers._providers_surveyed.clear( )
+    try:
+        providers = tokenizers.survey_providers( )
+        assert set( providers ) == { 'estimate-plugin' }
+        tokenizer = await tokenizers.Tokenizers.produce(
+            'estimate-plugin', options = { 'encoding': 'o200k_base' } )
+        assert isinstance( tokenizer, tokenizers.Estimator )
+        assert tokenizer.variant == 'o200k_base'
+        with pytest.raises( exceptions.TokenizerProvideFailure ):
+            await tokenizers.Tokenizers.produce( 'bogus' )
+    finally:
+        tokenizers._providers.clear( )
+        tokenizers._providers_surveyed.clear( )
+
+
+@pytest.mark.skipif(
+    not _huggingface_available, reason = "tokenizers package unavailable" )
+@pytest.mark.asyncio
+async def test_710_huggingface_counts( provide_tempdir ):
+    ''' HuggingFace tokenizer loads local definition and counts batches. '''
+    from tokenizers import models, pre_tokenizers
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    vocabulary = { '[UNK]': 0, 'hello': 1, 'world': 2, '!': 3 }
+    codec = _huggingface_tokenizers.Tokenizer(
+        models.WordLevel( vocabulary, unk_token = '[UNK]' ) ) # noqa: S106
+    codec.pre_tokenizer = pre_tokenizers.Whitespace( )
+    ( provide_tempdir / 'demo' ).mkdir( )
+    codec.save( str( provide_tempdir / 'demo' / 'tokenizer.json' ) )
+    tokenizer = await tokenizers.Tokenizers.produce(
+        'huggingface', variant = 'demo', locations = ( provide_tempdir, ) )
+    assert tokenizer.variant == 'demo'
+    texts = ( "hello world!", "hello", "" )
+    assert await tokenizer.count_many( texts ) == ( 3, 1, 0 )
+    assert await tokenizer.count( "world hello !" ) == 3
+    tokenizer = await tokenizers.Huggingface.from_variant(
+        name = str( provide_tempdir / 'demo' / 'tokenizer.json' ) )
+    assert await tokenizer.count( "hello" ) == 1
+
+
+@pytest.mark.asyncio
+async def test_720_huggingface_failures( provide_tempdir ):
+    ''' HuggingFace tokenizer reports absent definitions or package. '''
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    expected = (
+        exceptions.TokenizerVariantInvalidity if _huggingface_available
+        else exceptions.TokenizerProvideFailure )
+    with pytest.raises( expected ):
+        await tokenizers.Tokenizers.produce(
+            'huggingface', variant = 'absent',
+            locations = ( provide_tempdir, ) )
@@ -0,0 +1,193 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Tests for indexers module. '''
+
+
+import os
+
+import pytest
+
+from . import PACKAGE_NAME, cache_import_module
+
+
+_BOUNDARY = '====MIMEOGRAM_0123456789abcdef===='
+
+
+def _produce_mimeogram( *parts: tuple[ str, str ] ) -> str:
+    lines: list[ str ] = [ ]
+    for location, content in parts:
+        lines.extend( (
+            f"--{_BOUNDARY}",
+            f"Content-Location: {location}",
+            'Content-Type: text/plain; charset=utf-8; linesep=LF',
+            '',
+            content ) )
+    lines.append( f"--{_BOUNDARY}--" )
+    return '\n'.join( lines )
+
+
+def _write_mimeogram( location, *parts: tuple[ str, str ] ):
+    location.write_bytes( _produce_mimeogram( *parts ).encode( 'utf-8' ) )
+    return location
+
+
+def test_100_scan_buffer_spans( ):
+    ''' Byte scanner locates part bodies equivalent to parser output. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    text = _produce_mimeogram(
+        ( 'a.txt', 'alpha\nbeta' ), ( 'b/ü.txt', 'gamma ü' ) )
+    buffer = text.encode( 'utf-8' )
+    spans = tuple( parsers.scan_buffer( buffer ) )
+    parts = parsers.parse( text )
+    assert [ span.location for span in spans ] == (
+        [ part.location for part in parts ] )
+    assert [
+        buffer[ span.start : span.end ].decode( 'utf-8' ) for span in spans
+    ] == [ part.content for part in parts ]
+
+
+def test_110_scan_buffer_failures( ):
+    ''' Byte scanner reports empty and boundaryless buffers. '''
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    with pytest.raises( exceptions.MimeogramParseFailure, match = 'Empty' ):
+        tuple( parsers.scan_buffer( b' \n' ) )
+    with pytest.raises(
+        exceptions.MimeogramParseFailure, match = 'boundary'
+    ): tuple( parsers.scan_buffer( b'content' ) )
+
+
+def test_200_build_save_restore( provide_tempdir ):
+    ''' Index is built, saved as sidecar, and restored identically. '''
+    indexers = cache_import_module( f"{PACKAGE_NAME}.indexers" )
+    location = _write_mimeogram(
+        provide_tempdir / 'bundle.mg',
+        ( 'a.txt', 'alpha' ), ( 'b.py', 'print( 1 )' ) )
+    index = indexers.build_index( location )
+    assert [ entry.location for entry in index.entries ] == (
+        [ 'a.txt', 'b.py' ] )
+    indexers.save_index( location, index )
+    assert indexers.provide_index_location( location ).name == (
+        'bundle.mg.mgindex' )
+    assert indexers.restore_index( location ) == index
+    assert indexers.acquire_index( location ) == index
+
+
+def test_210_stale_index_rebuilt( provide_tempdir ):
+    ''' Index is rebuilt when mimeogram file changes. '''
+    indexers = cache_import_module( f"{PACKAGE_NAME}.indexers" )
+    location = _write_mimeogram(
+        provide_tempdir / 'bundle.mg', ( 'a.txt', 'alpha' ) )
+    indexers.acquire_index( location )
+    _write_mimeogram( location, ( 'a.txt', 'alpha' ), ( 'c.txt', 'gamma' ) )
+    status = location.stat( )
+    os.utime( location, ns = ( status.st_atime_ns, status.st_mtime_ns + 1 ) )
+    index = indexers.acquire_index( location )
+    assert [ entry.location for entry in index.entries ] == (
+        [ 'a.txt', 'c.txt' ] )
+    assert indexers.restore_index( location ) == index
+
+
+def test_220_invalid_index( provide_tempdir ):
+    ''' Malformed sidecar is reported as invalid and replaced. '''
+    indexers = cache_import_module( f"{PACKAGE_NAME}.indexers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    location = _write_mimeogram(
+        provide_tempdir / 'bundle.mg', ( 'a.txt', 'alpha' ) )
+    indexers.provide_index_location( location ).write_text( '{}' )
+    with pytest.raises( exceptions.MimeogramIndexInvalidity ):
+        indexers.restore_index( location )
+    index = indexers.acquire_index( location )
+    assert len( index.entries ) == 1
+
+
+def test_300_extract_by_location_and_glob( provide_tempdir ):
+    ''' Parts are extracted by exact location or glob pattern. '''
+    indexers = cache_import_module( f"{PACKAGE_NAME}.indexers" )
+    location = _write_mimeogram(
+        provide_tempdir / 'bundle.mg',
+        ( 'src/a.py', 'a = 1' ), ( 'src/b.py', 'b = 2' ),
+        ( 'README.md', '# Title\r\nText' ) )
+    parts = indexers.extract_parts( location, [ 'src/*.py' ] )
+    assert [ part.content for part in parts ] == [ 'a = 1', 'b = 2' ]
+    parts = indexers.extract_parts( location, [ 'README.md' ] )
+    assert parts[ 0 ].content == '# Title\nText'
+    assert indexers.extract_parts( location, [ 'absent.txt' ] ) == ( )
+
+
+def test_310_extract_detects_tampering( provide_tempdir ):
+    ''' Digest mismatch between index and file is reported. '''
+    indexers = cache_import_module( f"{PACKAGE_NAME}.indexers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    location = _write_mimeogram(
+        provide_tempdir / 'bundle.mg', ( 'a.txt', 'alpha' ) )
+    index = indexers.build_index( location )
+    location.write_bytes(
+        location.read_bytes( ).replace( b'alpha', b'ALPHA' ) )
+    with pytest.raises( exceptions.MimeogramIndexInvalidity ):
+        indexers.extract_parts( location, [ 'a.txt' ], index = index )
+
+
+def test_320_extract_non_utf8_charsets( provide_tempdir ):
+    ''' Bodies declared with non-UTF-8 charsets decode as parser does. '''
+    indexers = cache_import_module( f"{PACKAGE_NAME}.indexers" )
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    header = f"--{_BOUNDARY}\nContent-Location: {{location}}\n" + (
+        'Content-Type: text/plain; charset={charset}; linesep=LF\n\n' )
+    content = b''.join( (
+        header.format( location = 'utf8.txt', charset = 'iso-8859-1' )
+        .encode( 'ascii' ), 'café naïve\n'.encode( 'utf-8' ),
+        header.format( location = 'utf16.txt', charset = 'utf-16' )
+        .encode( 'ascii' ), 'ĳ €\n'.encode( 'utf-8' ),
+        header.format( location = 'latin1.txt', charset = 'iso-8859-1' )
+        .encode( 'ascii' ), 'façade\n'.encode( 'iso-8859-1' ),
+        f"--{_BOUNDARY}--".encode( 'ascii' ) ) )
+    location = provide_tempdir / 'bundle.mg'
+    location.write_bytes( content )
+    parts = indexers.extract_parts( location, [ '*.txt' ] )
+    assert [ part.content for part in parts ] == [
+        'café naïve', 'ĳ €', 'façade' ]
+    assert [ part.charset for part in parts ] == [
+        'iso-8859-1', 'utf-16', 'iso-8859-1' ]
+    assert [ part.content for part in parts ] == [
+        part.content for part in parsers.parse_bytes( content ) ]
+
+
+@pytest.mark.asyncio
+async def test_400_extract_command( provide_tempdir, capsys ):
+    ''' Extract command prints matching parts or exits with failure. '''
+    from unittest.mock import MagicMock
+    indexers = cache_import_module( f"{PACKAGE_NAME}.indexers" )
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    location = _write_mimeogram(
+        provide_tempdir / 'bundle.mg',
+        ( 'a.txt', 'alpha' ), ( 'b.txt', 'beta' ) )
+    auxdata = MagicMock( configuration = { } )
+    command = indexers.ExtractCommand(
+        location = str( location ), patterns = [ 'b.txt' ] )
+    with pytest.raises( SystemExit ) as exc_info: await command( auxdata )
+    assert 0 == exc_info.value.code
+    parts = parsers.parse( capsys.readouterr( ).out )
+    assert [ part.content for part in parts ] == [ 'beta' ]
+    command = indexers.ExtractCommand(
+        location = str( location ), patterns = [ 'c.txt' ] )
+    with pytest.raises( SystemExit ) as exc_info: await command( auxdata )
+    assert 1 == exc_info.value.code
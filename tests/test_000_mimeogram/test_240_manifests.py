@@ -0,0 +1,123 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+
+''' Tests for manifests module. '''
+
+
+import hashlib
+
+import pytest
+
+from . import PACKAGE_NAME, cache_import_module
+
+
+def _create_part( location, content, charset = 'utf-8' ):
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    detextive = cache_import_module( 'detextive' )
+    return parts.Part(
+        location = location,
+        mimetype = 'text/plain',
+        charset = charset,
+        linesep = detextive.LineSeparators.LF,
+        content = content )
+
+
+def test_100_manifest_roundtrip( ):
+    ''' Formatted manifest is restored to same digests. '''
+    manifests = cache_import_module( f"{PACKAGE_NAME}.manifests" )
+    parts = (
+        _create_part( 'a.txt', 'alpha\n' ),
+        _create_part( 'dir/b c.txt', 'beta' ),
+        _create_part( 'mimeogram://message', 'hello' ) )
+    digests = manifests.produce_manifest( parts )
+    assert dict( digests ) == {
+        'a.txt': hashlib.sha256( b'alpha\n' ).hexdigest( ),
+        'dir/b c.txt': hashlib.sha256( b'beta' ).hexdigest( ) }
+    content = manifests.format_manifest( digests )
+    assert content.startswith( '#' )
+    assert manifests.restore_manifest( content ) == digests
+
+
+def test_110_manifest_invalid_entry( ):
+    ''' Malformed manifest entries are rejected. '''
+    manifests = cache_import_module( f"{PACKAGE_NAME}.manifests" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    with pytest.raises( exceptions.ManifestInvalidity ):
+        manifests.restore_manifest( '# Comment\n\nnot-a-digest  a.txt\n' )
+
+
+def test_200_select_changed_parts( ):
+    ''' Parts with unchanged digests are separated from changed ones. '''
+    manifests = cache_import_module( f"{PACKAGE_NAME}.manifests" )
+    previous = manifests.produce_manifest( (
+        _create_part( 'same.txt', 'same\n' ),
+        _create_part( 'edited.txt', 'before\n' ) ) )
+    parts = (
+        _create_part( 'same.txt', 'same\n' ),
+        _create_part( 'edited.txt', 'after\n' ),
+        _create_part( 'new.txt', 'new\n' ) )
+    changed, unchanged = manifests.select_changed_parts( parts, previous )
+    assert [ part.location for part in changed ] == [ 'edited.txt', 'new.txt' ]
+    assert list( unchanged ) == [ 'same.txt' ]
+
+
+def test_300_acquire_manifest_chained( provide_tempdir ):
+    ''' Digests of delta mimeogram include those of its manifest part. '''
+    formatters = cache_import_module( f"{PACKAGE_NAME}.formatters" )
+    manifests = cache_import_module( f"{PACKAGE_NAME}.manifests" )
+    unchanged = manifests.produce_manifest( (
+        _create_part( 'same.txt', 'same\n' ), ) )
+    mimeogram = formatters.format_mimeogram(
+        (   manifests.produce_manifest_part( unchanged ),
+            _create_part( 'edited.txt', 'after\n' ) ),
+        message = 'Changes only.' )
+    location = provide_tempdir / 'delta.mimeogram'
+    location.write_text( mimeogram, encoding = 'utf-8' )
+    digests = manifests.acquire_manifest( location )
+    assert dict( digests ) == {
+        'same.txt': hashlib.sha256( b'same\n' ).hexdigest( ),
+        'edited.txt': hashlib.sha256( b'after\n' ).hexdigest( ) }
+    stored = provide_tempdir / 'parts.manifest'
+    stored.write_text( manifests.format_manifest( digests ) )
+    assert manifests.acquire_manifest( stored ) == digests
+
+
+def test_310_acquire_manifest_non_utf8( provide_tempdir ):
+    ''' Digests from previous mimeogram match parts with other charsets. '''
+    formatters = cache_import_module( f"{PACKAGE_NAME}.formatters" )
+    manifests = cache_import_module( f"{PACKAGE_NAME}.manifests" )
+    parts = tuple(
+        _create_part( location, 'café naïve\n', charset )
+        for location, charset in (
+            ( 'latin1.txt', 'iso-8859-1' ), ( 'wide.txt', 'utf-16' ) ) )
+    location = provide_tempdir / 'previous.mimeogram'
+    location.write_text(
+        formatters.format_mimeogram( parts ), encoding = 'utf-8' )
+    digests = manifests.acquire_manifest( location )
+    assert digests == manifests.produce_manifest( parts )
+    changed, unchanged = manifests.select_changed_parts( parts, digests )
+    assert changed == ( )
+    assert list( unchanged ) == [ 'latin1.txt', 'wide.txt' ]
+    legacy = provide_tempdir / 'legacy.mimeogram'
+    legacy.write_bytes( location.read_bytes( ).replace(
+        'café naïve'.encode( 'utf-8' ), 'café naïve'.encode( 'iso-8859-1' ),
+        1 ) )
+    assert manifests.acquire_manifest( legacy ) == digests
@@ -0,0 +1,161 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+
+''' Tests for splitters module. '''
+
+
+import pytest
+
+from . import PACKAGE_NAME, cache_import_module
+
+
+_BOUNDARY = '====MIMEOGRAM_0123456789abcdef0123456789abcdef===='
+
+
+class _WordsTokenizer:
+    ''' Counts whitespace-separated words as tokens. '''
+
+    def __init__( self ):
+        self.batches = [ ]
+        self.texts = [ ]
+
+    async def count( self, text ):
+        self.texts.append( text )
+        return len( text.split( ) )
+
+    async def count_many( self, texts ):
+        self.batches.append( len( texts ) )
+        return tuple( [ await self.count( text ) for text in texts ] )
+
+
+def _create_part( location, content ):
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    detextive = cache_import_module( 'detextive' )
+    return parts.Part(
+        location = location,
+        mimetype = 'text/plain',
+        charset = 'utf-8',
+        linesep = detextive.LineSeparators.LF,
+        content = content )
+
+
+def _measure( location, tokens ):
+    splitters = cache_import_module( f"{PACKAGE_NAME}.splitters" )
+    return splitters.Measurement(
+        part = _create_part( location, '' ), tokens = tokens )
+
+
+@pytest.mark.asyncio
+async def test_100_measure_parts_once( ):
+    ''' Each part which fits is counted exactly once. '''
+    splitters = cache_import_module( f"{PACKAGE_NAME}.splitters" )
+    tokenizer = _WordsTokenizer( )
+    parts = (
+        _create_part( 'a.txt', 'one two\n' ),
+        _create_part( 'b.txt', 'three\n' ) )
+    measurements = await splitters.measure_parts(
+        parts, tokenizer, _BOUNDARY, 100 )
+    assert [ measurement.part for measurement in measurements ] == (
+        list( parts ) )
+    # Seven words of boundary and headers, then content.
+    assert [ measurement.tokens for measurement in measurements ] == [
+        7 + 2, 7 + 1 ]
+    assert len( tokenizer.texts ) == 2
+    assert tokenizer.batches == [ 2 ]
+
+
+@pytest.mark.asyncio
+async def test_110_measure_parts_splits_lines( ):
+    ''' Oversize parts are split into line ranges under capacity. '''
+    splitters = cache_import_module( f"{PACKAGE_NAME}.splitters" )
+    content = ''.join( f"word{i} word word word\n" for i in range( 20 ) )
+    part = _create_part( 'src/large.txt', content )
+    measurements = await splitters.measure_parts(
+        ( part, ), _WordsTokenizer( ), _BOUNDARY, 30 )
+    assert len( measurements ) > 1
+    assert all( measurement.tokens <= 30 for measurement in measurements )
+    assert ''.join(
+        measurement.part.content for measurement in measurements ) == content
+    locations = [ measurement.part.location for measurement in measurements ]
+    assert locations[ 0 ].startswith( 'src/large.txt#line=0,' )
+    assert locations[ -1 ].endswith( ',20' )
+
+
+@pytest.mark.asyncio
+async def test_120_measure_parts_batches_ranges( provide_tempdir ):
+    ''' Ranges of split part are counted in batches and cached. '''
+    splitters = cache_import_module( f"{PACKAGE_NAME}.splitters" )
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+    content = ''.join( f"word{i}{' word' * 19}\n" for i in range( 100 ) )
+    parts = ( _create_part( 'src/large.txt', content ), )
+    cache = tokenizers.CountsCache.from_location(
+        provide_tempdir / 'counts.sqlite3',
+        tokenizer = 'Words', variant = 'words' )
+    tokenizer = _WordsTokenizer( )
+    try:
+        measurements = await splitters.measure_parts(
+            parts, tokenizer, _BOUNDARY, 200, cache = cache )
+        ranges = len( measurements )
+        assert ranges > 2
+        assert len( tokenizer.batches ) < ranges
+        assert max( tokenizer.batches ) > 1
+        tokenizer = _WordsTokenizer( )
+        assert await splitters.measure_parts(
+            parts, tokenizer, _BOUNDARY, 200, cache = cache ) == measurements
+        # Only texts too short to cache, such as headers, are counted again.
+        assert 0 < len( tokenizer.texts ) < ranges
+        assert all(
+            len( text ) < cache.minimum_size for text in tokenizer.texts )
+    finally: cache.close( )
+    assert ''.join(
+        measurement.part.content for measurement in measurements ) == content
+
+
+def test_200_pack_keeps_directories_together( ):
+    ''' Directories which fit are packed whole, in original order. '''
+    splitters = cache_import_module( f"{PACKAGE_NAME}.splitters" )
+    measurements = (
+        _measure( 'a/one.txt', 30 ),
+        _measure( 'b/one.txt', 50 ),
+        _measure( 'a/two.txt', 30 ),
+        _measure( 'b/two.txt', 40 ),
+        _measure( 'c/one.txt', 20 ) )
+    bins = splitters.pack_measurements( measurements, 100 )
+    assert [
+        [ measurement.part.location for measurement in bin_ ]
+        for bin_ in bins
+    ] == [
+        [ 'a/one.txt', 'a/two.txt', 'c/one.txt' ],
+        [ 'b/one.txt', 'b/two.txt' ] ]
+    assert all(
+        sum( measurement.tokens for measurement in bin_ ) <= 100
+        for bin_ in bins )
+
+
+def test_210_pack_breaks_oversize_directories( ):
+    ''' Directories too large for one bin are packed part by part. '''
+    splitters = cache_import_module( f"{PACKAGE_NAME}.splitters" )
+    measurements = tuple(
+        _measure( f"big/{i}.txt", 40 ) for i in range( 5 ) )
+    bins = splitters.pack_measurements( measurements, 100 )
+    assert [ len( bin_ ) for bin_ in bins ] == [ 2, 2, 1 ]
+    assert [ measurement for bin_ in bins for measurement in bin_ ] == (
+        list( measurements ) )
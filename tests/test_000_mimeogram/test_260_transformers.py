@@ -0,0 +1,251 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+
+''' Tests for transformers module. '''
+
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from . import PACKAGE_NAME, cache_import_module
+
+
+class _WordsTokenizer:
+    ''' Counts whitespace-separated words as tokens. '''
+
+    def __init__( self ):
+        self.batches = [ ]
+
+    async def count( self, text ):
+        return len( text.split( ) )
+
+    async def count_many( self, texts ):
+        self.batches.append( len( texts ) )
+        return tuple( [ await self.count( text ) for text in texts ] )
+
+
+def _create_part( location, content ):
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    detextive = cache_import_module( 'detextive' )
+    return parts.Part(
+        location = location,
+        mimetype = 'text/plain',
+        charset = 'utf-8',
+        linesep = detextive.LineSeparators.LF,
+        content = content )
+
+
+def _produce_license_stripper( ):
+    transformers = cache_import_module( f"{PACKAGE_NAME}.transformers" )
+    return transformers.LicenseHeadersStripper.from_patterns(
+        transformers.license_patterns_default )
+
+
+def test_100_license_headers_line_comments( ):
+    ''' License block of line comments is removed, others are kept. '''
+    stripper = _produce_license_stripper( )
+    content = (
+        '#!/usr/bin/env python3\n'
+        '# vim: set filetype=python:\n'
+        '\n'
+        '# Licensed under the Apache License, Version 2.0.\n'
+        '# See the License for the specific language.\n'
+        '\n'
+        '\n'
+        "''' Module. '''\n" )
+    assert stripper.transform( _create_part( 'a.py', content ) ) == (
+        '#!/usr/bin/env python3\n'
+        '# vim: set filetype=python:\n'
+        '\n'
+        "''' Module. '''\n" )
+    content = '# Helper script.\n\nprint( 1 )\n'
+    assert stripper.transform( _create_part( 'b.py', content ) ) == content
+
+
+def test_110_license_headers_block_comment( ):
+    ''' License block comment is removed. '''
+    stripper = _produce_license_stripper( )
+    content = (
+        '/*\n'
+        ' * Copyright (c) 2024 Example Corporation.\n'
+        ' * SPDX-License-Identifier: MIT\n'
+        ' */\n'
+        '\n'
+        'const answer = 42;\n' )
+    assert stripper.transform( _create_part( 'a.js', content ) ) == (
+        'const answer = 42;\n' )
+
+
+def test_115_license_headers_markers_by_language( ):
+    ''' Comment markers of leading blocks are chosen by file suffix. '''
+    stripper = _produce_license_stripper( )
+    content = '-- Licensed under the MIT License.\nSELECT 1;\n'
+    assert stripper.transform( _create_part( 'a.sql', content ) ) == (
+        'SELECT 1;\n' )
+    content = '<!-- SPDX-License-Identifier: MIT -->\n<p>Hi</p>\n'
+    assert stripper.transform( _create_part( 'a.html', content ) ) == (
+        '<p>Hi</p>\n' )
+    content = '-- Licensed under the MIT License.\nx = 1\n'
+    for location in ( 'a.py', 'a.js', 'notes.txt' ):
+        assert stripper.transform( _create_part( location, content ) ) == (
+            content )
+    content = '; Licensed under the MIT License.\nx = 1\n'
+    assert stripper.transform( _create_part( 'a.py', content ) ) == content
+    assert stripper.transform( _create_part( 'a.ini', content ) ) == (
+        'x = 1\n' )
+    content = '# Licensed under the MIT License.\nx = 1\n'
+    assert stripper.transform( _create_part( 'notes.txt', content ) ) == (
+        content )
+
+
+def test_120_license_headers_custom_patterns( ):
+    ''' Configured patterns replace defaults. '''
+    transformers = cache_import_module( f"{PACKAGE_NAME}.transformers" )
+    stripper = transformers.LicenseHeadersStripper.from_patterns(
+        ( r'Proprietary', ) )
+    content = '# Proprietary and confidential.\nx = 1\n'
+    assert stripper.transform( _create_part( 'a.py', content ) ) == 'x = 1\n'
+    content = '# Licensed under the MIT License.\nx = 1\n'
+    assert stripper.transform( _create_part( 'a.py', content ) ) == content
+
+
+def test_200_comments_by_language( ):
+    ''' Whole-line comments are removed according to file suffix. '''
+    transformers = cache_import_module( f"{PACKAGE_NAME}.transformers" )
+    stripper = transformers.CommentsStripper( )
+    content = (
+        '#!/bin/sh\n'
+        '# Comment.\n'
+        'echo "# not a comment"  # trailing\n'
+        '    # Indented comment.\n' )
+    assert stripper.transform( _create_part( 'run.sh', content ) ) == (
+        '#!/bin/sh\n'
+        'echo "# not a comment"  # trailing\n' )
+    content = '// Comment.\nint main( ) { }\n'
+    assert stripper.transform( _create_part( 'main.c', content ) ) == (
+        'int main( ) { }\n' )
+    content = '# Heading\n'
+    assert stripper.transform( _create_part( 'README.md', content ) ) == (
+        content )
+
+
+def test_210_comments_within_python_strings( ):
+    ''' Lines of Python multi-line strings are not mistaken for comments. '''
+    transformers = cache_import_module( f"{PACKAGE_NAME}.transformers" )
+    stripper = transformers.CommentsStripper( )
+    content = (
+        '#!/usr/bin/env python3\n'
+        '# Comment.\n'
+        "USAGE = '''\n"
+        '# Not a comment.\n'
+        "'''\n"
+        'def f( ):\n'
+        '    # Indented comment.\n'
+        '    return """\n'
+        '    # Not a comment either.\n'
+        '    """  # Trailing comment.\n' )
+    assert stripper.transform( _create_part( 'a.py', content ) ) == (
+        '#!/usr/bin/env python3\n'
+        "USAGE = '''\n"
+        '# Not a comment.\n'
+        "'''\n"
+        'def f( ):\n'
+        '    return """\n'
+        '    # Not a comment either.\n'
+        '    """  # Trailing comment.\n' )
+    content = "# Comment.\nx = '''\n# Unterminated.\n"
+    assert stripper.transform( _create_part( 'a.py', content ) ) == content
+
+
+def test_300_trailing_whitespace( ):
+    ''' Trailing whitespace of lines and of content is removed. '''
+    transformers = cache_import_module( f"{PACKAGE_NAME}.transformers" )
+    stripper = transformers.TrailingWhitespaceStripper( )
+    part = _create_part( 'a.txt', 'one  \ntwo\t\n\n\n' )
+    assert stripper.transform( part ) == 'one\ntwo\n'
+    part = _create_part( 'a.txt', 'one\ntwo' )
+    assert stripper.transform( part ) == 'one\ntwo'
+
+
+@pytest.mark.asyncio
+async def test_400_transform_parts_savings( ):
+    ''' Transforms apply in order and savings are recorded per transform. '''
+    transformers = cache_import_module( f"{PACKAGE_NAME}.transformers" )
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    message = _create_part( 'mimeogram://message', '# Licensed under the' )
+    part = _create_part(
+        'a.py', '# Licensed under the MIT License.\n\nx = 1   \n' )
+    recorder = metrics.Recorder( )
+    results = await transformers.transform_parts(
+        ( message, part ),
+        {   'license-headers': _produce_license_stripper( ),
+            'trailing-whitespace': transformers.TrailingWhitespaceStripper( ),
+            'comments': transformers.CommentsStripper( ) },
+        tokenizer = _WordsTokenizer( ),
+        recorder = recorder )
+    assert results[ 0 ] is message
+    assert results[ 1 ].content == 'x = 1\n'
+    assert results[ 1 ].location == 'a.py'
+    assert recorder.counters[ 'characters-removed-license-headers' ] == 35
+    assert recorder.counters[ 'tokens-removed-license-headers' ] == 6
+    assert recorder.counters[ 'characters-removed-trailing-whitespace' ] == 3
+    assert recorder.counters[ 'tokens-removed-trailing-whitespace' ] == 0
+    assert 'characters-removed-comments' not in recorder.counters
+
+
+@pytest.mark.asyncio
+async def test_410_transform_parts_counts_in_batches( ):
+    ''' Changed contents are counted together, once per transform. '''
+    transformers = cache_import_module( f"{PACKAGE_NAME}.transformers" )
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    parts = tuple(
+        _create_part( f"{i}.py", f"# Licensed under the MIT.\nx = {i}  \n" )
+        for i in range( 5 ) )
+    tokenizer = _WordsTokenizer( )
+    recorder = metrics.Recorder( )
+    results = await transformers.transform_parts(
+        ( *parts, _create_part( 'b.py', 'y = 1\n' ) ),
+        {   'license-headers': _produce_license_stripper( ),
+            'trailing-whitespace':
+                transformers.TrailingWhitespaceStripper( ) },
+        tokenizer = tokenizer,
+        recorder = recorder )
+    assert [ result.content for result in results[ : 5 ] ] == [
+        f"x = {i}\n" for i in range( 5 ) ]
+    # Before and after first transform, then only after second one.
+    assert tokenizer.batches == [ 10, 5 ]
+    assert recorder.counters[ 'tokens-removed-license-headers' ] == 25
+    assert recorder.counters[ 'tokens-removed-trailing-whitespace' ] == 0
+
+
+def test_500_produce_from_configuration( ):
+    ''' Transformers are produced from names and configuration. '''
+    transformers = cache_import_module( f"{PACKAGE_NAME}.transformers" )
+    auxdata = MagicMock( configuration = {
+        'transform-parts': { 'license-patterns': [ 'Proprietary' ] } } )
+    stripper = transformers.Transformers( 'license-headers' ).produce(
+        auxdata )
+    part = _create_part( 'a.py', '# Proprietary.\nx = 1\n' )
+    assert stripper.transform( part ) == 'x = 1\n'
+    for species in transformers.Transformers:
+        assert isinstance(
+            species.produce( auxdata ), transformers.Transformer )
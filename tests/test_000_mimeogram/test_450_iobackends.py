@@ -0,0 +1,165 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Tests for I/O backends module. '''
+
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from . import PACKAGE_NAME, cache_import_module
+
+
+@pytest.mark.parametrize( 'name', ( 'aiofiles', 'threads' ) )
+@pytest.mark.asyncio
+async def test_100_acquire_bytes( provide_tempdir, name ):
+    ''' Backend reads entire file content as bytes. '''
+    iobackends = cache_import_module( f"{PACKAGE_NAME}.iobackends" )
+    backend = iobackends.IoBackends( name ).produce( )
+    location = provide_tempdir / 'test.bin'
+    location.write_bytes( b'line one\r\nline two\x00\n' )
+    assert await backend.acquire_bytes( location ) == (
+        b'line one\r\nline two\x00\n' )
+
+
+@pytest.mark.parametrize( 'name', ( 'aiofiles', 'threads' ) )
+@pytest.mark.asyncio
+async def test_110_update_bytes_atomic( provide_tempdir, name ):
+    ''' Backend replaces file content and leaves no temporary files. '''
+    iobackends = cache_import_module( f"{PACKAGE_NAME}.iobackends" )
+    backend = iobackends.IoBackends( name ).produce( )
+    location = provide_tempdir / 'test.txt'
+    location.write_bytes( b'original' )
+    await backend.update_bytes_atomic( location, b'updated' )
+    assert location.read_bytes( ) == b'updated'
+    assert [ path.name for path in provide_tempdir.iterdir( ) ] == (
+        [ 'test.txt' ] )
+
+
+@pytest.mark.asyncio
+async def test_120_threads_update_failure( provide_tempdir ):
+    ''' Threads backend raises ContentUpdateFailure and cleans up. '''
+    iobackends = cache_import_module( f"{PACKAGE_NAME}.iobackends" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    backend = iobackends.ThreadsBackend( )
+    location = provide_tempdir / 'test.txt'
+    location.write_bytes( b'original' )
+    with patch( 'os.replace', side_effect = OSError( 'Test error' ) ): # noqa: SIM117
+        with pytest.raises( exceptions.ContentUpdateFailure ):
+            await backend.update_bytes_atomic( location, b'updated' )
+    assert location.read_bytes( ) == b'original'
+    assert [ path.name for path in provide_tempdir.iterdir( ) ] == (
+        [ 'test.txt' ] )
+
+
+@pytest.mark.parametrize( 'name', ( 'aiofiles', 'threads' ) )
+@pytest.mark.asyncio
+async def test_130_update_failure_cleans_up( provide_tempdir, name ):
+    ''' Either backend raises ContentUpdateFailure and cleans up. '''
+    iobackends = cache_import_module( f"{PACKAGE_NAME}.iobackends" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    backend = iobackends.IoBackends( name ).produce( synchronize = True )
+    location = provide_tempdir / 'test.txt'
+    location.write_bytes( b'original' )
+    with patch( 'os.fsync', side_effect = OSError( 'Test error' ) ): # noqa: SIM117
+        with pytest.raises( exceptions.ContentUpdateFailure ):
+            await backend.update_bytes_atomic( location, b'updated' )
+    assert location.read_bytes( ) == b'original'
+    assert [ path.name for path in provide_tempdir.iterdir( ) ] == (
+        [ 'test.txt' ] )
+
+
+@pytest.mark.parametrize( 'name', ( 'aiofiles', 'threads' ) )
+@pytest.mark.asyncio
+async def test_140_synchronize_optional( provide_tempdir, name ):
+    ''' Content is flushed to storage only if synchronize is requested. '''
+    iobackends = cache_import_module( f"{PACKAGE_NAME}.iobackends" )
+    location = provide_tempdir / 'test.txt'
+    for synchronize in ( False, True ):
+        backend = iobackends.IoBackends( name ).produce(
+            synchronize = synchronize )
+        with patch( 'os.fsync' ) as fsync:
+            await backend.update_bytes_atomic( location, b'updated' )
+        assert fsync.called is synchronize
+    assert location.read_bytes( ) == b'updated'
+
+
+@pytest.mark.asyncio
+async def test_150_aiofiles_write_failure_chained( provide_tempdir ):
+    ''' Aiofiles backend chains cause of write failure and cleans up. '''
+    iobackends = cache_import_module( f"{PACKAGE_NAME}.iobackends" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    backend = iobackends.AiofilesBackend( )
+    location = provide_tempdir / 'test.txt'
+    location.write_bytes( b'original' )
+    with pytest.raises( exceptions.ContentUpdateFailure ) as exc_info:
+        await backend.update_bytes_atomic(
+            location, 'not bytes' ) # pyright: ignore
+    assert isinstance( exc_info.value.__cause__, TypeError )
+    assert location.read_bytes( ) == b'original'
+    assert [ path.name for path in provide_tempdir.iterdir( ) ] == (
+        [ 'test.txt' ] )
+
+
+def test_200_produce_backend_from_configuration( ):
+    ''' Backend is produced from configuration with default fallback. '''
+    iobackends = cache_import_module( f"{PACKAGE_NAME}.iobackends" )
+    backend = iobackends.produce_backend( MagicMock( configuration = { } ) )
+    assert isinstance( backend, iobackends.AiofilesBackend )
+    backend = iobackends.produce_backend( MagicMock(
+        configuration = { 'io-backends': { 'default': 'threads' } } ) )
+    assert isinstance( backend, iobackends.ThreadsBackend )
+    assert not backend.synchronize
+    backend = iobackends.produce_backend( MagicMock(
+        configuration = { 'io-backends': { 'synchronize': True } } ) )
+    assert backend.synchronize
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    with pytest.raises( exceptions.IoBackendInvalidity ) as exc_info:
+        iobackends.produce_backend( MagicMock(
+            configuration = { 'io-backends': { 'default': 'bogus' } } ) )
+    assert "'bogus'" in str( exc_info.value )
+    assert "'threads'" in str( exc_info.value )
+
+
+@pytest.mark.asyncio
+async def test_300_benchmark_selects_fastest( provide_tempdir ):
+    ''' Benchmark measures every backend and fastest one is selected. '''
+    iobackends = cache_import_module( f"{PACKAGE_NAME}.iobackends" )
+    tree = provide_tempdir / 'tree'
+    tree.mkdir( )
+    scratch = provide_tempdir / 'scratch'
+    scratch.mkdir( )
+    locations = [ ]
+    for i in range( 8 ):
+        location = tree / f"{i}.txt"
+        location.write_text( f"content {i}\n" )
+        locations.append( location )
+    results = await iobackends.benchmark(
+        locations, scratch, repetitions = 1 )
+    assert set( results ) == set( iobackends.IoBackends )
+    assert all( seconds > 0 for seconds in results.values( ) )
+    fastest = iobackends.select_fastest( results )
+    assert results[ fastest ] == min( results.values( ) )
+    assert ( scratch / '7.copy' ).read_text( ) == "content 7\n"
+    assert iobackends.select_fastest( {
+        iobackends.IoBackends.Aiofiles: 2.0,
+        iobackends.IoBackends.Threads: 1.0,
+    } ) is iobackends.IoBackends.Threads
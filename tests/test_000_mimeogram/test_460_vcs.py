@@ -0,0 +1,118 @@
+# vim: set filetype=python fileencoding=utf-8:
+# -*- coding: utf-8 -*-
+
+#============================================================================#
+#                                                                            #
+#  Licensed under the Apache License, Version 2.0 (the "License");           #
+#  you may not use this file except in compliance with the License.          #
+#  You may obtain a copy of the License at                                   #
+#                                                                            #
+#      http://www.apache.org/licenses/LICENSE-2.0                            #
+#                                                                            #
+#  Unless required by applicable law or agreed to in writing, software       #
+#  distributed under the License is distributed on an "AS IS" BASIS,         #
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.  #
+#  See the License for the specific language governing permissions and       #
+#  limitations under the License.                                            #
+#                                                                            #
+#============================================================================#
+
+
+''' Tests for version control queries module. '''
+
+
+import shutil
+import subprocess
+
+import pytest
+
+from . import PACKAGE_NAME, cache_import_module
+
+
+pytestmark = pytest.mark.skipif(
+    shutil.which( 'git' ) is None, reason = 'Git is not available.' )
+
+
+def _git( directory, *arguments ):
+    subprocess.run( # noqa: S603
+        (   'git', '-C', str( directory ), # noqa: S607
+            '-c', 'user.name=Test', '-c', 'user.email=test@example.com',
+            *arguments ),
+        check = True, capture_output = True )
+
+
+@pytest.fixture
+def provide_repository( provide_tempdir ):
+    ''' Provides Git repository with committed and changed files. '''
+    repository = provide_tempdir / 'repository'
+    ( repository / 'package' ).mkdir( parents = True )
+    for name in ( 'modified.txt', 'deleted.txt', 'renamed.txt', 'same.txt' ):
+        ( repository / 'package' / name ).write_text( f"{name}\n" )
+    _git( repository, 'init', '--quiet' )
+    _git( repository, 'add', '.' )
+    _git( repository, 'commit', '--quiet', '--message', 'Initial.' )
+    ( repository / 'package' / 'modified.txt' ).write_text( 'changed\n' )
+    ( repository / 'package' / 'deleted.txt' ).unlink( )
+    _git( repository, 'mv', 'package/renamed.txt', 'package/moved.txt' )
+    ( repository / 'added.txt' ).write_text( 'added\n' )
+    _git( repository, 'add', 'added.txt' )
+    ( repository / 'package' / 'untracked.txt' ).write_text( 'untracked\n' )
+    ( repository / '.gitignore' ).write_text( '*.log\n' )
+    ( repository / 'ignored.log' ).write_text( 'ignored\n' )
+    return repository.resolve( )
+
+
+@pytest.mark.asyncio
+async def test_100_collect_git_changes( provide_repository ):
+    ''' Changed files are reported without deletions or untracked files. '''
+    vcs = cache_import_module( f"{PACKAGE_NAME}.vcs" )
+    locations = await vcs.collect_git_changes(
+        'HEAD', directory = provide_repository )
+    assert set( locations ) == {
+        provide_repository / 'added.txt',
+        provide_repository / 'package' / 'modified.txt',
+        provide_repository / 'package' / 'moved.txt',
+    }
+    locations = await vcs.collect_git_changes(
+        'HEAD', untracked = True, directory = provide_repository / 'package' )
+    assert set( locations ) == {
+        provide_repository / 'package' / 'modified.txt',
+        provide_repository / 'package' / 'moved.txt',
+        provide_repository / 'package' / 'untracked.txt',
+    }
+
+
+@pytest.mark.asyncio
+async def test_110_collect_git_changes_untracked( provide_repository ):
+    ''' Untracked files are included on request, ignored files never. '''
+    vcs = cache_import_module( f"{PACKAGE_NAME}.vcs" )
+    locations = await vcs.collect_git_changes(
+        'HEAD', untracked = True, directory = provide_repository )
+    assert set( locations ) == {
+        provide_repository / '.gitignore',
+        provide_repository / 'added.txt',
+        provide_repository / 'package' / 'modified.txt',
+        provide_repository / 'package' / 'moved.txt',
+        provide_repository / 'package' / 'untracked.txt',
+    }
+
+
+@pytest.mark.asyncio
+async def test_120_collect_git_changes_failure( provide_repository ):
+    ''' Invalid revision is reported as query failure. '''
+    vcs = cache_import_module( f"{PACKAGE_NAME}.vcs" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    with pytest.raises( exceptions.VcsQueryFailure ):
+        await vcs.collect_git_changes(
+            'no-such-revision', directory = provide_repository )
+
+
+def test_200_parse_name_status( ):
+    ''' Name-status records are parsed, including renames and copies. '''
+    vcs = cache_import_module( f"{PACKAGE_NAME}.vcs" )
+    report = (
+        b'M\0a b.txt\0D\0gone.txt\0R087\0old.txt\0new.txt\0'
+        b'C100\0src.txt\0copy.txt\0A\0added.txt\0' )
+    assert list( vcs._parse_name_status( report ) ) == [
+        'a b.txt', 'new.txt', 'copy.txt', 'added.txt' ]
+    assert list( vcs._parse_name_status( b'' ) ) == [ ]
@@ -21,9 +21,12 @@
 ''' Tests for content acquisition module. '''
 
 
+import hashlib
 import os
 import sys
 
+from unittest.mock import patch
+
 import exceptiongroup
 import pytest
 
@@ -80,6 +83,30 @@ async def test_100_acquire_single_file( provide_tempdir, provide_auxdata ):
         assert part.mimetype.startswith( "text/" )
         assert part.charset.lower( ) == "utf-8"
         assert part.content == test_content
+        assert part.digest is None
+
+
+@pytest.mark.asyncio
+async def test_105_acquired_digest_matches_parsed(
+    provide_tempdir, provide_auxdata
+):
+    ''' Digest of acquired part equals that of part parsed from mimeogram. '''
+    acquirers = cache_import_module( f"{PACKAGE_NAME}.acquirers" )
+    formatters = cache_import_module( f"{PACKAGE_NAME}.formatters" )
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    location = provide_tempdir / 'crlf.txt'
+    location.write_bytes( 'Caf\u00e9 cr\u00e8me\r\n'.encode( ) * 16 )
+    result = await acquirers.acquire( provide_auxdata, [ location ] )
+    part = result[ 0 ]
+    assert '\r' not in part.content
+    digest = parts.calculate_digest( part )
+    assert digest == hashlib.sha256(
+        'Caf\u00e9 cr\u00e8me\n'.encode( ) * 16 ).hexdigest( )
+    mimeogram = formatters.format_mimeogram( result )
+    parsed = parsers.parse( mimeogram )[ 0 ]
+    assert parsed.digest is None
+    assert parts.calculate_digest( parsed ) == digest
 
 
 @pytest.mark.asyncio
@@ -122,6 +149,96 @@ async def test_120_acquire_recursive_directory(
         assert contents == { "Root content\n", "Nested content\n" }
 
 
+@pytest.mark.asyncio
+async def test_130_acquire_with_threads_backend(
+    provide_tempdir, provide_auxdata
+):
+    ''' Successfully acquires content through configured I/O backend. '''
+    acquirers = cache_import_module( f"{PACKAGE_NAME}.acquirers" )
+    test_files = {
+        "file1.txt": "Content 1\n",
+        "file2.txt": "Content 2\n",
+    }
+    provide_auxdata.configuration[ 'io-backends' ] = { 'default': 'threads' }
+
+    with create_test_files( provide_tempdir, test_files ):
+        result = await acquirers.acquire(
+            provide_auxdata, [ provide_tempdir ] )
+
+        contents = { part.content for part in result }
+        assert contents == { "Content 1\n", "Content 2\n" }
+
+
+@pytest.mark.asyncio
+async def test_140_acquire_changed_since( provide_tempdir, provide_auxdata ):
+    ''' Skips files not modified after threshold. '''
+    acquirers = cache_import_module( f"{PACKAGE_NAME}.acquirers" )
+    test_files = {
+        "old.txt": "Old content\n",
+        "new.txt": "New content\n",
+        "subdir/old.txt": "Old nested content\n",
+        "subdir/new.txt": "New nested content\n",
+    }
+    provide_auxdata.configuration[
+        'acquire-parts' ][ 'recurse-directories' ] = True
+    threshold = 1_500_000_000 * 1_000_000_000
+
+    with create_test_files( provide_tempdir, test_files ):
+        for name in ( "old.txt", "subdir/old.txt" ):
+            os.utime( provide_tempdir / name, ns = ( threshold, threshold ) )
+        result = await acquirers.acquire(
+            provide_auxdata, [ provide_tempdir ], changed_since = threshold )
+        contents = { part.content for part in result }
+        assert contents == { "New content\n", "New nested content\n" }
+        result = await acquirers.acquire(
+            provide_auxdata,
+            [ provide_tempdir / "old.txt", provide_tempdir / "new.txt" ],
+            changed_since = threshold )
+        assert [ part.content for part in result ] == [ "New content\n" ]
+        result = await acquirers.acquire(
+            provide_auxdata, [ provide_tempdir ] )
+        assert len( result ) == 4
+
+
+@pytest.mark.asyncio
+async def test_150_acquire_selection( provide_tempdir, provide_auxdata ):
+    ''' Acquires only selected files within sources as scopes. '''
+    acquirers = cache_import_module( f"{PACKAGE_NAME}.acquirers" )
+    test_files = {
+        "top.txt": "Top content\n",
+        "other.txt": "Other content\n",
+        "subdir/nested.txt": "Nested content\n",
+        "outside/file.txt": "Outside content\n",
+    }
+
+    with create_test_files( provide_tempdir, test_files ):
+        root = provide_tempdir.resolve( )
+        selection = [
+            root / "top.txt",
+            root / "subdir" / "nested.txt",
+            root / "outside" / "file.txt",
+            root / "subdir",
+        ]
+        result = await acquirers.acquire(
+            provide_auxdata,
+            [ provide_tempdir / "subdir", provide_tempdir / "top.txt" ],
+            selection = selection )
+        assert { part.content for part in result } == {
+            "Top content\n", "Nested content\n" }
+        assert str( provide_tempdir / "subdir" / "nested.txt" ) in {
+            part.location for part in result }
+        with patch.object( acquirers._scribe, 'warning' ) as warning:
+            result = await acquirers.acquire(
+                provide_auxdata, [ provide_tempdir ], selection = selection )
+        assert { part.content for part in result } == { "Top content\n" }
+        assert "Skipped 2 selected files" in warning.call_args[ 0 ][ 0 ]
+        provide_auxdata.configuration[
+            'acquire-parts' ][ 'recurse-directories' ] = True
+        result = await acquirers.acquire(
+            provide_auxdata, [ provide_tempdir ], selection = selection )
+        assert len( result ) == 3
+
+
 # Line Ending Tests
 
 @pytest.mark.asyncio
@@ -186,6 +303,88 @@ async def test_300_detect_charset( provide_tempdir, provide_auxdata ):
                 path.unlink()
 
 
+@pytest.mark.asyncio
+async def test_310_large_file_sample_detection(
+    provide_tempdir, provide_auxdata
+):
+    ''' Detects from sample and decodes full content of large file. '''
+    acquirers = cache_import_module( f"{PACKAGE_NAME}.acquirers" )
+    detextive = cache_import_module( 'detextive' )
+    head = "plain ascii line\r\n" * 8192
+    tail = "caf\u00e9 na\u00efve \u4f60\u597d\r\n" * 64
+    assert len( head ) > acquirers._detection_sample_size
+    large_path = provide_tempdir / "large.txt"
+    large_path.write_bytes( ( head + tail ).encode( 'utf-8' ) )
+    results = await acquirers.acquire( provide_auxdata, [ large_path ] )
+    assert len( results ) == 1
+    part = results[ 0 ]
+    assert part.charset.lower( ) == 'utf-8'
+    assert part.linesep is detextive.LineSeparators.CRLF
+    assert part.content == ( head + tail ).replace( '\r\n', '\n' )
+
+
+def test_320_sample_detection_fallback( ):
+    ''' Sample ends on line boundary and decodes same as full content. '''
+    acquirers = cache_import_module( f"{PACKAGE_NAME}.acquirers" )
+    detextive = cache_import_module( 'detextive' )
+    sample = acquirers._produce_detection_sample( b"line\n" * 20000 )
+    assert len( sample ) < acquirers._detection_sample_size
+    assert sample.endswith( b"line" )
+    content = b"ascii only\n" * 8192 + "trailing caf\u00e9\n".encode( )
+    result = acquirers._decode_inform( content, location = 'tail.txt' )
+    expectation = detextive.decode_inform(
+        content,
+        location = 'tail.txt',
+        behaviors = acquirers._decode_inform_behaviors )
+    assert result.text == expectation.text
+
+
+@pytest.mark.parametrize( 'tail', (
+    b"trailing\x00binary\n", b"trailing \xff\xfe invalid\n" ) )
+@pytest.mark.asyncio
+async def test_330_failure_after_sample( provide_tempdir, tail ):
+    ''' NUL or invalid bytes after sample fail decode of full content. '''
+    acquirers = cache_import_module( f"{PACKAGE_NAME}.acquirers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    head = b"ascii only\n" * 8192
+    assert len( head ) > acquirers._detection_sample_size
+    location = provide_tempdir / "tail.txt"
+    location.write_bytes( head + tail )
+    with pytest.raises( exceptions.ContentDecodeFailure ):
+        await acquirers._acquire_from_file( location )
+
+
+@pytest.mark.asyncio
+async def test_335_nul_after_sample_names_charset( provide_tempdir ):
+    ''' Rejection of NUL after sample reports detected charset. '''
+    acquirers = cache_import_module( f"{PACKAGE_NAME}.acquirers" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    head = b"ascii only\n" * 8192
+    location = provide_tempdir / "tail.txt"
+    location.write_bytes( head + b"trailing\x00binary\n" )
+    with pytest.raises( exceptions.ContentDecodeFailure ) as excinfo:
+        await acquirers._acquire_from_file( location )
+    assert "'???'" not in str( excinfo.value )
+
+
+@pytest.mark.parametrize( 'content', (
+    b"short\x00text\n", b"plain text\n" * 16 + b"\x00\n" ) )
+def test_340_small_content_detection_unchanged( content ):
+    ''' Content within sample size is decoded as by full detection. '''
+    acquirers = cache_import_module( f"{PACKAGE_NAME}.acquirers" )
+    detextive = cache_import_module( 'detextive' )
+    nomargs = dict(
+        location = 'small.txt',
+        behaviors = acquirers._decode_inform_behaviors )
+    try: expectation = detextive.decode_inform( content, **nomargs )
+    except detextive.exceptions.Omnierror as exc:
+        with pytest.raises( type( exc ) ):
+            acquirers._decode_inform( content, location = 'small.txt' )
+    else:
+        result = acquirers._decode_inform( content, location = 'small.txt' )
+        assert result.text == expectation.text
+
+
 # MIME Type Tests
 
 @pytest.mark.asyncio
@@ -281,7 +281,7 @@ async def test_150_atomic_update_handles_errors( provide_tempdir ):
     test_path = provide_tempdir / 'test.txt'
 
     with patch( # noqa: SIM117
-        'aiofiles.os.replace', side_effect = OSError( 'Test error' )
+        'os.replace', side_effect = OSError( 'Test error' )
     ):
         with pytest.raises( exceptions.ContentUpdateFailure ):
             await updaters._update_content_atomic( test_path, 'test content' )
@@ -352,9 +352,9 @@ async def test_170_queue_and_reverter_rollback_on_error(
             content = 'file2 updated'
         )
 
-        with patch( 'aiofiles.os.replace' ) as mock_replace:
-            async def mock_replace_side_effect( src, dst ):
-                if 'file2.txt' in dst:
+        with patch( 'os.replace' ) as mock_replace:
+            def mock_replace_side_effect( src, dst ):
+                if 'file2.txt' in str( dst ):
                     raise OSError( 'Simulated write failure' )
 
             mock_replace.side_effect = mock_replace_side_effect
@@ -450,6 +450,134 @@ async def test_190_reverter_direct_coverage( provide_tempdir ):
 
 
 @pytest.mark.skipif( 'win32' == sys.platform, reason = 'need to fix' )
+@pytest.mark.asyncio
+async def test_195_update_records_metrics( provide_tempdir ):
+    ''' Update records applied, ignored, and protected parts. '''
+    updaters = cache_import_module( f"{PACKAGE_NAME}.updaters" )
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    detextive = cache_import_module( 'detextive' )
+
+    test_parts = [
+        parts.Part(
+            location = name,
+            mimetype = 'text/plain',
+            charset = 'utf-8',
+            linesep = detextive.LineSeparators.LF,
+            content = 'updated content' )
+        for name in ( 'one.txt', 'two.txt' ) ]
+    recorder = metrics.Recorder( )
+    await updaters.update(
+        produce_mock_auxdata( ),
+        test_parts,
+        mode = updaters.ReviewModes.Silent,
+        base = provide_tempdir,
+        protector = _TestProtector( active = False ),
+        recorder = recorder )
+    assert recorder.counters[ 'parts-applied' ] == 2
+    assert recorder.counters[ 'bytes-written' ] == 30
+    assert recorder.calls[ 'write' ] == 1
+    recorder = metrics.Recorder( )
+    await updaters.update(
+        produce_mock_auxdata( ),
+        test_parts,
+        mode = updaters.ReviewModes.Silent,
+        base = provide_tempdir,
+        protector = _TestProtector( active = True, reason = 'Concealment' ),
+        recorder = recorder )
+    assert recorder.counters[ 'parts-protected' ] == 2
+    assert recorder.counters[ 'parts-ignored' ] == 2
+    assert recorder.counters[ 'parts-applied' ] == 0
+
+
+@pytest.mark.asyncio
+async def test_197_update_lazy_parts_bounded( provide_tempdir ):
+    ''' Lazy parts are applied one at a time with spooled originals. '''
+    updaters = cache_import_module( f"{PACKAGE_NAME}.updaters" )
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    boundary = '====MIMEOGRAM_0123456789abcdef===='
+    mgtext = '\n'.join( (
+        f"--{boundary}",
+        'Content-Location: one.txt',
+        'Content-Type: text/plain; charset=utf-8; linesep=LF',
+        '',
+        'first content',
+        f"--{boundary}",
+        'Content-Location: two.txt',
+        'Content-Type: text/plain; charset=utf-8; linesep=LF',
+        '',
+        'second content',
+        f"--{boundary}--" ) )
+    lazy_parts = parsers.parse_buffer( mgtext.encode( 'utf-8' ) )
+    assert all( isinstance( part, parts.LazyPart ) for part in lazy_parts )
+    ( provide_tempdir / 'one.txt' ).write_text( 'original content' )
+    await updaters.update(
+        produce_mock_auxdata( ),
+        lazy_parts,
+        mode = updaters.ReviewModes.Silent,
+        base = provide_tempdir,
+        protector = _TestProtector( active = False ) )
+    assert ( provide_tempdir / 'one.txt' ).read_text( ) == 'first content'
+    assert ( provide_tempdir / 'two.txt' ).read_text( ) == 'second content'
+
+
+@pytest.mark.asyncio
+async def test_198_reverter_spool( provide_tempdir ):
+    ''' Reverter with spool copies originals to disk and restores them. '''
+    updaters = cache_import_module( f"{PACKAGE_NAME}.updaters" )
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    detextive = cache_import_module( 'detextive' )
+    spool = provide_tempdir / 'spool'
+    spool.mkdir( )
+    reverter = updaters.Reverter( spool = spool )
+    location = provide_tempdir / 'existing.txt'
+    location.write_bytes( b'original\r\ncontent' )
+    part = parts.Part(
+        location = str( location ),
+        mimetype = 'text/plain',
+        charset = 'utf-8',
+        linesep = detextive.LineSeparators.LF,
+        content = '' )
+    await reverter.save( part, location )
+    assert location not in reverter.originals
+    assert reverter.spooled[ location ].parent == spool
+    location.write_text( 'changed' )
+    reverter.revisions.append( location )
+    await reverter.restore( )
+    assert location.read_bytes( ) == b'original\r\ncontent'
+
+
+@pytest.mark.asyncio
+async def test_199_update_skips_line_ranges( provide_tempdir ):
+    ''' Update skips parts which hold only ranges of lines. '''
+    updaters = cache_import_module( f"{PACKAGE_NAME}.updaters" )
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    detextive = cache_import_module( 'detextive' )
+
+    location = provide_tempdir / 'large.txt'
+    location.write_text( 'original' )
+    part = parts.Part(
+        location = f"{location}#line=0,10",
+        mimetype = 'text/plain',
+        charset = 'utf-8',
+        linesep = detextive.LineSeparators.LF,
+        content = 'partial' )
+    recorder = metrics.Recorder( )
+    await updaters.update(
+        produce_mock_auxdata( ),
+        [ part ],
+        mode = updaters.ReviewModes.Silent,
+        base = provide_tempdir,
+        protector = _TestProtector( active = False ),
+        recorder = recorder )
+    assert recorder.counters[ 'parts-ignored' ] == 1
+    assert location.read_text( ) == 'original'
+    assert [ path.name for path in provide_tempdir.iterdir( ) ] == (
+        [ 'large.txt' ] )
+
+
 def test_200_derive_location( ):
     ''' _derive_location handles filesystem locations and file:// URLs. '''
     updaters = cache_import_module( f"{PACKAGE_NAME}.updaters" )
@@ -454,6 +454,29 @@ async def test_420_create_deterministic_boundary_repeatability(
         assert printed_content1[ 0 ] == printed_content2[ 0 ]
 
 
+@pytest.mark.parametrize( 'deterministic', ( False, True ) )
+@pytest.mark.asyncio
+async def test_425_create_digests_only_when_used(
+    provide_tempdir, deterministic
+):
+    ''' Create hashes parts only if deterministic boundary uses digests. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    test_path = provide_tempdir / "test.txt"
+    with create_test_files( provide_tempdir, { "test.txt": "content\n" } ):
+        cmd = create.Command(
+            sources = [ str( test_path ) ],
+            deterministic_boundary = deterministic )
+        recorder = metrics.Recorder( )
+        with pytest.raises( SystemExit ): # noqa: SIM117
+            with pytest.MonkeyPatch( ).context( ) as mp:
+                mp.setattr( 'builtins.print', lambda content: None )
+                await create.create(
+                    MagicMock( configuration = { } ),
+                    cmd, recorder = recorder )
+    assert ( 'digest' in recorder.calls ) is deterministic
+
+
 @pytest.mark.asyncio
 async def test_430_create_deterministic_boundary_cli_overrides_config( 
     provide_tempdir
@@ -510,3 +533,477 @@ def test_440_deterministic_boundary_configuration_edit( ):
     
     assert deterministic_edit is not None
     assert deterministic_edit.value is True
+
+
+def test_500_changed_since_configuration_edit( ):
+    ''' Command generates configuration edit for watermark recording. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+
+    cmd = create.Command( sources = [ 'test.txt' ] )
+    assert cmd.changed_since is None
+    assert cmd.record_watermark is None
+    cmd = create.Command(
+        sources = [ 'test.txt' ], record_watermark = True )
+    edits = cmd.provide_configuration_edits( )
+    addresses = { edit.address: edit.value for edit in edits }
+    assert addresses[ ( 'create', 'record-watermark' ) ] is True
+
+
+def test_510_resolve_changed_since( provide_tempdir ):
+    ''' Threshold resolves from epoch, ISO 8601, and reference file. '''
+    import os
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    auxdata = MagicMock( configuration = { } )
+    second = 1_000_000_000
+
+    assert create._resolve_changed_since( auxdata, None ) is (
+        create.__.absent )
+    assert create._resolve_changed_since(
+        auxdata, '1700000000' ) == 1_700_000_000 * second
+    assert create._resolve_changed_since(
+        auxdata, '1700000000.5' ) == 1_700_000_000 * second + second // 2
+    assert create._resolve_changed_since(
+        auxdata, '2023-11-14T22:13:20Z' ) == 1_700_000_000 * second
+    assert create._resolve_changed_since(
+        auxdata, '2023-11-14T22:13:20+00:00' ) == 1_700_000_000 * second
+    reference = provide_tempdir / 'reference'
+    reference.write_text( '' )
+    os.utime( reference, ns = ( 1_600_000_000 * second, ) * 2 )
+    assert create._resolve_changed_since(
+        auxdata, str( reference ) ) == 1_600_000_000 * second
+    with pytest.raises( exceptions.TimestampInvalidity ):
+        create._resolve_changed_since( auxdata, 'not-a-timestamp' )
+
+
+@pytest.mark.asyncio
+async def test_520_create_with_watermark( provide_tempdir ):
+    ''' Recorded watermark excludes files unchanged since last run. '''
+    import os
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+
+    cache = provide_tempdir / 'cache'
+    auxdata = MagicMock(
+        configuration = { 'create': { 'record-watermark': True } } )
+    auxdata.provide_cache_location = cache.joinpath
+    test_files = { "old.txt": "Old content\n", "new.txt": "New content\n" }
+    printed_content = [ ]
+
+    with create_test_files( provide_tempdir, test_files ):
+        assert create._resolve_changed_since( auxdata, 'watermark' ) is (
+            create.__.absent )
+        cmd = create.Command(
+            sources = [ str( provide_tempdir / name ) for name in test_files ],
+            changed_since = 'watermark' )
+        with pytest.raises( SystemExit ) as exc_info: # noqa: SIM117
+            with pytest.MonkeyPatch( ).context( ) as mp:
+                mp.setattr( 'builtins.print', printed_content.append )
+                await create.create( auxdata, cmd )
+        assert exc_info.value.code == 0
+        assert 'Old content' in printed_content[ 0 ]
+        watermark = create._resolve_changed_since( auxdata, 'watermark' )
+        assert isinstance( watermark, int )
+        os.utime(
+            provide_tempdir / 'old.txt',
+            ns = ( watermark - 1_000_000_000, ) * 2 )
+        os.utime(
+            provide_tempdir / 'new.txt',
+            ns = ( watermark + 1_000_000_000, ) * 2 )
+        with pytest.raises( SystemExit ) as exc_info: # noqa: SIM117
+            with pytest.MonkeyPatch( ).context( ) as mp:
+                mp.setattr( 'builtins.print', printed_content.append )
+                await create.create( auxdata, cmd )
+        assert exc_info.value.code == 0
+        assert 'Old content' not in printed_content[ 1 ]
+        assert 'New content' in printed_content[ 1 ]
+
+
+@pytest.mark.asyncio
+async def test_530_create_with_git_changes( provide_tempdir ):
+    ''' Only files changed relative to Git revision are bundled. '''
+    import shutil
+    import subprocess
+    if shutil.which( 'git' ) is None: pytest.skip( 'Git is not available.' )
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+
+    test_files = { "same.txt": "Same content\n", "changed.txt": "Old\n" }
+    printed_content = [ ]
+
+    with create_test_files( provide_tempdir, test_files ):
+        for arguments in (
+            ( 'init', '--quiet' ), ( 'add', '.' ),
+            ( 'commit', '--quiet', '--message', 'Initial.' ),
+        ):
+            subprocess.run( # noqa: S603
+                (   'git', '-c', 'user.name=Test', # noqa: S607
+                    '-c', 'user.email=test@example.com', *arguments ),
+                check = True, capture_output = True, cwd = provide_tempdir )
+        ( provide_tempdir / 'changed.txt' ).write_text( "New content\n" )
+        cmd = create.Command( sources = [ '.' ], git_changed = 'HEAD' )
+        with pytest.raises( SystemExit ) as exc_info: # noqa: SIM117
+            with pytest.MonkeyPatch( ).context( ) as mp:
+                mp.chdir( provide_tempdir )
+                mp.setattr( 'builtins.print', printed_content.append )
+                await create.create( MagicMock( configuration = { } ), cmd )
+        assert exc_info.value.code == 0
+        assert 'New content' in printed_content[ 0 ]
+        assert 'Same content' not in printed_content[ 0 ]
+
+
+@pytest.mark.asyncio
+async def test_600_create_stats_json( provide_tempdir ):
+    ''' Command records per-stage timings and counters as JSON. '''
+    import json
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+
+    test_files = {
+        "one.txt": "Content one\n",
+        "two.txt": "Content two\n",
+        ".DS_Store": "ignored",
+    }
+    stats = provide_tempdir / 'stats.json'
+
+    with create_test_files( provide_tempdir, test_files ):
+        cmd = create.Command(
+            sources = [ str( provide_tempdir ) ],
+            stats_json = str( stats ) )
+        with pytest.raises( SystemExit ) as exc_info: # noqa: SIM117
+            with pytest.MonkeyPatch( ).context( ) as mp:
+                mp.setattr( 'builtins.print', lambda content: None )
+                await cmd( MagicMock( configuration = { } ) )
+        assert exc_info.value.code == 0
+    document = json.loads( stats.read_text( ) )
+    assert document[ 'schema' ] == 'mimeogram-stats/2'
+    assert document[ 'command' ] == 'create'
+    assert document[ 'status' ] == 0
+    counters = document[ 'counters' ]
+    assert counters[ 'files-scanned' ] == 3
+    assert counters[ 'files-ignored' ] == 1
+    assert counters[ 'parts' ] == 2
+    assert counters[ 'bytes-read' ] == 24
+    assert counters[ 'mimeogram-characters' ] > 24
+    for stage in ( 'acquire', 'scan', 'read', 'decode', 'format', 'emit' ):
+        assert document[ 'stages' ][ stage ][ 'calls' ] >= 1
+
+
+@pytest.mark.asyncio
+async def test_610_create_to_output( provide_tempdir ):
+    ''' Command writes mimeogram to output file as it is formatted. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+
+    test_files = {
+        "one.txt": "Content one\n",
+        "two.txt": "Content two\n",
+    }
+    output = provide_tempdir / 'bundle.mimeogram'
+    printed_content = [ ]
+
+    with create_test_files( provide_tempdir, test_files ):
+        for arguments in ( dict( output = str( output ) ), { } ):
+            cmd = create.Command(
+                sources = [
+                    str( provide_tempdir / 'one.txt' ),
+                    str( provide_tempdir / 'two.txt' ) ],
+                deterministic_boundary = True,
+                **arguments )
+            with pytest.raises( SystemExit ) as exc_info: # noqa: SIM117
+                with pytest.MonkeyPatch( ).context( ) as mp:
+                    mp.setattr( 'builtins.print', printed_content.append )
+                    await cmd( MagicMock( configuration = {
+                        'create': { 'deterministic-boundary': True } } ) )
+            assert exc_info.value.code == 0
+    text = output.read_text( encoding = 'utf-8' )
+    assert text == f"{printed_content[ 0 ]}\n"
+    assert [ part.content for part in parsers.parse( text ) ] == (
+        [ "Content one\n", "Content two\n" ] )
+
+
+@pytest.mark.asyncio
+async def test_620_create_since_mimeogram( provide_tempdir ):
+    ''' Command includes only parts changed since previous mimeogram. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+
+    test_files = {
+        "same.txt": "Same content\n",
+        "edited.txt": "Original content\n",
+    }
+    previous = provide_tempdir / 'previous.mimeogram'
+    manifest = provide_tempdir / 'parts.manifest'
+    delta = provide_tempdir / 'delta.mimeogram'
+    sources = [
+        str( provide_tempdir / 'same.txt' ),
+        str( provide_tempdir / 'edited.txt' ) ]
+    auxdata = MagicMock( configuration = { } )
+
+    with create_test_files( provide_tempdir, test_files ):
+        cmd = create.Command(
+            sources = sources,
+            output = str( previous ),
+            write_manifest = str( manifest ) )
+        with pytest.raises( SystemExit ): await cmd( auxdata )
+        ( provide_tempdir / 'edited.txt' ).write_text( "Edited content\n" )
+        for since in ( previous, manifest ):
+            cmd = create.Command(
+                sources = sources,
+                output = str( delta ),
+                since_mimeogram = str( since ) )
+            with pytest.raises( SystemExit ): await cmd( auxdata )
+            parts = parsers.parse( delta.read_text( encoding = 'utf-8' ) )
+            assert [ part.location for part in parts ] == [
+                'mimeogram://manifest', sources[ 1 ] ]
+            assert sources[ 0 ] in parts[ 0 ].content
+            assert parts[ 1 ].content == "Edited content\n"
+
+
+@pytest.mark.asyncio
+async def test_630_create_split_tokens( provide_tempdir ):
+    ''' Command splits mimeogram into numbered files or clipboard copies. '''
+    tiktoken = pytest.importorskip( 'tiktoken' )
+    try: tiktoken.get_encoding( 'cl100k_base' )
+    except Exception: pytest.skip( 'tiktoken resources unavailable' )
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+
+    test_files = {
+        f"file{i}.txt": f"Content {i}\n" * 40 for i in range( 4 ) }
+    sources = [ str( provide_tempdir / name ) for name in test_files ]
+    output = provide_tempdir / 'bundle.mimeogram'
+    copied = [ ]
+    pauses = [ ]
+
+    async def clipcopier( mimeogram ): copied.append( mimeogram )
+
+    async def pauser( prompt ): pauses.append( prompt )
+
+    with create_test_files( provide_tempdir, test_files ):
+        auxdata = MagicMock( configuration = { } )
+        auxdata.provide_data_location = provide_tempdir.joinpath
+        auxdata.distribution.provide_data_location = provide_tempdir.joinpath
+        cmd = create.Command(
+            sources = sources, split_tokens = 300, output = str( output ) )
+        with pytest.raises( SystemExit ):
+            await cmd( auxdata )
+        auxdata.configuration = { 'create': { 'to-clipboard': True } }
+        cmd = create.Command( sources = sources, split_tokens = 300 )
+        with pytest.raises( SystemExit ):
+            await create.create(
+                auxdata, cmd, clipcopier = clipcopier, pauser = pauser )
+    total = len( list( provide_tempdir.glob( 'bundle.*.mimeogram' ) ) )
+    numbered = [
+        provide_tempdir / f"bundle.{number}.mimeogram"
+        for number in range( 1, total + 1 ) ]
+    assert len( numbered ) > 1
+    contents = [
+        part.content
+        for location in numbered
+        for part in parsers.parse( location.read_text( encoding = 'utf-8' ) )
+    ]
+    assert ''.join( contents ) == ''.join( test_files.values( ) )
+    assert len( copied ) == len( numbered )
+    assert len( pauses ) == len( copied ) - 1
+
+
+@pytest.mark.asyncio
+async def test_640_create_with_transforms( provide_tempdir ):
+    ''' Command applies configured transforms to contents. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    transformers = cache_import_module( f"{PACKAGE_NAME}.transformers" )
+
+    cmd = create.Command(
+        sources = [ 'test.txt' ],
+        transforms = [ transformers.Transformers.TrailingWhitespace ] )
+    edits = cmd.provide_configuration_edits( )
+    assert any(
+        edit.address == ( 'transform-parts', 'enable' )
+        and edit.value == [ 'trailing-whitespace' ] for edit in edits )
+    test_files = {
+        "test.py": "# Licensed under the MIT License.\n\nx = 1   \n" }
+    output = provide_tempdir / 'bundle.mimeogram'
+    with create_test_files( provide_tempdir, test_files ):
+        cmd = create.Command(
+            sources = [ str( provide_tempdir / 'test.py' ) ],
+            output = str( output ) )
+        with pytest.raises( SystemExit ):
+            await cmd( MagicMock( configuration = {
+                'transform-parts': {
+                    'enable': [ 'license-headers', 'trailing-whitespace' ],
+                },
+            } ) )
+    parts = parsers.parse( output.read_text( encoding = 'utf-8' ) )
+    assert [ part.content for part in parts ] == [ "x = 1\n" ]
+
+
+@pytest.mark.asyncio
+async def test_650_create_with_token_budget( provide_tempdir ):
+    ''' Command counts tokens exactly only when estimate nears budget. '''
+    import json
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+
+    test_files = { "test.py": "def greet( name ):\n    return name\n" * 20 }
+    output = provide_tempdir / 'bundle.mimeogram'
+    stats = provide_tempdir / 'stats.json'
+    documents = [ ]
+    with create_test_files( provide_tempdir, test_files ):
+        for index in range( 2 ):
+            budget = (
+                documents[ 0 ][ 'counters' ][ 'tokens-estimated' ] if index
+                else 10 ** 9 )
+            cmd = create.Command(
+                sources = [ str( provide_tempdir / 'test.py' ) ],
+                output = str( output ), stats_json = str( stats ),
+                token_budget = budget,
+                tokenizer = 'estimate' )
+            with pytest.raises( SystemExit ):
+                await cmd( MagicMock( configuration = { } ) )
+            documents.append( json.loads( stats.read_text( ) ) )
+    assert documents[ 0 ][ 'counters' ][ 'tokens-estimated' ] > 0
+    assert documents[ 0 ][ 'counters' ][ 'tokens' ] == 0
+    assert documents[ 1 ][ 'counters' ][ 'tokens' ] > 0
+
+
+@pytest.mark.parametrize( 'tokenizer, estimated', (
+    ( 'tiktoken', True ),
+    ( 'estimate', True ),
+    ( 'anthropic-api', False ),
+    ( 'huggingface', False ),
+    ( 'plugin', False ),
+) )
+@pytest.mark.asyncio
+async def test_655_exact_count_without_calibration( tokenizer, estimated ):
+    ''' Tokens are estimated against budget only for calibrated tokenizers. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+    metrics = cache_import_module( f"{PACKAGE_NAME}.metrics" )
+    cmd = create.Command(
+        sources = [ 'test.txt' ], token_budget = 10 ** 9,
+        tokenizer = tokenizer )
+    recorder = metrics.Recorder( )
+    exact = await create._needs_exact_count(
+        MagicMock( configuration = { } ), cmd,
+        ( 'def greet( name ):\n    return name\n', ), recorder )
+    assert exact is not estimated
+    assert ( 'estimate' in recorder.calls ) is estimated
+
+
+@pytest.mark.asyncio
+async def test_660_tokenizer_warmup( ):
+    ''' Tokenizer is produced in background only if tokens are counted. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+    tokenizers = cache_import_module( f"{PACKAGE_NAME}.tokenizers" )
+
+    cmd = create.Command( sources = [ 'test.txt' ], tokenizer = 'estimate' )
+    auxdata = MagicMock( configuration = { } )
+    assert create._start_tokenizer_warmup( auxdata, cmd ) is (
+        create.__.absent )
+    auxdata = MagicMock(
+        configuration = { 'create': { 'count-tokens': True } } )
+    warmup = create._start_tokenizer_warmup( auxdata, cmd )
+    tokenizer = await create._tokenizer_from_command(
+        auxdata, cmd, warmup = warmup )
+    assert isinstance( tokenizer, tokenizers.Estimator )
+    assert warmup.done( )
+    cmd = create.Command(
+        sources = [ 'test.txt' ], tokenizer_variant = [ 'bogus' ],
+        tokenizer = 'estimate' )
+    warmup = create._start_tokenizer_warmup( auxdata, cmd )
+    exceptions = cache_import_module( f"{PACKAGE_NAME}.exceptions" )
+    with pytest.raises( exceptions.TokenizerVariantInvalidity ):
+        await create._tokenizer_from_command( auxdata, cmd, warmup = warmup )
+
+
+@pytest.mark.asyncio
+async def test_662_tokenizer_warmup_variants( ):
+    ''' Tokenizer warmup is only used for primary variant. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+
+    cmd = create.Command(
+        sources = [ 'test.txt' ], tokenizer = 'estimate',
+        tokenizer_variant = [ 'cl100k_base', 'o200k_base' ] )
+    auxdata = MagicMock(
+        configuration = { 'create': { 'count-tokens': True } } )
+    warmup = create._start_tokenizer_warmup( auxdata, cmd )
+    primary = await create._tokenizer_from_command(
+        auxdata, cmd, warmup = warmup, variant = 'cl100k_base' )
+    assert primary is warmup.result( )
+    secondary = await create._tokenizer_from_command(
+        auxdata, cmd, warmup = warmup, variant = 'o200k_base' )
+    assert secondary.variant == 'o200k_base'
+    tokenizers = await create._tokenizers_from_command(
+        auxdata, cmd, warmup = warmup )
+    assert [ tokenizer.variant for tokenizer in tokenizers ] == [
+        'cl100k_base', 'o200k_base' ]
+
+
+@pytest.mark.asyncio
+async def test_664_tokenizer_warmup_skips_services( ):
+    ''' Tokenizers backed by services are not produced in background. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+
+    auxdata = MagicMock(
+        configuration = { 'create': { 'count-tokens': True } } )
+    cmd = create.Command(
+        sources = [ 'test.txt' ], tokenizer = 'anthropic-api' )
+    assert create._start_tokenizer_warmup( auxdata, cmd ) is (
+        create.__.absent )
+    auxdata = MagicMock( configuration = {
+        'create': { 'count-tokens': True },
+        'tokenizers': { 'default': 'anthropic-api' } } )
+    cmd = create.Command( sources = [ 'test.txt' ] )
+    assert create._start_tokenizer_warmup( auxdata, cmd ) is (
+        create.__.absent )
+
+
+@pytest.mark.asyncio
+async def test_666_tokenizer_warmup_cancelled_on_exit( ):
+    ''' Unfinished tokenizer warmup is cancelled when exits are closed. '''
+    from contextlib import AsyncExitStack
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+
+    cmd = create.Command( sources = [ 'test.txt' ], tokenizer = 'estimate' )
+    async with AsyncExitStack( ) as exits:
+        auxdata = MagicMock(
+            configuration = { 'create': { 'count-tokens': True } },
+            exits = exits )
+        warmup = create._start_tokenizer_warmup( auxdata, cmd )
+        assert not warmup.done( )
+    assert warmup.cancelled( )
+    async with AsyncExitStack( ) as exits:
+        auxdata = MagicMock(
+            configuration = { 'create': { 'count-tokens': True } },
+            exits = exits )
+        warmup = create._start_tokenizer_warmup( auxdata, cmd )
+        await warmup
+    assert not warmup.cancelled( )
+
+
+@pytest.mark.asyncio
+async def test_670_create_with_several_variants( provide_tempdir, capsys ):
+    ''' Command counts with each variant and reports heaviest parts first. '''
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+
+    test_files = {
+        "light.txt": "Hello.\n",
+        "heavy.txt": "Lorem ipsum dolor sit amet.\n" * 50,
+    }
+    output = provide_tempdir / 'bundle.mimeogram'
+    with create_test_files( provide_tempdir, test_files ):
+        cmd = create.Command(
+            sources = [
+                str( provide_tempdir / 'light.txt' ),
+                str( provide_tempdir / 'heavy.txt' ) ],
+            output = str( output ), report_tokens = True,
+            tokenizer = 'estimate',
+            tokenizer_variant = [ 'cl100k_base', 'o200k_base' ] )
+        with pytest.raises( SystemExit ) as exc_info:
+            await cmd( MagicMock( configuration = { } ) )
+    assert exc_info.value.code == 0
+    lines = capsys.readouterr( ).err.splitlines( )
+    assert lines[ 0 ].split( ) == [ 'cl100k_base', 'o200k_base', 'Location' ]
+    assert lines[ 1 ].endswith( 'heavy.txt' )
+    assert lines[ 2 ].endswith( 'light.txt' )
+    heavy = [ int( count ) for count in lines[ 1 ].split( )[ : 2 ] ]
+    light = [ int( count ) for count in lines[ 2 ].split( )[ : 2 ] ]
+    assert heavy[ 0 ] > light[ 0 ] > 0
+    assert heavy[ 1 ] > light[ 1 ] > 0
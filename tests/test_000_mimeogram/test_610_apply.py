@@ -23,6 +23,9 @@
 
 import types
 
+from contextlib import AsyncExitStack, asynccontextmanager
+from unittest.mock import MagicMock
+
 import pytest
 
 from . import PACKAGE_NAME, cache_import_module
@@ -39,11 +42,13 @@ class MockContentAcquirer:
         stdin_content: str = '',
         clipboard_content: str = '',
         file_contents: dict[ str, str ] | None = None,
+        file_bytes: dict[ str, bytes ] | None = None,
     ):
         self._stdin_is_terminal = stdin_is_terminal
         self._stdin_content = stdin_content
         self._clipboard_content = clipboard_content
         self._file_contents = file_contents or {}
+        self._file_bytes = file_bytes or {}
 
     def stdin_is_tty( self ) -> bool:
         return self._stdin_is_terminal
@@ -56,9 +61,21 @@ class MockContentAcquirer:
             return self._file_contents[ path ]
         raise FileNotFoundError( f"File not found: {path}" )
 
+    async def acquire_file_bytes( self, path: str | None ) -> bytes:
+        if path in self._file_bytes:
+            return self._file_bytes[ path ]
+        raise FileNotFoundError( f"File not found: {path}" )
+
+    @asynccontextmanager
+    async def access_file_buffer( self, path: str | None ):
+        yield await self.acquire_file_bytes( path )
+
     async def acquire_stdin( self ) -> str:
         return self._stdin_content
 
+    def stream_stdin( self ):
+        return self._stdin_content.splitlines( True )
+
 
 def test_100_command_default_values( ):
     ''' Command initializes with correct default values. '''
@@ -121,13 +138,21 @@ async def test_210_acquire_from_file( ):
     test_file = "test.mg"
     cmd = apply.Command( source = test_file )
     acquirer = MockContentAcquirer(
-        file_contents = { test_file: test_content } )
+        file_contents = { test_file: test_content },
+        file_bytes = { test_file: test_content.encode( ) } )
 
     content = await apply._acquire(
         types.SimpleNamespace( configuration = { } ),
         cmd,
         acquirer )
     assert content == test_content
+    async with AsyncExitStack( ) as exits:
+        content = await apply._acquire(
+            types.SimpleNamespace( configuration = { } ),
+            cmd,
+            acquirer,
+            exits = exits )
+    assert content == test_content.encode( )
 
 
 @pytest.mark.asyncio
@@ -307,3 +332,276 @@ async def test_430_apply_update_failure( ):
             updater = failing_updater )
 
     assert exc_info.value.code == 1
+
+
+@pytest.mark.asyncio
+async def test_440_apply_file_parses_raw_bytes( ):
+    ''' apply parses mimeograms from files per part, from raw bytes. '''
+    apply = cache_import_module( f"{PACKAGE_NAME}.apply" )
+    boundary = '====MIMEOGRAM_0123456789abcdef===='
+    content = b''.join( (
+        f"--{boundary}\n".encode( ),
+        b'Content-Location: latin1.txt\n',
+        b'Content-Type: text/plain; charset=iso-8859-1; linesep=LF\n\n',
+        'na\u00efve\n'.encode( 'iso-8859-1' ),
+        f"--{boundary}--\n".encode( ),
+    ) )
+    applied = [ ]
+
+    async def mock_updater( auxdata, parts, mode, **nomargs ) -> None:
+        applied.extend( parts )
+
+    acquirer = MockContentAcquirer(
+        stdin_is_terminal = False, file_bytes = { 'test.mg': content } )
+    with pytest.raises( SystemExit ) as exc_info:
+        await apply.apply(
+            types.SimpleNamespace( configuration = { } ),
+            apply.Command( source = 'test.mg' ),
+            acquirer = acquirer,
+            updater = mock_updater )
+    assert exc_info.value.code == 0
+    assert [ part.content for part in applied ] == [ 'na\u00efve' ]
+
+
+@pytest.mark.parametrize( 'charset', ( 'utf-16', 'cp1252' ) )
+@pytest.mark.asyncio
+async def test_450_apply_file_in_container_charset( charset ):
+    ''' apply parses files saved in other encodings after creation. '''
+    apply = cache_import_module( f"{PACKAGE_NAME}.apply" )
+    boundary = '====MIMEOGRAM_0123456789abcdef===='
+    content = (
+        f"--{boundary}\n"
+        'Content-Location: caf\u00e9.txt\n'
+        'Content-Type: text/plain; charset=utf-8; linesep=LF\n\n'
+        'na\u00efve \u201cquoted\u201d text\n'
+        f"--{boundary}--\n" ).encode( charset )
+    applied = [ ]
+
+    async def mock_updater( auxdata, parts, mode, **nomargs ) -> None:
+        applied.extend( parts )
+
+    acquirer = MockContentAcquirer(
+        stdin_is_terminal = False, file_bytes = { 'test.mg': content } )
+    with pytest.raises( SystemExit ) as exc_info:
+        await apply.apply(
+            types.SimpleNamespace( configuration = { } ),
+            apply.Command( source = 'test.mg' ),
+            acquirer = acquirer,
+            updater = mock_updater )
+    assert exc_info.value.code == 0
+    assert [ part.location for part in applied ] == [ 'caf\u00e9.txt' ]
+    assert [ part.content for part in applied ] == (
+        [ 'na\u00efve \u201cquoted\u201d text' ] )
+    assert applied[ 0 ].charset == 'utf-8'
+
+
+@pytest.mark.asyncio
+async def test_455_apply_file_with_parser_receives_text( ):
+    ''' Supplied parser receives text of file, as decoded by acquirer. '''
+    apply = cache_import_module( f"{PACKAGE_NAME}.apply" )
+    parsers = cache_import_module( f"{PACKAGE_NAME}.parsers" )
+    content = _produce_stream_mimeogram( 'test.txt' )
+    received = [ ]
+
+    async def mock_updater( auxdata, parts, mode, **nomargs ) -> None:
+        pass
+
+    def recording_parser( mgtext ):
+        received.append( mgtext )
+        return parsers.parse( mgtext )
+
+    acquirer = MockContentAcquirer(
+        stdin_is_terminal = False, file_contents = { 'test.mg': content } )
+    with pytest.raises( SystemExit ) as exc_info:
+        await apply.apply(
+            types.SimpleNamespace( configuration = { } ),
+            apply.Command( source = 'test.mg' ),
+            acquirer = acquirer,
+            parser = recording_parser,
+            updater = mock_updater )
+    assert exc_info.value.code == 0
+    assert received == [ content ]
+
+
+@pytest.mark.asyncio
+async def test_460_create_apply_round_trip( provide_tempdir ):
+    ''' File in other charset than UTF-8 survives create and apply. '''
+    apply = cache_import_module( f"{PACKAGE_NAME}.apply" )
+    create = cache_import_module( f"{PACKAGE_NAME}.create" )
+    fsprotect = cache_import_module( f"{PACKAGE_NAME}.fsprotect" )
+    updaters = cache_import_module( f"{PACKAGE_NAME}.updaters" )
+    location = provide_tempdir / 'wide.txt'
+    original = 'caf\u00e9 na\u00efve\nabcd\n'.encode( 'utf-16' )
+    location.write_bytes( original )
+    output = provide_tempdir / 'bundle.mimeogram'
+    cmd = create.Command(
+        sources = [ str( location ) ], output = str( output ) )
+    with pytest.raises( SystemExit ) as exc_info:
+        await cmd( MagicMock( configuration = { } ) )
+    assert exc_info.value.code == 0
+    assert 'charset=utf-16' in output.read_text( encoding = 'utf-8' )
+    location.write_bytes( b'' )
+
+    async def updater( auxdata, parts, mode, **nomargs ) -> None:
+        protector = MagicMock( )
+        protector.verify.return_value = fsprotect.Status(
+            path = location, active = False )
+        await updaters.update(
+            auxdata, parts, mode, protector = protector, **nomargs )
+
+    with pytest.raises( SystemExit ) as exc_info:
+        await apply.apply(
+            MagicMock( configuration = { } ),
+            apply.Command( source = str( output ) ),
+            acquirer = apply.StandardContentAcquirer( ),
+            updater = updater )
+    assert exc_info.value.code == 0
+    assert location.read_bytes( ) == original
+
+
+@pytest.mark.asyncio
+async def test_470_apply_file_parts_decoded_on_demand( provide_tempdir ):
+    ''' Parts from memory-mapped file are decoded on demand. '''
+    apply = cache_import_module( f"{PACKAGE_NAME}.apply" )
+    parts = cache_import_module( f"{PACKAGE_NAME}.parts" )
+    location = provide_tempdir / 'bundle.mimeogram'
+    location.write_text(
+        _produce_stream_mimeogram( 'test.txt' ), encoding = 'utf-8' )
+    applied = [ ]
+
+    async def mock_updater( auxdata, parts, mode, **nomargs ) -> None:
+        applied.extend( ( part, part.content ) for part in parts )
+
+    empty = provide_tempdir / 'empty.mimeogram'
+    empty.touch( )
+    for source, code in ( ( location, 0 ), ( empty, 1 ) ):
+        with pytest.raises( SystemExit ) as exc_info:
+            await apply.apply(
+                types.SimpleNamespace( configuration = { } ),
+                apply.Command( source = str( source ) ),
+                acquirer = apply.StandardContentAcquirer( ),
+                updater = mock_updater )
+        assert exc_info.value.code == code
+    assert [ type( part ) for part, _ in applied ] == [ parts.LazyPart ]
+    assert [ content for _, content in applied ] == [ 'Content of test.txt' ]
+
+
+def _produce_stream_mimeogram( location: str ) -> str:
+    boundary = '====MIMEOGRAM_0123456789abcdef===='
+    return (
+        f"--{boundary}\n"
+        f"Content-Location: {location}\n"
+        "Content-Type: text/plain; charset=utf-8; linesep=LF\n"
+        "\n"
+        f"Content of {location}\n"
+        f"--{boundary}--\n" )
+
+
+@pytest.mark.parametrize( 'framing', ( 'concatenated', 'nul', 'ndjson' ) )
+@pytest.mark.asyncio
+async def test_500_apply_stream_framings( framing ):
+    ''' apply_stream applies each framed mimeogram as own batch. '''
+    import json
+    apply = cache_import_module( f"{PACKAGE_NAME}.apply" )
+    texts = [
+        _produce_stream_mimeogram( f"{name}.txt" )
+        for name in ( 'one', 'two', 'three' ) ]
+    match framing:
+        case 'concatenated': content = ''.join( texts )
+        case 'nul': content = '\0'.join( texts ) + '\0'
+        case _:
+            content = ''.join(
+                json.dumps( { 'mimeogram': text } ) + '\n'
+                for text in texts )
+    batches = [ ]
+    protectors = set( )
+
+    async def mock_updater( auxdata, parts, mode, **nomargs ) -> None:
+        batches.append( [ part.location for part in parts ] )
+        protectors.add( id( nomargs[ 'protector' ] ) )
+
+    auxdata = types.SimpleNamespace( configuration = { } )
+    with pytest.raises( SystemExit ) as exc_info:
+        await apply.apply_stream(
+            auxdata,
+            apply.Command(
+                stream = True, framing = apply.StreamFramings( framing ) ),
+            acquirer = MockContentAcquirer( stdin_content = content ),
+            updater = mock_updater,
+            protector = MagicMock( ) )
+    assert exc_info.value.code == 0
+    assert batches == [ [ 'one.txt' ], [ 'two.txt' ], [ 'three.txt' ] ]
+    assert len( protectors ) == 1
+
+
+@pytest.mark.asyncio
+async def test_510_apply_stream_continues_after_failure( ):
+    ''' Failed batches are reported and later batches are applied. '''
+    apply = cache_import_module( f"{PACKAGE_NAME}.apply" )
+    content = '\n'.join( (
+        '{"mimeogram": 42}',
+        'not json',
+        '"' + _produce_stream_mimeogram( 'last.txt' ).replace(
+            '\n', '\\n' ) + '"',
+    ) )
+    batches = [ ]
+
+    async def mock_updater( auxdata, parts, mode, **nomargs ) -> None:
+        batches.append( [ part.location for part in parts ] )
+
+    with pytest.raises( SystemExit ) as exc_info:
+        await apply.apply_stream(
+            types.SimpleNamespace( configuration = { } ),
+            apply.Command(
+                stream = True, framing = apply.StreamFramings.Ndjson ),
+            acquirer = MockContentAcquirer( stdin_content = content ),
+            updater = mock_updater,
+            protector = MagicMock( ) )
+    assert exc_info.value.code == 1
+    assert batches == [ [ 'last.txt' ] ]
+
+
+@pytest.mark.asyncio
+async def test_520_apply_stream_rejects_review( ):
+    ''' apply_stream rejects interactive review mode. '''
+    apply = cache_import_module( f"{PACKAGE_NAME}.apply" )
+    updaters = cache_import_module( f"{PACKAGE_NAME}.updaters" )
+    with pytest.raises( SystemExit ) as exc_info:
+        await apply.apply_stream(
+            types.SimpleNamespace( configuration = { } ),
+            apply.Command(
+                stream = True, mode = updaters.ReviewModes.Partitive ),
+            acquirer = MockContentAcquirer( ) )
+    assert exc_info.value.code == 1
+
+
+
+@pytest.mark.asyncio
+async def test_530_apply_stream_reads_off_event_loop( ):
+    ''' apply_stream reads standard input outside of event loop thread. '''
+    import threading
+    apply = cache_import_module( f"{PACKAGE_NAME}.apply" )
+    threads = set( )
+
+    class ThreadRecordingAcquirer( MockContentAcquirer ):
+
+        def stream_stdin( self ):
+            for line in super( ).stream_stdin( ):
+                threads.add( threading.current_thread( ) )
+                yield line
+
+    async def mock_updater( auxdata, parts, mode, **nomargs ) -> None:
+        pass
+
+    acquirer = ThreadRecordingAcquirer(
+        stdin_content = _produce_stream_mimeogram( 'one.txt' ) )
+    with pytest.raises( SystemExit ) as exc_info:
+        await apply.apply_stream(
+            types.SimpleNamespace( configuration = { } ),
+            apply.Command( stream = True ),
+            acquirer = acquirer,
+            updater = mock_updater,
+            protector = MagicMock( ) )
+    assert exc_info.value.code == 0
+    assert threads
+    assert threading.current_thread( ) not in threads